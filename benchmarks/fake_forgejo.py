@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+OWNER = "bench"
+REPO = "repo"
+BRANCH = "feature/bench"
+PR_NUMBER = 1
+STAMP = "2026-01-01T00:00:00Z"
+
+# Routes that can be switched to 404 to exercise ForgejoClient fallbacks.
+OPTIONAL_ROUTES = ("issue_comments", "review_comments", "dependencies", "blocked_by", "blockers", "blocks", "blocking")
+
+
+@dataclass(slots=True)
+class FakeForgejoData:
+    pulls: dict[int, dict[str, Any]] = field(default_factory=dict)
+    reviews: dict[int, list[dict[str, Any]]] = field(default_factory=dict)
+    review_comments: dict[int, list[dict[str, Any]]] = field(default_factory=dict)
+    issue_comments: dict[int, list[dict[str, Any]]] = field(default_factory=dict)
+    issues: dict[int, dict[str, Any]] = field(default_factory=dict)
+    blocked_by: dict[int, list[int]] = field(default_factory=dict)
+    diffs: dict[int, str] = field(default_factory=dict)
+    next_id: int = 1000
+
+    def new_id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+
+def seed_data(items: int, body_bytes: int = 200) -> FakeForgejoData:
+    """Build a repo with ``items`` issues, PR comments, review comments and diff files.
+
+    Every third issue is blocked by the one before it, and PR #1 on
+    ``BRANCH`` carries one review per ten comments.
+    """
+    data = FakeForgejoData()
+    body = ("x" * body_bytes)[:body_bytes]
+    user = {"login": "reviewer"}
+
+    for number in range(1, items + 1):
+        data.issues[number] = {
+            "id": number,
+            "number": number,
+            "title": f"Issue {number}",
+            "body": body,
+            "state": "open" if number % 5 else "closed",
+            "html_url": f"http://forgejo.test/{OWNER}/{REPO}/issues/{number}",
+            "labels": [],
+        }
+        if number % 3 == 0:
+            data.blocked_by[number] = [number - 1]
+
+    data.pulls[PR_NUMBER] = {
+        "id": PR_NUMBER,
+        "number": PR_NUMBER,
+        "title": "Benchmark PR",
+        "html_url": f"http://forgejo.test/{OWNER}/{REPO}/pulls/{PR_NUMBER}",
+        "state": "open",
+        "head": {"ref": BRANCH, "sha": "b" * 40},
+        "base": {"ref": "main", "sha": "a" * 40},
+        "labels": [],
+    }
+    data.issue_comments[PR_NUMBER] = [
+        {"id": data.new_id(), "body": body, "user": user, "created_at": STAMP, "resolved": index % 2 == 0}
+        for index in range(items)
+    ]
+    reviews = []
+    for index in range(max(1, items // 10)):
+        review_id = data.new_id()
+        reviews.append(
+            {
+                "id": review_id,
+                "state": "APPROVED" if index == 0 else "COMMENTED",
+                "body": body,
+                "user": user,
+                "submitted_at": STAMP,
+            }
+        )
+        data.review_comments[review_id] = [
+            {
+                "id": data.new_id(),
+                "body": f"Prefer explicit names here. {body}",
+                "path": f"src/module_{line}.py",
+                "line": line,
+                "user": user,
+                "created_at": STAMP,
+                "resolved": False,
+            }
+            for line in range(1, 11)
+        ]
+    data.reviews[PR_NUMBER] = reviews
+    data.diffs[PR_NUMBER] = "".join(
+        f"diff --git a/src/module_{index}.py b/src/module_{index}.py\n"
+        f"--- a/src/module_{index}.py\n+++ b/src/module_{index}.py\n"
+        f"@@ -1,1 +1,2 @@\n print('old')\n+print('{body[:40]}')\n"
+        for index in range(items)
+    )
+    return data
+
+
+class FakeForgejo:
+    """In-process stand-in for the parts of the Forgejo API that joan calls.
+
+    Lists honour ``limit``/``page`` with a ``max_page_size`` cap like Forgejo's
+    own ``MAX_RESPONSE_ITEMS``. ``latency_seconds`` is added to every response
+    and routes named in ``missing_routes`` answer 404. ``requests`` counts
+    calls per route so benchmarks can report round trips.
+    """
+
+    def __init__(
+        self,
+        data: FakeForgejoData,
+        *,
+        latency_seconds: float = 0.0,
+        max_page_size: int = 50,
+        missing_routes: set[str] | None = None,
+    ) -> None:
+        unknown = set(missing_routes or ()) - set(OPTIONAL_ROUTES)
+        if unknown:
+            raise ValueError(f"unknown optional routes: {', '.join(sorted(unknown))}")
+        self.data = data
+        self.latency_seconds = latency_seconds
+        self.max_page_size = max_page_size
+        self.missing_routes = set(missing_routes or ())
+        self.requests: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("fake Forgejo is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+    def start(self) -> FakeForgejo:
+        handler = type("Handler", (_Handler,), {"forge": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="fake-forgejo")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.requests.clear()
+
+    def __enter__(self) -> FakeForgejo:
+        return self.start()
+
+    def __exit__(self, *_exc: object) -> None:
+        self.stop()
+
+    def handle(self, method: str, path: str, query: dict[str, str], body: Any) -> tuple[int, Any]:
+        for route_method, pattern, name, handler in _ROUTES:
+            if route_method != method:
+                continue
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            with self._lock:
+                self.requests[name] += 1
+            if name in self.missing_routes:
+                return 404, {"message": "The target couldn't be found."}
+            with self._lock:
+                return handler(self, match, query, body)
+        with self._lock:
+            self.requests["unmatched"] += 1
+        return 404, {"message": f"no fake route for {method} {path}"}
+
+    def page(self, items: list[Any], query: dict[str, str]) -> list[Any]:
+        limit = min(int(query.get("limit", self.max_page_size)), self.max_page_size)
+        page = max(int(query.get("page", 1)), 1)
+        start = (page - 1) * limit
+        return items[start : start + limit]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    forge: FakeForgejo
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_PATCH(self) -> None:
+        self._dispatch("PATCH")
+
+    def log_message(self, *_args: object) -> None:
+        pass
+
+    def _dispatch(self, method: str) -> None:
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        body = json.loads(raw) if raw else None
+        if self.forge.latency_seconds:
+            time.sleep(self.forge.latency_seconds)
+        status, payload = self.forge.handle(method, parts.path, query, body)
+        if isinstance(payload, str):
+            encoded = payload.encode("utf-8")
+            content_type = "text/plain; charset=utf-8"
+        else:
+            encoded = json.dumps(payload).encode("utf-8")
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+
+def _repo(prefix: str = "/api/v1/repos") -> str:
+    return rf"{prefix}/(?P<owner>[^/]+)/(?P<repo>[^/]+)"
+
+
+def _current_user(_forge: FakeForgejo, _match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    return 200, {"id": 1, "login": OWNER}
+
+
+def _list_pulls(forge: FakeForgejo, _match: re.Match[str], query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    pulls = list(forge.data.pulls.values())
+    head = query.get("head", "")
+    if head:
+        branch = head.split(":", 1)[-1]
+        pulls = [pull for pull in pulls if pull["head"]["ref"] == branch]
+    state = query.get("state", "open")
+    if state != "all":
+        pulls = [pull for pull in pulls if pull["state"] == state]
+    return 200, forge.page(pulls, query)
+
+
+def _get_pull(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    pull = forge.data.pulls.get(int(match["index"]))
+    return (200, pull) if pull is not None else (404, {"message": "pull request not found"})
+
+
+def _update_pull(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], body: Any) -> tuple[int, Any]:
+    pull = forge.data.pulls.get(int(match["index"]))
+    if pull is None:
+        return 404, {"message": "pull request not found"}
+    pull.update({key: value for key, value in (body or {}).items() if key in ("body", "title", "state")})
+    return 201, pull
+
+
+def _pull_diff(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    diff = forge.data.diffs.get(int(match["index"]))
+    return (200, diff) if diff is not None else (404, "pull request not found")
+
+
+def _compare_diff(forge: FakeForgejo, _match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    return 200, forge.data.diffs.get(PR_NUMBER, "")
+
+
+def _list_reviews(forge: FakeForgejo, match: re.Match[str], query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    return 200, forge.page(forge.data.reviews.get(int(match["index"]), []), query)
+
+
+def _create_review(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], body: Any) -> tuple[int, Any]:
+    review = {
+        "id": forge.data.new_id(),
+        "state": str((body or {}).get("event", "COMMENT")),
+        "body": str((body or {}).get("body", "")),
+        "user": {"login": OWNER},
+        "submitted_at": STAMP,
+    }
+    forge.data.reviews.setdefault(int(match["index"]), []).append(review)
+    return 200, review
+
+
+def _review_comments(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    return 200, forge.data.review_comments.get(int(match["review_id"]), [])
+
+
+def _list_issue_comments(
+    forge: FakeForgejo, match: re.Match[str], query: dict[str, str], _body: Any
+) -> tuple[int, Any]:
+    return 200, forge.page(forge.data.issue_comments.get(int(match["index"]), []), query)
+
+
+def _create_comment(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], body: Any) -> tuple[int, Any]:
+    comment = {
+        "id": forge.data.new_id(),
+        "body": str((body or {}).get("body", "")),
+        "path": str((body or {}).get("path", "")),
+        "line": (body or {}).get("line"),
+        "user": {"login": OWNER},
+        "created_at": STAMP,
+    }
+    forge.data.issue_comments.setdefault(int(match["index"]), []).append(comment)
+    return 201, comment
+
+
+def _list_issues(forge: FakeForgejo, _match: re.Match[str], query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    state = query.get("state", "open")
+    issues = [issue for issue in forge.data.issues.values() if state == "all" or issue["state"] == state]
+    return 200, forge.page(issues, query)
+
+
+def _get_issue(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    issue = forge.data.issues.get(int(match["index"]))
+    return (200, issue) if issue is not None else (404, {"message": "issue not found"})
+
+
+def _update_issue(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], body: Any) -> tuple[int, Any]:
+    issue = forge.data.issues.get(int(match["index"]))
+    if issue is None:
+        return 404, {"message": "issue not found"}
+    issue.update({key: value for key, value in (body or {}).items() if key in ("body", "title", "state")})
+    return 201, issue
+
+
+def _blocked_by(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    numbers = forge.data.blocked_by.get(int(match["index"]), [])
+    return 200, [forge.data.issues[number] for number in numbers if number in forge.data.issues]
+
+
+def _blocks(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], _body: Any) -> tuple[int, Any]:
+    index = int(match["index"])
+    numbers = [number for number, blockers in forge.data.blocked_by.items() if index in blockers]
+    return 200, [forge.data.issues[number] for number in sorted(numbers)]
+
+
+def _add_dependency(forge: FakeForgejo, match: re.Match[str], _query: dict[str, str], body: Any) -> tuple[int, Any]:
+    dependency = (body or {}).get("index")
+    if not isinstance(dependency, int) or dependency not in forge.data.issues:
+        return 422, {"message": "invalid dependency"}
+    forge.data.blocked_by.setdefault(int(match["index"]), []).append(dependency)
+    return 201, forge.data.issues[int(match["index"])]
+
+
+_ISSUE = _repo() + r"/issues/(?P<index>\d+)"
+_PULL = _repo() + r"/pulls/(?P<index>\d+)"
+_ROUTES: list[tuple[str, re.Pattern[str], str, Any]] = [
+    (method, re.compile(pattern), name, handler)
+    for method, pattern, name, handler in (
+        ("GET", r"/api/v1/user", "user", _current_user),
+        ("GET", _repo() + r"/pulls", "pulls", _list_pulls),
+        ("GET", _PULL + r"\.diff", "pull_diff", _pull_diff),
+        ("GET", _PULL, "pull", _get_pull),
+        ("PATCH", _PULL, "pull_update", _update_pull),
+        ("GET", _PULL + r"/reviews", "reviews", _list_reviews),
+        ("POST", _PULL + r"/reviews", "review_create", _create_review),
+        ("GET", _PULL + r"/reviews/(?P<review_id>\d+)/comments", "review_comments", _review_comments),
+        ("GET", _PULL + r"/comments", "pull_comments", _list_issue_comments),
+        ("POST", _PULL + r"/comments", "pull_comment_create", _create_comment),
+        ("GET", _repo() + r"/issues", "issues", _list_issues),
+        ("GET", _ISSUE, "issue", _get_issue),
+        ("PATCH", _ISSUE, "issue_update", _update_issue),
+        ("GET", _ISSUE + r"/comments", "issue_comments", _list_issue_comments),
+        ("POST", _ISSUE + r"/comments", "issue_comment_create", _create_comment),
+        ("GET", _ISSUE + r"/dependencies", "dependencies", _blocked_by),
+        ("POST", _ISSUE + r"/dependencies", "dependency_create", _add_dependency),
+        ("GET", _ISSUE + r"/blocked_by", "blocked_by", _blocked_by),
+        ("GET", _ISSUE + r"/blockers", "blockers", _blocked_by),
+        ("GET", _ISSUE + r"/blocks", "blocks", _blocks),
+        ("GET", _ISSUE + r"/blocking", "blocking", _blocks),
+        ("GET", _repo(prefix="") + r"/compare/[^/]+\.diff", "compare_diff", _compare_diff),
+    )
+]
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from typer.testing import CliRunner
+
+from benchmarks.fake_forgejo import BRANCH, OWNER, REPO, FakeForgejo, seed_data
+from joan import app as joan_app
+from joan.core.models import Config, ForgejoConfig, RemotesConfig
+from joan.shell.config_io import write_config
+from joan.shell.tracing import start_tracing, stop_tracing
+
+SCALES = (10, 100, 1000)
+# Scales checked by the pytest gate; 1000 is left to manual runs to keep the suite quick.
+GATE_SCALES = (10, 100)
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+SCENARIOS: dict[str, list[str]] = {
+    "pr sync": ["pr", "sync"],
+    "pr comments": ["pr", "comments"],
+    "issue get-work": ["issue", "get-work", "--limit", "500"],
+    "issue graph": ["issue", "graph", "{root}", "--depth", "2"],
+    "review-memory ingest": ["review-memory", "ingest"],
+}
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    scenario: str
+    scale: int
+    wall_seconds: float
+    requests: int
+    git_calls: int
+    requests_by_route: dict[str, int]
+
+
+@contextmanager
+def bench_workspace(forge_url: str) -> Iterator[Path]:
+    """A throwaway git checkout on the benchmark branch with joan pointed at ``forge_url``."""
+    with tempfile.TemporaryDirectory(prefix="joan-bench-") as raw:
+        root = Path(raw)
+        subprocess.run(["git", "init", "-q", "-b", BRANCH, str(root)], check=True)
+        subprocess.run(
+            ["git", "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+            + ["commit", "-q", "--allow-empty", "-m", "bench"],
+            cwd=root,
+            check=True,
+        )
+        write_config(
+            Config(forgejo=ForgejoConfig(url=forge_url, token="bench-token", owner=OWNER, repo=REPO), remotes=RemotesConfig()),
+            root,
+        )
+        previous = Path.cwd()
+        os.chdir(root)
+        try:
+            yield root
+        finally:
+            os.chdir(previous)
+
+
+def run_benchmark(
+    scenario: str,
+    scale: int,
+    *,
+    repeat: int = 3,
+    latency_seconds: float = 0.0,
+    body_bytes: int = 200,
+    missing_routes: set[str] | None = None,
+) -> BenchmarkResult:
+    args = [part.format(root=max(scale // 2, 1)) for part in SCENARIOS[scenario]]
+    runner = CliRunner()
+    forge = FakeForgejo(seed_data(scale, body_bytes), latency_seconds=latency_seconds, missing_routes=missing_routes)
+    timings: list[float] = []
+    git_calls = 0
+    with forge, bench_workspace(forge.url):
+        for _ in range(repeat):
+            forge.reset_counts()
+            # Spans count git subprocesses; the tracer's own cost is small next to a fork.
+            start_tracing()
+            started = time.perf_counter()
+            try:
+                result = runner.invoke(joan_app, args)
+            finally:
+                timings.append(time.perf_counter() - started)
+                tracer = stop_tracing()
+            git_calls = sum(1 for event in tracer.events if event["cat"] == "git") if tracer is not None else 0
+            if result.exit_code != 0:
+                raise RuntimeError(f"`joan {' '.join(args)}` exited {result.exit_code}: {result.output}")
+        by_route = dict(sorted(forge.requests.items()))
+    return BenchmarkResult(
+        scenario=scenario,
+        scale=scale,
+        wall_seconds=round(statistics.median(timings), 4),
+        requests=sum(by_route.values()),
+        git_calls=git_calls,
+        requests_by_route=by_route,
+    )
+
+
+def baseline_key(scenario: str, scale: int) -> str:
+    return f"{scenario}@{scale}"
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def write_baselines(results: list[BenchmarkResult], path: Path = BASELINES_PATH) -> None:
+    current = load_baselines(path) if path.exists() else {"wall_tolerance": 3.0, "wall_slack_seconds": 0.25}
+    entries = dict(current.get("results", {}))
+    for result in results:
+        entries[baseline_key(result.scenario, result.scale)] = {
+            "requests": result.requests,
+            "git_calls": result.git_calls,
+            "wall_seconds": result.wall_seconds,
+        }
+    current["results"] = dict(sorted(entries.items()))
+    path.write_text(json.dumps(current, indent=2) + "\n", encoding="utf-8")
+
+
+def compare_to_baseline(result: BenchmarkResult, baselines: dict[str, Any]) -> list[str]:
+    """Regressions of ``result`` against the committed baseline; empty when it passes.
+
+    Request and git counts must not grow at all. Wall time gets a multiplier
+    plus fixed slack, since baselines are recorded on a different machine.
+    """
+    key = baseline_key(result.scenario, result.scale)
+    baseline = baselines.get("results", {}).get(key)
+    if baseline is None:
+        return [f"{key}: no baseline; run `python -m benchmarks.run --update-baselines`"]
+    problems: list[str] = []
+    if result.requests > baseline["requests"]:
+        problems.append(f"{key}: {result.requests} API requests, baseline {baseline['requests']}")
+    if result.git_calls > baseline["git_calls"]:
+        problems.append(f"{key}: {result.git_calls} git calls, baseline {baseline['git_calls']}")
+    limit = baseline["wall_seconds"] * float(baselines.get("wall_tolerance", 3.0))
+    limit += float(baselines.get("wall_slack_seconds", 0.25))
+    if result.wall_seconds > limit:
+        problems.append(f"{key}: p50 {result.wall_seconds:.3f}s, limit {limit:.3f}s")
+    return problems
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Time joan CLI commands against an in-process fake Forgejo.")
+    parser.add_argument("--scale", type=int, action="append", help="Item count to seed; repeatable. Default 10/100/1000.")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Scenario to run; repeatable.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median is reported.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay added to every fake API response.")
+    parser.add_argument("--body-bytes", type=int, default=200, help="Size of issue, comment and review bodies.")
+    parser.add_argument("--missing", default="", help="Comma-separated optional routes that should answer 404.")
+    parser.add_argument("--json", type=Path, help="Also write results as JSON to this path.")
+    parser.add_argument(
+        "--update-baselines",
+        action="store_true",
+        help=f"Record results in {BASELINES_PATH.name} for the pytest gate. Defaults to the gate scales.",
+    )
+    options = parser.parse_args(argv)
+
+    missing = {name.strip() for name in options.missing.split(",") if name.strip()}
+    results = [
+        run_benchmark(
+            scenario,
+            scale,
+            repeat=options.repeat,
+            latency_seconds=options.latency_ms / 1000,
+            body_bytes=options.body_bytes,
+            missing_routes=missing,
+        )
+        for scenario in options.scenario or list(SCENARIOS)
+        for scale in options.scale or (GATE_SCALES if options.update_baselines else SCALES)
+    ]
+
+    print(f"{'scenario':<24}{'scale':>8}{'wall (s)':>12}{'requests':>10}{'git':>6}")
+    for result in results:
+        print(
+            f"{result.scenario:<24}{result.scale:>8}{result.wall_seconds:>12.4f}"
+            f"{result.requests:>10}{result.git_calls:>6}"
+        )
+    if options.json is not None:
+        options.json.write_text(json.dumps([asdict(result) for result in results], indent=2) + "\n", encoding="utf-8")
+    if options.update_baselines:
+        write_baselines(results)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
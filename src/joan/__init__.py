@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import importlib.metadata
+import sys
+from pathlib import Path
 
 import typer
 
+from joan.cli._common import set_json_mode
 from joan.cli.api import api_command
 from joan.cli.doctor import app as doctor_app
 from joan.cli.issue import app as issue_app
@@ -18,6 +21,9 @@ from joan.cli.ssh import app as ssh_app
 from joan.cli.skills import app as skills_app
 from joan.cli.task import app as task_app
 from joan.cli.worktree import app as worktree_app
+from joan.shell.forgejo_client import add_request_hook, remove_request_hook
+from joan.shell.request_trace import RequestTrace
+from joan.shell.tracing import span, start_tracing, stop_tracing
 
 app = typer.Typer(
     help=(
@@ -41,6 +47,59 @@ app.add_typer(worktree_app, name="worktree")
 app.command("ship", help="Create or refresh an upstream publish branch from the current task's Joan stage branch.")(ship_command)
 
 
+@app.callback()
+def main_callback(
+    ctx: typer.Context,
+    trace: bool = typer.Option(
+        False,
+        "--trace",
+        envvar="JOAN_TRACE",
+        help="Print a per-endpoint summary of Forgejo API calls to stderr when the command ends.",
+    ),
+    trace_file: Path | None = typer.Option(
+        None,
+        "--trace-file",
+        envvar="JOAN_TRACE_FILE",
+        help="Append one JSON line per Forgejo API call to this file.",
+    ),
+    trace_events: Path | None = typer.Option(
+        None,
+        "--trace-events",
+        envvar="JOAN_TRACE_EVENTS",
+        help="Write git, HTTP, lock and agent spans to this file as Chrome trace-event JSON.",
+    ),
+    compact: bool = typer.Option(False, "--compact", help="Print JSON output on a single line."),
+    ndjson: bool = typer.Option(False, "--ndjson", help="Print JSON lists as one compact object per line."),
+) -> None:
+    if compact and ndjson:
+        raise typer.BadParameter("--compact and --ndjson cannot be combined")
+    set_json_mode("ndjson" if ndjson else "compact" if compact else "pretty")
+
+    if trace or trace_file is not None:
+        request_trace = RequestTrace(jsonl_path=trace_file)
+        add_request_hook(request_trace)
+
+        def finish_request_trace() -> None:
+            remove_request_hook(request_trace)
+            if trace:
+                request_trace.write_summary(sys.stderr)
+
+        ctx.call_on_close(finish_request_trace)
+
+    if trace_events is not None:
+
+        def finish_trace_events() -> None:
+            tracer = stop_tracing()
+            if tracer is not None:
+                tracer.write(trace_events)
+
+        # Context cleanups run last-in first-out, so the command span closes before the file is written.
+        ctx.call_on_close(finish_trace_events)
+        start_tracing()
+        command_span = ctx.with_resource(span(f"joan {ctx.invoked_subcommand or ''}".strip(), "cli"))
+        command_span["argv"] = sys.argv[1:]
+
+
 @app.command()
 def version() -> None:
     """Print the installed joan version."""
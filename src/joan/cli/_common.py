@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-import json
+from collections.abc import Iterable
 from pathlib import Path
 
 import typer
 
+from joan.core import json_codec
 from joan.core.forgejo import parse_pr_response
+from joan.core.json_codec import JsonMode
 from joan.core.models import Config, PullRequest
 from joan.shell.agent_config_io import read_agent_config
 from joan.shell.config_io import read_config
@@ -25,7 +27,7 @@ def load_config_or_exit() -> Config:
 
 
 def forgejo_client(config: Config) -> ForgejoClient:
-    return ForgejoClient(config.forgejo.url, config.forgejo.token)
+    return ForgejoClient(config.forgejo.url, config.forgejo.token, http=config.forgejo.http)
 
 
 def forgejo_client_for_agent_or_exit(config: Config, agent_name: str) -> ForgejoClient:
@@ -37,7 +39,7 @@ def forgejo_client_for_agent_or_exit(config: Config, agent_name: str) -> Forgejo
     except Exception as exc:  # noqa: BLE001
         typer.echo(f"Failed to read agent config '{agent_name}': {exc}", err=True)
         raise typer.Exit(code=2)
-    return ForgejoClient(config.forgejo.url, agent_config.forgejo.token)
+    return ForgejoClient(config.forgejo.url, agent_config.forgejo.token, http=config.forgejo.http)
 
 
 def current_branch() -> str:
@@ -85,5 +87,26 @@ def current_pr_or_exit(
     return parse_pr_response(pulls[0])
 
 
+_json_mode: JsonMode = "pretty"
+
+
+def set_json_mode(mode: JsonMode) -> None:
+    global _json_mode
+    _json_mode = mode
+
+
 def print_json(data: object) -> None:
-    typer.echo(json.dumps(data, indent=2))
+    typer.echo(json_codec.dumps(data, _json_mode))
+
+
+def streaming_json() -> bool:
+    return _json_mode == "ndjson"
+
+
+def print_json_items(items: Iterable[object]) -> None:
+    """Print a JSON list; with --ndjson each item is written as soon as it is produced."""
+    if not streaming_json():
+        print_json(list(items))
+        return
+    for item in items:
+        typer.echo(json_codec.dumps(item, "compact"))
@@ -5,7 +5,8 @@ from typing import Optional
 
 import typer
 
-from joan.cli._common import forgejo_client, load_config_or_exit
+from joan.cli._common import forgejo_client, load_config_or_exit, print_json
+from joan.core import json_codec
 
 
 def api_command(
@@ -88,10 +89,11 @@ def _send_api_request(method: str, path: str, data: str | None, query: list[str]
     body = response.text.strip()
     if body:
         try:
-            parsed = json.loads(body)
-            typer.echo(json.dumps(parsed, indent=2))
-        except json.JSONDecodeError:
+            parsed = json_codec.loads(body)
+        except ValueError:
             typer.echo(body)
+        else:
+            print_json(parsed)
 
     if not response.is_success:
         raise typer.Exit(code=1)
@@ -118,11 +120,11 @@ def _api_swagger(path: str | None) -> None:
             errors.append(f"{resolved}: empty response body")
             continue
         try:
-            parsed = json.loads(body)
-        except json.JSONDecodeError:
+            parsed = json_codec.loads(body)
+        except ValueError:
             errors.append(f"{resolved}: response was not JSON")
             continue
-        typer.echo(json.dumps(parsed, indent=2))
+        print_json(parsed)
         return
 
     typer.echo("Unable to fetch a JSON swagger document from known endpoints:", err=True)
@@ -94,7 +94,7 @@ def _check_review_remote(config: Config, results: list[CheckResult]) -> None:
 
 
 def _check_forgejo(config: Config, results: list[CheckResult], user: str | None) -> None:
-    client = ForgejoClient(config.forgejo.url, config.forgejo.token)
+    client = ForgejoClient(config.forgejo.url, config.forgejo.token, http=config.forgejo.http)
 
     try:
         current_user = client.get_current_user()
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
 from collections import deque
+from collections.abc import Iterable, Iterator
 from typing import Any
 
 import typer
 
-from joan.cli._common import forgejo_client, load_config_or_exit, print_json
+from joan.cli._common import forgejo_client, load_config_or_exit, print_json, print_json_items, streaming_json
 
 app = typer.Typer(help="Create, comment, read comments, link, read, close, and graph Forgejo issues.")
 
@@ -45,10 +46,6 @@ def _normalize_comment(comment: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def _normalize_comments(comments: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    return [_normalize_comment(comment) for comment in comments]
-
-
 def _sort_by_number(items: list[dict[str, Any]]) -> list[dict[str, Any]]:
     return sorted(items, key=lambda item: (item.get("number") is None, item.get("number", 0)))
 
@@ -118,7 +115,7 @@ def issue_comments(
     config = load_config_or_exit()
     client = forgejo_client(config)
     comments = client.list_issue_comments(config.forgejo.owner, config.forgejo.repo, issue)
-    print_json(_normalize_comments(comments))
+    print_json_items(_normalize_comment(comment) for comment in comments)
 
 
 @app.command("read", help="Read one issue or list issues.")
@@ -133,8 +130,8 @@ def issue_read(
         raw = client.get_issue(config.forgejo.owner, config.forgejo.repo, issue)
         print_json(_normalize_issue(raw))
         return
-    issues = client.list_issues(config.forgejo.owner, config.forgejo.repo, state=state, limit=limit)
-    print_json(_normalize_issues(issues))
+    issues = client.iter_issues(config.forgejo.owner, config.forgejo.repo, state=state, limit=limit)
+    print_json_items(_normalize_issue(issue) for issue in issues)
 
 
 @app.command("blocked-by", help="List the issues that block ISSUE.")
@@ -220,34 +217,18 @@ def issue_get_work(
     config = load_config_or_exit()
     client = forgejo_client(config)
 
-    issues = client.list_issues(config.forgejo.owner, config.forgejo.repo, state="open", limit=limit)
-    issues = [issue for issue in issues if not issue.get("pull_request")]
+    issues = client.iter_issues(config.forgejo.owner, config.forgejo.repo, state="open", limit=limit)
+    work = _classify_work(client, config.forgejo.owner, config.forgejo.repo, issues)
+
+    if streaming_json():
+        # One line per issue as soon as its blockers are known, in the order Forgejo lists them.
+        print_json_items(_cap_ready(work, ready_limit))
+        return
 
     ready: list[dict[str, Any]] = []
     blocked: list[dict[str, Any]] = []
-
-    for issue in issues:
-        issue_number = _issue_number(issue)
-        if issue_number is None:
-            continue
-
-        blockers = client.list_issue_blocked_by(config.forgejo.owner, config.forgejo.repo, issue_number)
-        open_blockers = [
-            _normalize_issue(blocker)
-            for blocker in blockers
-            if str(blocker.get("state", "")).lower() != "closed"
-        ]
-        open_blockers = _sort_by_number(open_blockers)
-
-        item = {
-            "issue": _normalize_issue(issue),
-            "open_blockers": open_blockers,
-            "open_blocker_count": len(open_blockers),
-        }
-        if open_blockers:
-            blocked.append(item)
-        else:
-            ready.append(item)
+    for item in work:
+        (blocked if item.pop("status") == "blocked" else ready).append(item)
 
     ready_sorted = sorted(
         ready,
@@ -261,7 +242,7 @@ def issue_get_work(
     print_json(
         {
             "summary": {
-                "open_issue_count": len(issues),
+                "open_issue_count": len(ready) + len(blocked),
                 "ready_count": len(ready_sorted),
                 "blocked_count": len(blocked_sorted),
             },
@@ -269,3 +250,42 @@ def issue_get_work(
             "blocked": blocked_sorted,
         }
     )
+
+
+def _classify_work(
+    client: Any,
+    owner: str,
+    repo: str,
+    issues: Iterable[dict[str, Any]],
+) -> Iterator[dict[str, Any]]:
+    for issue in issues:
+        if issue.get("pull_request"):
+            continue
+        issue_number = _issue_number(issue)
+        if issue_number is None:
+            continue
+
+        blockers = client.list_issue_blocked_by(owner, repo, issue_number)
+        open_blockers = [
+            _normalize_issue(blocker)
+            for blocker in blockers
+            if str(blocker.get("state", "")).lower() != "closed"
+        ]
+        open_blockers = _sort_by_number(open_blockers)
+
+        yield {
+            "status": "blocked" if open_blockers else "ready",
+            "issue": _normalize_issue(issue),
+            "open_blockers": open_blockers,
+            "open_blocker_count": len(open_blockers),
+        }
+
+
+def _cap_ready(work: Iterable[dict[str, Any]], ready_limit: int) -> Iterator[dict[str, Any]]:
+    ready = 0
+    for item in work:
+        if item["status"] == "ready":
+            ready += 1
+            if ready > ready_limit:
+                continue
+        yield item
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import secrets
+import signal
+import socket
 import string
 import threading
 from datetime import UTC, datetime
@@ -9,14 +11,25 @@ from pathlib import Path
 import typer
 
 from joan.core.models import AgentClaudeConfig, AgentConfig, AgentForgejoConfig, AgentServerConfig, AgentWorkerConfig, Config
-from joan.phil.worker import PTYAgentRunner, run_worker_loop
+from joan.phil.worker import (
+    AgentSessionPool,
+    PTYAgentRunner,
+    PTYAgentSession,
+    WorkerRegistration,
+    run_worker_loop,
+)
+from joan.phil.limits import ResourceLimits
+from joan.phil.worktrees import WorktreePool
 from joan.shell.agent_config_io import read_agent_config, write_agent_config
 from joan.shell.config_io import read_config
 from joan.shell.forgejo_client import ForgejoClient, ForgejoError
+from joan.shell.repo_state import repo_state_dir
 
 app = typer.Typer(help="Manage Phil, the local AI reviewer that reacts to Forgejo review requests.")
 
 _PHIL_USERNAME = "phil"
+_WORKER_CANCEL_TIMEOUT_SECONDS = 15.0
+_SERVER_STOP_TIMEOUT_SECONDS = 10.0
 
 
 def _generate_password(length: int = 32) -> str:
@@ -42,6 +55,69 @@ def _default_webhook_url(port: int) -> str:
     return f"http://host.docker.internal:{port}/webhook"
 
 
+def _phil_state_dir() -> Path:
+    return repo_state_dir(_repo_root(), for_write=True) / "phil"
+
+
+def _resource_limits(worker: AgentWorkerConfig) -> ResourceLimits:
+    return ResourceLimits(
+        max_memory_bytes=worker.max_memory_bytes,
+        max_cpu_seconds=worker.max_cpu_seconds,
+        max_open_files=worker.max_open_files,
+        max_processes=worker.max_processes,
+        cgroup_root=worker.cgroup_root,
+    )
+
+
+def _agent_runner(phil_config: AgentConfig, timeout: float) -> PTYAgentRunner | AgentSessionPool:
+    worker = phil_config.worker
+    limits = _resource_limits(worker)
+    if not worker.session_pool_size:
+        return PTYAgentRunner(worker.command, timeout, _repo_root(), limits)
+    workdir = _repo_root()
+    pool = AgentSessionPool(
+        worker.session_pool_size,
+        lambda: PTYAgentSession(
+            worker.command, timeout, worker.session_done_marker, worker.session_reset_input, workdir, limits
+        ),
+        max_jobs=worker.session_max_jobs,
+        max_rss_bytes=worker.session_max_rss_bytes,
+    )
+    pool.start()
+    return pool
+
+
+def _worktree_pool(joan_config: Config, phil_config: AgentConfig) -> WorktreePool | None:
+    size = phil_config.worker.worktree_pool_size
+    if not size:
+        return None
+    pool = WorktreePool(
+        _repo_root(),
+        _phil_state_dir() / "worktrees",
+        size,
+        remote=joan_config.remotes.review,
+        repo=f"{joan_config.forgejo.owner}/{joan_config.forgejo.repo}",
+    )
+    pool.start()
+    return pool
+
+
+def _close_runner(runner: PTYAgentRunner | AgentSessionPool) -> None:
+    if isinstance(runner, AgentSessionPool):
+        runner.close()
+
+
+def _worker_registration(phil_config: AgentConfig) -> WorkerRegistration:
+    worker = phil_config.worker
+    agent = Path(worker.command[0]).name if worker.command else ""
+    return WorkerRegistration(
+        name=worker.name or socket.gethostname(),
+        agent=agent,
+        repos=list(worker.repos),
+        token=worker.registration_token,
+    )
+
+
 def _load_configs() -> tuple[Config, AgentConfig]:
     try:
         joan_config = read_config(_repo_root())
@@ -142,24 +218,85 @@ def phil_serve(
     effective_host = host or phil_config.server.host
 
     typer.echo(f"Starting phil server on {effective_host}:{effective_port}")
-    app_instance = create_app(joan_config, phil_config)
+    app_instance = create_app(joan_config, phil_config, state_dir=_phil_state_dir())
     uvicorn.run(app_instance, host=effective_host, port=effective_port)
 
 
+class _WorkerHandle:
+    def __init__(self, thread: threading.Thread, stop_event: threading.Event, cancel_event: threading.Event) -> None:
+        self.thread = thread
+        self.stop_event = stop_event
+        self.cancel_event = cancel_event
+
+
+def _start_worker(
+    api_url: str,
+    runner: PTYAgentRunner | AgentSessionPool,
+    poll_interval: float,
+    joan_config: Config,
+    phil_config: AgentConfig,
+) -> _WorkerHandle:
+    stop_event = threading.Event()
+    cancel_event = threading.Event()
+    thread = threading.Thread(
+        target=run_worker_loop,
+        args=(api_url, runner, poll_interval, stop_event),
+        kwargs={
+            "registration": _worker_registration(phil_config),
+            "worktrees": _worktree_pool(joan_config, phil_config),
+            "cancel_event": cancel_event,
+        },
+        daemon=True,
+        name="phil-worker",
+    )
+    thread.start()
+    return _WorkerHandle(thread, stop_event, cancel_event)
+
+
+def _wait_for(thread: threading.Thread) -> None:
+    # Short joins keep the main thread responsive to Ctrl-C.
+    while thread.is_alive():
+        thread.join(timeout=0.5)
+
+
+def _drain_worker(worker: _WorkerHandle) -> None:
+    typer.echo("Finishing the current review. Press Ctrl-C again to cancel it and hand it back to the queue.")
+    worker.stop_event.set()
+    try:
+        _wait_for(worker.thread)
+    except KeyboardInterrupt:
+        typer.echo("Cancelling the current review.")
+        worker.cancel_event.set()
+        worker.thread.join(timeout=_WORKER_CANCEL_TIMEOUT_SECONDS)
+
+
+def _interrupt_on_sigterm() -> None:
+    # Treat `kill` like Ctrl-C so service managers get the same drain.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+
 @app.command("work", help="Run only Phil's worker loop. Use this when the webhook server is already running.")
 def phil_work(
     api_url: str | None = typer.Option(None, "--api-url", help="Worker API base URL. Defaults to the configured local Phil server."),
     poll_interval: float | None = typer.Option(None, "--poll-interval", help="Seconds between queue polls. Defaults to config."),
     timeout: float | None = typer.Option(None, "--timeout", help="Maximum seconds per review job. Defaults to config."),
 ) -> None:
-    _joan_config, phil_config = _load_configs()
+    joan_config, phil_config = _load_configs()
     effective_api_url = api_url or phil_config.worker.api_url or _worker_api_url(phil_config.server.host, phil_config.server.port)
     effective_poll_interval = poll_interval or phil_config.worker.poll_interval_seconds
     effective_timeout = timeout or phil_config.worker.timeout_seconds
 
     typer.echo(f"Starting phil worker against {effective_api_url}")
-    runner = PTYAgentRunner(phil_config.worker.command, effective_timeout, _repo_root())
-    run_worker_loop(effective_api_url, runner, effective_poll_interval)
+    _interrupt_on_sigterm()
+    runner = _agent_runner(phil_config, effective_timeout)
+    try:
+        worker = _start_worker(effective_api_url, runner, effective_poll_interval, joan_config, phil_config)
+        try:
+            _wait_for(worker.thread)
+        except KeyboardInterrupt:
+            _drain_worker(worker)
+    finally:
+        _close_runner(runner)
 
 
 @app.command("up", help="Run the Phil webhook server and one local worker together in a single process.")
@@ -181,21 +318,23 @@ def phil_up(
     effective_poll_interval = poll_interval or phil_config.worker.poll_interval_seconds
     effective_timeout = timeout or phil_config.worker.timeout_seconds
 
-    stop_event = threading.Event()
-    runner = PTYAgentRunner(phil_config.worker.command, effective_timeout, _repo_root())
-    worker_thread = threading.Thread(
-        target=run_worker_loop,
-        args=(effective_api_url, runner, effective_poll_interval, stop_event),
-        daemon=True,
-        name="phil-worker",
-    )
-    worker_thread.start()
-
     typer.echo(f"Starting phil up on {effective_host}:{effective_port}")
     typer.echo(f"Worker polling {effective_api_url}")
-    app_instance = create_app(joan_config, phil_config, worker_mode=True)
+    app_instance = create_app(joan_config, phil_config, worker_mode=True, state_dir=_phil_state_dir())
+    # The server runs off the main thread so Ctrl-C reaches us first: the worker
+    # drains (or hands its job back) while the server is still up to hear about it.
+    server = uvicorn.Server(uvicorn.Config(app_instance, host=effective_host, port=effective_port))
+    server_thread = threading.Thread(target=server.run, daemon=True, name="phil-server")
+    _interrupt_on_sigterm()
+    runner = _agent_runner(phil_config, effective_timeout)
+    server_thread.start()
     try:
-        uvicorn.run(app_instance, host=effective_host, port=effective_port)
+        worker = _start_worker(effective_api_url, runner, effective_poll_interval, joan_config, phil_config)
+        try:
+            _wait_for(server_thread)
+        except KeyboardInterrupt:
+            _drain_worker(worker)
     finally:
-        stop_event.set()
-        worker_thread.join(timeout=5)
+        server.should_exit = True
+        server_thread.join(timeout=_SERVER_STOP_TIMEOUT_SECONDS)
+        _close_runner(runner)
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
 
+import httpx
 import typer
 
 from joan.cli._common import (
@@ -11,19 +13,23 @@ from joan.cli._common import (
     forgejo_client,
     forgejo_client_for_agent_or_exit,
     load_config_or_exit,
+    print_json,
+    print_json_items,
 )
+from joan.core import json_codec
 from joan.core.forgejo import (
     build_create_pr_payload,
+    comment_payload,
     compute_sync_status,
     exclude_comments_by_author,
-    format_comments_json,
-    format_reviews_json,
-    parse_comments,
     parse_pr_response,
-    parse_reviews,
+    reviews_payload,
 )
 from joan.core.git import is_stage_branch, ls_remote_ref_args, push_branch_args, stage_branch_name
+from joan.core.models import Config
 from joan.core.pr_narrative import build_narrative_markdown, collect_changes, collect_commits, load_tests
+from joan.phil.pr_events import PullRequestEventsClient, PullRequestEventsError
+from joan.shell.forgejo_client import ForgejoClient, ForgejoError
 from joan.shell.git_runner import run_git
 
 app = typer.Typer(help="Open Forgejo PRs, inspect review state, and merge approved work into Joan stage branches.")
@@ -124,27 +130,160 @@ def pr_open(
     )
 
 
+WATCH_UNTIL = ("approved", "comments")
+# Exit codes for `pr sync --watch`; 0 means the --until condition was met. Like
+# current_pr_or_exit, a failed Forgejo request is 2.
+EXIT_WATCH_ERROR = 2
+EXIT_WATCH_TIMEOUT = 3
+EXIT_WATCH_INTERRUPTED = 130
+
+
+def _valid_watch_until(value: str | None) -> str | None:
+    if value is not None and value not in WATCH_UNTIL:
+        raise typer.BadParameter("until must be one of: approved, comments")
+    return value
+
+
 @app.command("sync", help="Read approval state and unresolved comment count for the open PR on the current branch.")
-def pr_sync() -> None:
+def pr_sync(
+    watch: bool = typer.Option(
+        False,
+        "--watch",
+        help="Keep polling and print one NDJSON line each time the state changes.",
+    ),
+    until: str | None = typer.Option(
+        None,
+        "--until",
+        callback=_valid_watch_until,
+        help="Exit 0 once the PR is approved or has unresolved feedback (approved|comments). Implies --watch.",
+    ),
+    interval: float = typer.Option(5.0, "--interval", min=0.1, help="Seconds between polls right after a change."),
+    max_interval: float = typer.Option(
+        60.0,
+        "--max-interval",
+        min=0.1,
+        help="Longest wait between polls while nothing changes.",
+    ),
+    timeout: float = typer.Option(
+        0.0,
+        "--timeout",
+        min=0.0,
+        help="Give up with exit code 3 after this many seconds; 0 waits forever.",
+    ),
+    phil_url: str | None = typer.Option(
+        None,
+        "--phil-url",
+        envvar="JOAN_PHIL_URL",
+        help="Phil server to long-poll for webhook events, so a review wakes the watch before the next poll.",
+    ),
+) -> None:
     config = load_config_or_exit()
     client = forgejo_client(config)
     pr = current_pr_or_exit(config)
 
-    reviews = parse_reviews(client.get_reviews(config.forgejo.owner, config.forgejo.repo, pr.number))
-    comments = parse_comments(client.get_comments(config.forgejo.owner, config.forgejo.repo, pr.number))
+    if not (watch or until):
+        print_json(_sync_state(client, config, pr.number))
+        return
+    code = _watch_sync(client, config, pr.number, until, interval, max(interval, max_interval), timeout, phil_url)
+    raise typer.Exit(code=code)
+
+
+def _sync_state(client: ForgejoClient, config: Config, pr_number: int) -> dict[str, object]:
+    reviews = client.fetch_reviews(config.forgejo.owner, config.forgejo.repo, pr_number)
+    comments = client.fetch_comments(config.forgejo.owner, config.forgejo.repo, pr_number)
     comments = exclude_comments_by_author(comments, config.forgejo.owner)
     sync = compute_sync_status(reviews, comments)
-
-    typer.echo(
-        json.dumps(
-            {
-                "approved": sync.approved,
-                "unresolved_comments": sync.unresolved_comments,
-                "latest_review_state": sync.latest_review_state,
-            },
-            indent=2,
-        )
-    )
+    return {
+        "approved": sync.approved,
+        "unresolved_comments": sync.unresolved_comments,
+        "latest_review_state": sync.latest_review_state,
+    }
+
+
+def _watch_condition_met(until: str | None, state: dict[str, object]) -> bool:
+    if until == "approved":
+        return bool(state["approved"])
+    if until == "comments":
+        return bool(state["unresolved_comments"]) or state["latest_review_state"] == "REQUEST_CHANGES"
+    return False
+
+
+def _watch_sync(
+    client: ForgejoClient,
+    config: Config,
+    pr_number: int,
+    until: str | None,
+    interval: float,
+    max_interval: float,
+    timeout: float,
+    phil_url: str | None,
+) -> int:
+    """Poll until ``until`` holds, printing each distinct state once; returns the exit code."""
+    owner, repo = config.forgejo.owner, config.forgejo.repo
+    deadline = _monotonic() + timeout if timeout > 0 else None
+    events = _PhilEvents(phil_url, owner, repo, pr_number) if phil_url else None
+    delay = interval
+    last: dict[str, object] | None = None
+    try:
+        with client.session():
+            while True:
+                # Drop the short-lived read cache; unchanged resources still come back as cheap 304s.
+                client.clear_cache()
+                try:
+                    state = _sync_state(client, config, pr_number)
+                except (ForgejoError, httpx.HTTPError) as exc:
+                    typer.echo(f"Failed to read PR #{pr_number}: {exc}", err=True)
+                    return EXIT_WATCH_ERROR
+                if state != last:
+                    typer.echo(json_codec.dumps(state, "compact"))
+                    last = state
+                    delay = interval
+                else:
+                    delay = min(delay * 1.5, max_interval)
+                if _watch_condition_met(until, state):
+                    return 0
+                wait = delay
+                if deadline is not None:
+                    remaining = deadline - _monotonic()
+                    if remaining <= 0:
+                        return EXIT_WATCH_TIMEOUT
+                    wait = min(wait, remaining)
+                if events is None or not events.wait(wait):
+                    _sleep(wait)
+    except KeyboardInterrupt:
+        return EXIT_WATCH_INTERRUPTED
+
+
+class _PhilEvents:
+    """Long-polls phil for webhook events on one PR; falls back to plain sleeping if phil is unreachable."""
+
+    def __init__(self, url: str, owner: str, repo: str, pr_number: int) -> None:
+        self._client = PullRequestEventsClient(url)
+        self._key = (owner, repo, pr_number)
+        self._seq = -1
+        self._failed = False
+
+    def wait(self, seconds: float) -> bool:
+        """Block for up to ``seconds`` or until an event arrives; False if phil could not be asked."""
+        if self._failed:
+            return False
+        try:
+            if self._seq < 0:
+                self._seq = self._client.wait(*self._key, timeout=0)
+            self._seq = self._client.wait(*self._key, since=self._seq, timeout=min(seconds, 300.0))
+        except (httpx.HTTPError, PullRequestEventsError, ValueError, KeyError) as exc:
+            typer.echo(f"Phil event wait failed, polling only: {exc}", err=True)
+            self._failed = True
+            return False
+        return True
+
+
+def _monotonic() -> float:
+    return time.monotonic()
+
+
+def _sleep(seconds: float) -> None:
+    time.sleep(seconds)
 
 
 @app.command(
@@ -175,9 +314,12 @@ def pr_comments(
     client = forgejo_client(config)
     pr = current_pr_or_exit(config, pr_number=pr_number, branch=branch.strip() if branch else None)
 
-    comments = parse_comments(client.get_comments(config.forgejo.owner, config.forgejo.repo, pr.number))
-    comments = exclude_comments_by_author(comments, config.forgejo.owner)
-    typer.echo(format_comments_json(comments, include_resolved=all_comments))
+    comments = client.iter_comments(config.forgejo.owner, config.forgejo.repo, pr.number)
+    print_json_items(
+        comment_payload(comment)
+        for comment in comments
+        if comment.author != config.forgejo.owner and (all_comments or not comment.resolved)
+    )
 
 
 @app.command("reviews", help="List review submissions (with body text) for the open PR on the current branch.")
@@ -186,8 +328,8 @@ def pr_reviews() -> None:
     client = forgejo_client(config)
     pr = current_pr_or_exit(config)
 
-    reviews = parse_reviews(client.get_reviews(config.forgejo.owner, config.forgejo.repo, pr.number))
-    typer.echo(format_reviews_json(reviews))
+    reviews = client.fetch_reviews(config.forgejo.owner, config.forgejo.repo, pr.number)
+    print_json(reviews_payload(reviews))
 
 
 @comment_app.command("resolve")
@@ -257,8 +399,8 @@ def pr_finish() -> None:
         )
         raise typer.Exit(code=1)
 
-    reviews = parse_reviews(client.get_reviews(config.forgejo.owner, config.forgejo.repo, pr.number))
-    comments = parse_comments(client.get_comments(config.forgejo.owner, config.forgejo.repo, pr.number))
+    reviews = client.fetch_reviews(config.forgejo.owner, config.forgejo.repo, pr.number)
+    comments = client.fetch_comments(config.forgejo.owner, config.forgejo.repo, pr.number)
     comments = exclude_comments_by_author(comments, config.forgejo.owner)
     sync = compute_sync_status(reviews, comments)
     if not sync.approved:
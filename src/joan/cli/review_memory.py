@@ -5,7 +5,7 @@ from pathlib import Path
 import typer
 
 from joan.cli._common import current_pr_or_exit, forgejo_client, load_config_or_exit, print_json
-from joan.core.forgejo import exclude_comments_by_author, parse_comments, parse_reviews
+from joan.core.forgejo import exclude_comments_by_author
 from joan.core.review_memory import (
     filter_rules_by_path,
     ingest_feedback,
@@ -26,8 +26,8 @@ def review_memory_ingest(
     client = forgejo_client(config)
     pr = current_pr_or_exit(config, pr_number=pr_number)
 
-    reviews = parse_reviews(client.get_reviews(config.forgejo.owner, config.forgejo.repo, pr.number))
-    comments = parse_comments(client.get_comments(config.forgejo.owner, config.forgejo.repo, pr.number))
+    reviews = client.fetch_reviews(config.forgejo.owner, config.forgejo.repo, pr.number)
+    comments = client.fetch_comments(config.forgejo.owner, config.forgejo.repo, pr.number)
     comments = exclude_comments_by_author(comments, config.forgejo.owner)
 
     cwd = Path.cwd()
@@ -6,11 +6,19 @@ from joan.core.models import (
     AgentClaudeConfig,
     AgentConfig,
     AgentForgejoConfig,
+    AgentQueueConfig,
+    AgentRepoConfig,
+    AgentReviewConfig,
     AgentServerConfig,
     AgentWorkerConfig,
+    default_priority_labels,
+    default_review_skip_globs,
     default_worker_command,
 )
 
+SCHEDULERS = ("fifo", "priority", "fair_share")
+OVERFLOW_POLICIES = ("reject", "shed")
+
 
 class AgentConfigError(ValueError):
     pass
@@ -39,7 +47,13 @@ def parse_agent_config(raw_toml: str, name: str) -> AgentConfig:
         port=int(server_data.get("port", 9000)),
         host=str(server_data.get("host", "0.0.0.0")),
         webhook_secret=str(server_data.get("webhook_secret", "")),
+        delivery_ttl_seconds=int(server_data.get("delivery_ttl_seconds", 24 * 60 * 60)),
+        delivery_max_entries=int(server_data.get("delivery_max_entries", 10000)),
+        persist_deliveries=bool(server_data.get("persist_deliveries", False)),
+        allow_unlisted_repos=bool(server_data.get("allow_unlisted_repos", True)),
     )
+    if server.delivery_ttl_seconds < 0 or server.delivery_max_entries < 0:
+        raise AgentConfigError("server.delivery_ttl_seconds and server.delivery_max_entries cannot be negative")
 
     claude_data = data.get("claude", {})
     if claude_data is None:
@@ -48,7 +62,13 @@ def parse_agent_config(raw_toml: str, name: str) -> AgentConfig:
         raise AgentConfigError("[claude] must be a table")
     claude = AgentClaudeConfig(
         model=str(claude_data.get("model", "claude-sonnet-4-6")),
+        timeout_seconds=float(claude_data.get("timeout_seconds", 120.0)),
+        max_concurrent=int(claude_data.get("max_concurrent", 2)),
+        max_attempts=int(claude_data.get("max_attempts", 3)),
+        retry_backoff_seconds=float(claude_data.get("retry_backoff_seconds", 5.0)),
     )
+    if claude.timeout_seconds <= 0 or claude.max_concurrent < 1 or claude.max_attempts < 1:
+        raise AgentConfigError("claude.timeout_seconds, claude.max_concurrent and claude.max_attempts must be positive")
 
     worker_data = data.get("worker", {})
     if worker_data is None:
@@ -60,23 +80,202 @@ def parse_agent_config(raw_toml: str, name: str) -> AgentConfig:
     if not isinstance(raw_command, list) or not raw_command or not all(isinstance(part, str) for part in raw_command):
         raise AgentConfigError("worker.command must be a non-empty array of strings")
 
+    raw_worker_repos = worker_data.get("repos", [])
+    if not isinstance(raw_worker_repos, list) or not all(isinstance(item, str) for item in raw_worker_repos):
+        raise AgentConfigError("worker.repos must be an array of \"owner/name\" strings")
+
+    session_pool_size = int(worker_data.get("session_pool_size", 0))
+    session_max_jobs = int(worker_data.get("session_max_jobs", 20))
+    session_max_rss_bytes = int(worker_data.get("session_max_rss_bytes", 0))
+    if session_pool_size < 0 or session_max_jobs < 0 or session_max_rss_bytes < 0:
+        raise AgentConfigError(
+            "worker.session_pool_size, worker.session_max_jobs and worker.session_max_rss_bytes cannot be negative"
+        )
+    session_done_marker = str(worker_data.get("session_done_marker", ""))
+    if session_pool_size and not session_done_marker:
+        raise AgentConfigError("worker.session_done_marker is required when worker.session_pool_size is set")
+    worktree_pool_size = int(worker_data.get("worktree_pool_size", 0))
+    if worktree_pool_size < 0:
+        raise AgentConfigError("worker.worktree_pool_size cannot be negative")
+    if worktree_pool_size and session_pool_size:
+        # A warm session is tied to the directory it started in.
+        raise AgentConfigError("worker.worktree_pool_size cannot be combined with worker.session_pool_size")
+    limit_values = {
+        key: int(worker_data.get(key, 0))
+        for key in ("max_memory_bytes", "max_cpu_seconds", "max_open_files", "max_processes")
+    }
+    if any(value < 0 for value in limit_values.values()):
+        raise AgentConfigError(
+            "worker.max_memory_bytes, worker.max_cpu_seconds, worker.max_open_files and "
+            "worker.max_processes cannot be negative"
+        )
+
     worker = AgentWorkerConfig(
         enabled=bool(worker_data.get("enabled", False)),
         api_url=str(worker_data.get("api_url", "")),
         poll_interval_seconds=float(worker_data.get("poll_interval_seconds", 2.0)),
         timeout_seconds=float(worker_data.get("timeout_seconds", 600.0)),
         command=list(raw_command),
+        registration_token=str(worker_data.get("registration_token", "")),
+        name=str(worker_data.get("name", "")),
+        repos=list(raw_worker_repos),
+        session_pool_size=session_pool_size,
+        session_max_jobs=session_max_jobs,
+        session_max_rss_bytes=session_max_rss_bytes,
+        session_done_marker=session_done_marker,
+        session_reset_input=str(worker_data.get("session_reset_input", "")),
+        worktree_pool_size=worktree_pool_size,
+        **limit_values,
+        cgroup_root=str(worker_data.get("cgroup_root", "")),
     )
 
+    queue = _parse_queue(data.get("queue", {}))
+    review = _parse_review(data.get("review", {}))
+    repos = _parse_repos(data.get("repos", {}))
+
     return AgentConfig(
         name=name,
         forgejo=AgentForgejoConfig(token=token.strip()),
         server=server,
         claude=claude,
         worker=worker,
+        queue=queue,
+        review=review,
+        repos=repos,
+    )
+
+
+def _parse_queue(queue_data: object) -> AgentQueueConfig:
+    if queue_data is None:
+        queue_data = {}
+    if not isinstance(queue_data, dict):
+        raise AgentConfigError("[queue] must be a table")
+
+    scheduler = str(queue_data.get("scheduler", "fifo"))
+    if scheduler not in SCHEDULERS:
+        raise AgentConfigError(f"queue.scheduler must be one of: {', '.join(SCHEDULERS)}")
+
+    raw_weights = queue_data.get("repo_weights", {})
+    if not isinstance(raw_weights, dict):
+        raise AgentConfigError("[queue.repo_weights] must be a table")
+    repo_weights: dict[str, float] = {}
+    for repo, weight in raw_weights.items():
+        if "/" not in str(repo):
+            raise AgentConfigError("queue.repo_weights keys must look like 'owner/repo'")
+        if not isinstance(weight, (int, float)) or weight <= 0:
+            raise AgentConfigError("queue.repo_weights values must be positive numbers")
+        repo_weights[str(repo)] = float(weight)
+
+    raw_labels = queue_data.get("priority_labels", default_priority_labels())
+    if not isinstance(raw_labels, dict) or not all(isinstance(value, int) for value in raw_labels.values()):
+        raise AgentConfigError("[queue.priority_labels] must map label names to integers")
+
+    max_concurrent = int(queue_data.get("max_concurrent_per_repo", 0))
+    if max_concurrent < 0:
+        raise AgentConfigError("queue.max_concurrent_per_repo cannot be negative")
+
+    overflow = str(queue_data.get("overflow", "reject"))
+    if overflow not in OVERFLOW_POLICIES:
+        raise AgentConfigError(f"queue.overflow must be one of: {', '.join(OVERFLOW_POLICIES)}")
+
+    max_depth = int(queue_data.get("max_depth", 200))
+    max_prompt_bytes = int(queue_data.get("max_prompt_bytes", 512 * 1024 * 1024))
+    retry_after = int(queue_data.get("retry_after_seconds", 30))
+    if max_depth < 0 or max_prompt_bytes < 0 or retry_after < 0:
+        raise AgentConfigError("queue.max_depth, queue.max_prompt_bytes and queue.retry_after_seconds cannot be negative")
+
+    return AgentQueueConfig(
+        scheduler=scheduler,
+        priority_weight_seconds=float(queue_data.get("priority_weight_seconds", 300.0)),
+        size_weight_seconds_per_kib=float(queue_data.get("size_weight_seconds_per_kib", 0.5)),
+        max_concurrent_per_repo=max_concurrent,
+        repo_weights=repo_weights,
+        priority_labels={str(label): int(value) for label, value in raw_labels.items()},
+        max_depth=max_depth,
+        max_prompt_bytes=max_prompt_bytes,
+        overflow=overflow,
+        retry_after_seconds=retry_after,
+    )
+
+
+def _parse_review(review_data: object) -> AgentReviewConfig:
+    if review_data is None:
+        review_data = {}
+    if not isinstance(review_data, dict):
+        raise AgentConfigError("[review] must be a table")
+
+    raw_globs = review_data.get("skip_globs", default_review_skip_globs())
+    if not isinstance(raw_globs, list) or not all(isinstance(item, str) for item in raw_globs):
+        raise AgentConfigError("review.skip_globs must be an array of strings")
+
+    max_chunk_tokens = int(review_data.get("max_chunk_tokens", 60000))
+    max_parallel_chunks = int(review_data.get("max_parallel_chunks", 4))
+    if max_chunk_tokens < 1 or max_parallel_chunks < 1:
+        raise AgentConfigError("review.max_chunk_tokens and review.max_parallel_chunks must be positive")
+
+    diff_cache_max_bytes = int(review_data.get("diff_cache_max_bytes", 256 * 1024 * 1024))
+    max_diff_bytes = int(review_data.get("max_diff_bytes", 32 * 1024 * 1024))
+    if diff_cache_max_bytes < 0 or max_diff_bytes < 0:
+        raise AgentConfigError("review.diff_cache_max_bytes and review.max_diff_bytes cannot be negative")
+
+    return AgentReviewConfig(
+        max_chunk_tokens=max_chunk_tokens,
+        max_parallel_chunks=max_parallel_chunks,
+        skip_globs=list(raw_globs),
+        diff_cache_max_bytes=diff_cache_max_bytes,
+        max_diff_bytes=max_diff_bytes,
     )
 
 
+def _parse_repos(repos_data: object) -> dict[str, AgentRepoConfig]:
+    if repos_data is None:
+        repos_data = {}
+    if not isinstance(repos_data, dict):
+        raise AgentConfigError("[repos] must be a table")
+
+    repos: dict[str, AgentRepoConfig] = {}
+    for full_name, repo_data in repos_data.items():
+        owner, _, repo = str(full_name).partition("/")
+        if not owner or not repo or "/" in repo:
+            raise AgentConfigError(f'[repos] keys must look like "owner/name", got {full_name!r}')
+        if not isinstance(repo_data, dict):
+            raise AgentConfigError(f'[repos."{full_name}"] must be a table')
+
+        raw_globs = repo_data.get("skip_globs")
+        if raw_globs is not None and (
+            not isinstance(raw_globs, list) or not all(isinstance(item, str) for item in raw_globs)
+        ):
+            raise AgentConfigError(f'repos."{full_name}".skip_globs must be an array of strings')
+
+        weight = float(repo_data.get("weight", 1.0))
+        max_concurrent = int(repo_data.get("max_concurrent", 0))
+        if weight <= 0 or max_concurrent < 0:
+            raise AgentConfigError(f'repos."{full_name}".weight must be positive and max_concurrent not negative')
+
+        repos[str(full_name)] = AgentRepoConfig(
+            token=str(repo_data.get("token", "")).strip(),
+            enabled=bool(repo_data.get("enabled", True)),
+            weight=weight,
+            max_concurrent=max_concurrent,
+            skip_globs=list(raw_globs) if raw_globs is not None else None,
+            agent=str(repo_data.get("agent", "")),
+        )
+    return repos
+
+
+def _repo_config_to_dict(repo: AgentRepoConfig) -> dict:
+    data: dict = {
+        "token": repo.token,
+        "enabled": repo.enabled,
+        "weight": repo.weight,
+        "max_concurrent": repo.max_concurrent,
+        "agent": repo.agent,
+    }
+    if repo.skip_globs is not None:
+        data["skip_globs"] = repo.skip_globs
+    return data
+
+
 def agent_config_to_dict(config: AgentConfig) -> dict:
     return {
         "forgejo": {"token": config.forgejo.token},
@@ -84,13 +283,57 @@ def agent_config_to_dict(config: AgentConfig) -> dict:
             "port": config.server.port,
             "host": config.server.host,
             "webhook_secret": config.server.webhook_secret,
+            "delivery_ttl_seconds": config.server.delivery_ttl_seconds,
+            "delivery_max_entries": config.server.delivery_max_entries,
+            "persist_deliveries": config.server.persist_deliveries,
+            "allow_unlisted_repos": config.server.allow_unlisted_repos,
+        },
+        "claude": {
+            "model": config.claude.model,
+            "timeout_seconds": config.claude.timeout_seconds,
+            "max_concurrent": config.claude.max_concurrent,
+            "max_attempts": config.claude.max_attempts,
+            "retry_backoff_seconds": config.claude.retry_backoff_seconds,
         },
-        "claude": {"model": config.claude.model},
         "worker": {
             "enabled": config.worker.enabled,
             "api_url": config.worker.api_url,
             "poll_interval_seconds": config.worker.poll_interval_seconds,
             "timeout_seconds": config.worker.timeout_seconds,
             "command": config.worker.command,
+            "registration_token": config.worker.registration_token,
+            "name": config.worker.name,
+            "repos": config.worker.repos,
+            "session_pool_size": config.worker.session_pool_size,
+            "session_max_jobs": config.worker.session_max_jobs,
+            "session_max_rss_bytes": config.worker.session_max_rss_bytes,
+            "session_done_marker": config.worker.session_done_marker,
+            "session_reset_input": config.worker.session_reset_input,
+            "worktree_pool_size": config.worker.worktree_pool_size,
+            "max_memory_bytes": config.worker.max_memory_bytes,
+            "max_cpu_seconds": config.worker.max_cpu_seconds,
+            "max_open_files": config.worker.max_open_files,
+            "max_processes": config.worker.max_processes,
+            "cgroup_root": config.worker.cgroup_root,
+        },
+        "queue": {
+            "scheduler": config.queue.scheduler,
+            "priority_weight_seconds": config.queue.priority_weight_seconds,
+            "size_weight_seconds_per_kib": config.queue.size_weight_seconds_per_kib,
+            "max_concurrent_per_repo": config.queue.max_concurrent_per_repo,
+            "repo_weights": dict(config.queue.repo_weights),
+            "priority_labels": dict(config.queue.priority_labels),
+            "max_depth": config.queue.max_depth,
+            "max_prompt_bytes": config.queue.max_prompt_bytes,
+            "overflow": config.queue.overflow,
+            "retry_after_seconds": config.queue.retry_after_seconds,
+        },
+        "review": {
+            "max_chunk_tokens": config.review.max_chunk_tokens,
+            "max_parallel_chunks": config.review.max_parallel_chunks,
+            "skip_globs": config.review.skip_globs,
+            "diff_cache_max_bytes": config.review.diff_cache_max_bytes,
+            "max_diff_bytes": config.review.max_diff_bytes,
         },
+        "repos": {full_name: _repo_config_to_dict(repo) for full_name, repo in config.repos.items()},
     }
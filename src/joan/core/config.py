@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import tomllib
 
-from joan.core.models import Config, ForgejoConfig, GlobalConfig, RemotesConfig, RepoConfig
+from joan.core.models import Config, ForgejoConfig, GlobalConfig, HttpConfig, RemotesConfig, RepoConfig
 
 
 class ConfigError(ValueError):
@@ -38,6 +38,7 @@ def parse_config_dict(data: dict) -> Config:
             owner=owner,
             repo=repo,
             human_user=human_user,
+            http=_parse_http(data),
         ),
         remotes=remotes,
     )
@@ -66,13 +67,17 @@ def config_to_dict(config: Config) -> dict:
     if config.forgejo.human_user:
         forgejo_data["human_user"] = config.forgejo.human_user
 
-    return {
+    result: dict = {
         "forgejo": forgejo_data,
         "remotes": {
             "review": config.remotes.review,
             "upstream": config.remotes.upstream,
         },
     }
+    http_data = _http_to_dict(config.forgejo.http)
+    if http_data:
+        result["http"] = http_data
+    return result
 
 
 def _require_str(mapping: dict, key: str) -> str:
@@ -104,6 +109,44 @@ def _parse_remotes(data: dict) -> RemotesConfig:
     )
 
 
+def _parse_http(data: dict) -> HttpConfig:
+    http_data = data.get("http", {})
+    if http_data is None:
+        http_data = {}
+    if not isinstance(http_data, dict):
+        raise ConfigError("[http] must be a table")
+    defaults = HttpConfig()
+    config = HttpConfig(
+        timeout_seconds=_http_number(http_data, "timeout_seconds", defaults.timeout_seconds),
+        max_retries=int(_http_number(http_data, "max_retries", defaults.max_retries)),
+        retry_backoff_seconds=_http_number(http_data, "retry_backoff_seconds", defaults.retry_backoff_seconds),
+        rate_limit_per_second=_http_number(http_data, "rate_limit_per_second", defaults.rate_limit_per_second),
+        rate_limit_burst=int(_http_number(http_data, "rate_limit_burst", defaults.rate_limit_burst)),
+        cache_ttl_seconds=_http_number(http_data, "cache_ttl_seconds", defaults.cache_ttl_seconds),
+    )
+    if config.timeout_seconds <= 0:
+        raise ConfigError("http.timeout_seconds must be positive")
+    if config.rate_limit_burst < 1:
+        raise ConfigError("http.rate_limit_burst must be at least 1")
+    return config
+
+
+def _http_number(mapping: dict, key: str, default: float) -> float:
+    value = mapping.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ConfigError(f"http.{key} must be a non-negative number")
+    return value
+
+
+def _http_to_dict(http: HttpConfig) -> dict:
+    defaults = HttpConfig()
+    return {
+        key: getattr(http, key)
+        for key in HttpConfig.__slots__
+        if getattr(http, key) != getattr(defaults, key)
+    }
+
+
 def parse_global_config(raw_toml: str) -> GlobalConfig:
     try:
         data = tomllib.loads(raw_toml)
@@ -128,6 +171,7 @@ def parse_global_config(raw_toml: str) -> GlobalConfig:
         owner=owner,
         human_user=human_user,
         remotes=_parse_remotes(data),
+        http=_parse_http(data),
     )
 
 
@@ -167,6 +211,7 @@ def merge_config(global_cfg: GlobalConfig, repo_cfg: RepoConfig) -> Config:
             owner=global_cfg.owner,
             repo=repo_cfg.repo,
             human_user=human_user,
+            http=global_cfg.http,
         ),
         remotes=remotes,
     )
@@ -180,13 +225,17 @@ def global_config_to_dict(cfg: GlobalConfig) -> dict:
     }
     if cfg.human_user:
         forgejo_data["human_user"] = cfg.human_user
-    return {
+    result: dict = {
         "forgejo": forgejo_data,
         "remotes": {
             "review": cfg.remotes.review,
             "upstream": cfg.remotes.upstream,
         },
     }
+    http_data = _http_to_dict(cfg.http)
+    if http_data:
+        result["http"] = http_data
+    return result
 
 
 def repo_config_to_dict(cfg: RepoConfig) -> dict:
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+
+
+@dataclass(slots=True)
+class FileDiff:
+    path: str
+    header: str
+    hunks: list[str] = field(default_factory=list)
+
+    def text(self) -> str:
+        return self.header + "".join(self.hunks)
+
+
+def parse_unified_diff(diff: str) -> list[FileDiff]:
+    files: list[FileDiff] = []
+    current: FileDiff | None = None
+    header_lines: list[str] = []
+    hunk_lines: list[str] = []
+
+    def flush_hunk() -> None:
+        if current is not None and hunk_lines:
+            current.hunks.append("".join(hunk_lines))
+            hunk_lines.clear()
+
+    def flush_file() -> None:
+        nonlocal current
+        if current is None:
+            return
+        flush_hunk()
+        if not current.hunks:
+            current.header = "".join(header_lines)
+        files.append(current)
+        current = None
+
+    for line in diff.splitlines(keepends=True):
+        if line.startswith("diff --git "):
+            flush_file()
+            header_lines.clear()
+            header_lines.append(line)
+            current = FileDiff(path=_path_from_git_header(line), header="")
+            continue
+        if current is None:
+            continue
+        if line.startswith("@@"):
+            if not current.hunks and not hunk_lines:
+                current.header = "".join(header_lines)
+            flush_hunk()
+            hunk_lines.append(line)
+            continue
+        if hunk_lines:
+            hunk_lines.append(line)
+            continue
+        header_lines.append(line)
+        if line.startswith("+++ ") and not line.startswith("+++ /dev/null"):
+            current.path = _strip_prefix(line[4:].rstrip("\n"))
+    flush_file()
+    return files
+
+
+def iter_diff_sections(lines: Iterable[str]) -> Iterator[str]:
+    section: list[str] = []
+    for line in lines:
+        if line.startswith("diff --git ") and section:
+            yield "".join(section)
+            section = []
+        section.append(line)
+    if section:
+        yield "".join(section)
+
+
+def stub_skipped_sections(sections: Iterable[str], skip_globs: list[str]) -> Iterator[str]:
+    # Skipped files keep only their header so they are still listed as skipped
+    # without holding their hunks in memory.
+    for section in sections:
+        if not section.startswith("diff --git "):
+            yield section
+            continue
+        first_line = section.split("\n", 1)[0]
+        if not is_skipped_path(_path_from_git_header(first_line), skip_globs):
+            yield section
+            continue
+        hunk_start = section.find("\n@@")
+        yield section if hunk_start < 0 else section[: hunk_start + 1]
+
+
+def is_skipped_path(path: str, skip_globs: list[str]) -> bool:
+    name = path.rsplit("/", 1)[-1]
+    for pattern in skip_globs:
+        if fnmatchcase(path, pattern):
+            return True
+        if "/" not in pattern and fnmatchcase(name, pattern):
+            return True
+        if pattern.endswith("/*") and f"/{pattern[:-2]}/" in f"/{path}":
+            return True
+    return False
+
+
+def filter_diff_files(files: list[FileDiff], skip_globs: list[str]) -> tuple[list[FileDiff], list[str]]:
+    kept: list[FileDiff] = []
+    skipped: list[str] = []
+    for item in files:
+        if is_skipped_path(item.path, skip_globs):
+            skipped.append(item.path)
+        else:
+            kept.append(item)
+    return kept, skipped
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for code and diff text.
+    return (len(text) + 3) // 4
+
+
+def pack_diff_chunks(files: list[FileDiff], max_tokens: int) -> list[str]:
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    def emit() -> None:
+        nonlocal current_tokens
+        if current:
+            chunks.append("".join(current))
+            current.clear()
+            current_tokens = 0
+
+    for item in files:
+        for piece in _file_pieces(item, max_tokens):
+            tokens = estimate_tokens(piece)
+            if current and current_tokens + tokens > max_tokens:
+                emit()
+            current.append(piece)
+            current_tokens += tokens
+    emit()
+    return chunks
+
+
+def _file_pieces(item: FileDiff, max_tokens: int) -> list[str]:
+    text = item.text()
+    if estimate_tokens(text) <= max_tokens or len(item.hunks) <= 1:
+        return [text]
+
+    # Split an oversized file on hunk boundaries, repeating the file header so
+    # every piece is still a valid diff on its own. A single hunk larger than the
+    # budget is kept whole rather than cut mid-hunk.
+    pieces: list[str] = []
+    header_tokens = estimate_tokens(item.header)
+    batch: list[str] = []
+    batch_tokens = header_tokens
+    for hunk in item.hunks:
+        tokens = estimate_tokens(hunk)
+        if batch and batch_tokens + tokens > max_tokens:
+            pieces.append(item.header + "".join(batch))
+            batch = []
+            batch_tokens = header_tokens
+        batch.append(hunk)
+        batch_tokens += tokens
+    if batch:
+        pieces.append(item.header + "".join(batch))
+    return pieces
+
+
+def _path_from_git_header(line: str) -> str:
+    parts = line.rstrip("\n").split(" b/", 1)
+    if len(parts) == 2:
+        return parts[1]
+    return line.rstrip("\n")[len("diff --git ") :]
+
+
+def _strip_prefix(path: str) -> str:
+    if path.startswith(("a/", "b/")):
+        return path[2:]
+    return path
@@ -1,10 +1,43 @@
 from __future__ import annotations
 
-import json
 from datetime import datetime
+from typing import Any
 
+from joan.core.json_codec import JsonMode, dumps, loads
 from joan.core.models import Comment, PRSyncStatus, PullRequest, Review
 
+# With msgspec installed, comment and review lists decode straight from the
+# response bytes into small structs that declare only the fields joan reads;
+# everything else in Forgejo's payloads is skipped without being materialized.
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None  # type: ignore[assignment]
+
+if msgspec is not None:
+
+    class _UserWire(msgspec.Struct, gc=False):
+        login: str | None = None
+
+    class _ReviewWire(msgspec.Struct, gc=False):
+        id: int
+        state: str | None = None
+        body: str | None = None
+        submitted_at: datetime | None = None
+        user: _UserWire | None = None
+
+    class _CommentWire(msgspec.Struct, gc=False):
+        id: int
+        body: str | None = None
+        path: str | None = None
+        line: int | None = None
+        resolved: bool = False
+        user: _UserWire | None = None
+        created_at: datetime | None = None
+
+    _reviews_decoder = msgspec.json.Decoder(list[_ReviewWire])
+    _comments_decoder = msgspec.json.Decoder(list[_CommentWire])
+
 
 def build_create_repo_payload(name: str, private: bool = True) -> dict:
     return {"name": name, "private": private}
@@ -32,10 +65,10 @@ def parse_reviews(raw_reviews: list[dict]) -> list[Review]:
     return [
         Review(
             id=int(item["id"]),
-            state=str(item.get("state", "")),
-            body=str(item.get("body", "")),
+            state=str(item.get("state") or ""),
+            body=str(item.get("body") or ""),
             submitted_at=_parse_dt(item.get("submitted_at")),
-            user=str(item.get("user", {}).get("login", "")),
+            user=str((item.get("user") or {}).get("login") or ""),
         )
         for item in raw_reviews
     ]
@@ -47,17 +80,61 @@ def parse_comments(raw_comments: list[dict]) -> list[Comment]:
         out.append(
             Comment(
                 id=int(item["id"]),
-                body=str(item.get("body", "")),
-                path=str(item.get("path", "")),
+                body=str(item.get("body") or ""),
+                path=str(item.get("path") or ""),
                 line=item.get("line"),
                 resolved=bool(item.get("resolved", False)),
-                author=str(item.get("user", {}).get("login", "")),
+                author=str((item.get("user") or {}).get("login") or ""),
                 created_at=_parse_dt(item.get("created_at")),
             )
         )
     return out
 
 
+def decode_reviews(data: bytes) -> list[Review]:
+    """Decode a reviews response body; same result as ``parse_reviews(json.loads(data))``."""
+    if msgspec is not None:
+        try:
+            wire = _reviews_decoder.decode(data)
+        except msgspec.ValidationError:
+            pass  # unexpected shapes take the lenient path below
+        else:
+            return [
+                Review(
+                    id=item.id,
+                    state=item.state or "",
+                    body=item.body or "",
+                    submitted_at=item.submitted_at,
+                    user=(item.user.login or "") if item.user else "",
+                )
+                for item in wire
+            ]
+    return parse_reviews(loads(data))
+
+
+def decode_comments(data: bytes) -> list[Comment]:
+    """Decode a comments response body; same result as ``parse_comments(json.loads(data))``."""
+    if msgspec is not None:
+        try:
+            wire = _comments_decoder.decode(data)
+        except msgspec.ValidationError:
+            pass
+        else:
+            return [
+                Comment(
+                    id=item.id,
+                    body=item.body or "",
+                    path=item.path or "",
+                    line=item.line,
+                    resolved=item.resolved,
+                    author=(item.user.login or "") if item.user else "",
+                    created_at=item.created_at,
+                )
+                for item in wire
+            ]
+    return parse_comments(loads(data))
+
+
 def compute_sync_status(reviews: list[Review], comments: list[Comment]) -> PRSyncStatus:
     latest_state = reviews[-1].state if reviews else None
     approved = any(r.state.upper() == "APPROVED" for r in reviews)
@@ -73,25 +150,32 @@ def exclude_comments_by_author(comments: list[Comment], author: str) -> list[Com
     return [comment for comment in comments if comment.author != author]
 
 
-def format_comments_json(comments: list[Comment], include_resolved: bool = False) -> str:
-    selected = comments if include_resolved else [c for c in comments if not c.resolved]
-    payload = [
-        {
-            "id": c.id,
-            "body": c.body,
-            "path": c.path,
-            "line": c.line,
-            "resolved": c.resolved,
-            "author": c.author,
-            "created_at": c.created_at.isoformat().replace("+00:00", "Z") if c.created_at else None,
-        }
-        for c in selected
-    ]
-    return json.dumps(payload, indent=2)
+def format_comments_json(comments: list[Comment], include_resolved: bool = False, mode: JsonMode = "pretty") -> str:
+    return dumps(comments_payload(comments, include_resolved), mode)
+
+
+def comments_payload(comments: list[Comment], include_resolved: bool = False) -> list[dict[str, Any]]:
+    return [comment_payload(c) for c in comments if include_resolved or not c.resolved]
+
 
+def comment_payload(c: Comment) -> dict[str, Any]:
+    return {
+        "id": c.id,
+        "body": c.body,
+        "path": c.path,
+        "line": c.line,
+        "resolved": c.resolved,
+        "author": c.author,
+        "created_at": c.created_at.isoformat().replace("+00:00", "Z") if c.created_at else None,
+    }
 
-def format_reviews_json(reviews: list[Review]) -> str:
-    payload = [
+
+def format_reviews_json(reviews: list[Review], mode: JsonMode = "pretty") -> str:
+    return dumps(reviews_payload(reviews), mode)
+
+
+def reviews_payload(reviews: list[Review]) -> list[dict[str, Any]]:
+    return [
         {
             "id": r.id,
             "state": r.state,
@@ -101,13 +185,12 @@ def format_reviews_json(reviews: list[Review]) -> str:
         }
         for r in reviews
     ]
-    return json.dumps(payload, indent=2)
 
 
 def _parse_dt(raw: str | None) -> datetime | None:
     if not raw:
         return None
     try:
-        return datetime.fromisoformat(raw.replace("Z", "+00:00"))
+        return datetime.fromisoformat(raw)
     except ValueError:
         return None
@@ -46,6 +46,30 @@ def worktree_add_args(path: str, branch: str | None = None) -> list[str]:
     return args
 
 
+def worktree_add_detached_args(path: str) -> list[str]:
+    return ["worktree", "add", "--detach", path]
+
+
+def worktree_prune_args() -> list[str]:
+    return ["worktree", "prune"]
+
+
+def pr_head_ref(pr_number: int) -> str:
+    return f"refs/joan/phil/pr-{pr_number}"
+
+
+def fetch_pr_head_args(remote: str, pr_number: int) -> list[str]:
+    return ["fetch", "--no-tags", remote, f"+refs/pull/{pr_number}/head:{pr_head_ref(pr_number)}"]
+
+
+def checkout_detached_args(ref: str) -> list[str]:
+    return ["checkout", "--detach", "--force", ref]
+
+
+def clean_untracked_args() -> list[str]:
+    return ["clean", "-ffdx"]
+
+
 def worktree_remove_args(path: str) -> list[str]:
     return ["worktree", "remove", path]
 
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Literal
+
+# orjson and msgspec are optional; both are several times faster than the
+# stdlib on large comment and issue lists. For plain JSON values (strings,
+# integers, booleans, null, simple floats, lists and string-keyed dicts) every
+# backend writes the same text: UTF-8 without \u escapes, so the stdlib path
+# sets ensure_ascii=False, and two-space indentation when pretty. Backends can
+# still disagree on float exponents (1e-07 vs 1e-7), integers wider than 64
+# bits and non-JSON types such as datetime or Path, which orjson and msgspec
+# encode and the stdlib rejects, so callers convert those values first.
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on the environment
+    msgspec = None  # type: ignore[assignment]
+
+JsonMode = Literal["pretty", "compact", "ndjson"]
+JSON_MODES: tuple[str, ...] = ("pretty", "compact", "ndjson")
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+if msgspec is not None:
+    _msgspec_encoder = msgspec.json.Encoder()
+    _msgspec_decoder = msgspec.json.Decoder()
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return _msgspec_decoder.decode(data.encode("utf-8") if isinstance(data, str) else data)
+    return json.loads(data)
+
+
+def dumps(data: Any, mode: JsonMode = "pretty") -> str:
+    """Serialize ``data``; ``ndjson`` writes one compact line per list item."""
+    if mode == "ndjson":
+        items = data if isinstance(data, list) else [data]
+        return "\n".join(_compact(item) for item in items)
+    if mode == "compact":
+        return _compact(data)
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    if msgspec is not None:
+        return msgspec.json.format(_msgspec_encoder.encode(data), indent=2).decode("utf-8")
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def _compact(data: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    if msgspec is not None:
+        return _msgspec_encoder.encode(data).decode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
@@ -4,6 +4,18 @@ from dataclasses import dataclass, field
 from datetime import datetime
 
 
+@dataclass(slots=True)
+class HttpConfig:
+    timeout_seconds: float = 30.0
+    max_retries: int = 2
+    retry_backoff_seconds: float = 0.5
+    # Zero turns client-side throttling off.
+    rate_limit_per_second: float = 0.0
+    rate_limit_burst: int = 10
+    # How long a successful GET is reused within one client; zero keeps only in-flight sharing.
+    cache_ttl_seconds: float = 2.0
+
+
 @dataclass(slots=True)
 class ForgejoConfig:
     url: str
@@ -11,6 +23,7 @@ class ForgejoConfig:
     owner: str
     repo: str
     human_user: str | None = None
+    http: HttpConfig = field(default_factory=HttpConfig)
 
 
 @dataclass(slots=True)
@@ -32,6 +45,7 @@ class GlobalConfig:
     owner: str = "joan"
     human_user: str | None = None
     remotes: RemotesConfig = field(default_factory=RemotesConfig)
+    http: HttpConfig = field(default_factory=HttpConfig)
 
 
 @dataclass(slots=True)
@@ -88,11 +102,19 @@ class AgentServerConfig:
     port: int = 9000
     host: str = "0.0.0.0"
     webhook_secret: str = ""
+    delivery_ttl_seconds: int = 24 * 60 * 60
+    delivery_max_entries: int = 10000
+    persist_deliveries: bool = False
+    allow_unlisted_repos: bool = True
 
 
 @dataclass(slots=True)
 class AgentClaudeConfig:
     model: str = "claude-sonnet-4-6"
+    timeout_seconds: float = 120.0
+    max_concurrent: int = 2
+    max_attempts: int = 3
+    retry_backoff_seconds: float = 5.0
 
 
 def default_worker_command() -> list[str]:
@@ -106,6 +128,74 @@ class AgentWorkerConfig:
     poll_interval_seconds: float = 2.0
     timeout_seconds: float = 600.0
     command: list[str] = field(default_factory=default_worker_command)
+    registration_token: str = ""
+    name: str = ""
+    repos: list[str] = field(default_factory=list)
+    session_pool_size: int = 0
+    session_max_jobs: int = 20
+    session_max_rss_bytes: int = 0
+    session_done_marker: str = ""
+    session_reset_input: str = ""
+    worktree_pool_size: int = 0
+    max_memory_bytes: int = 0
+    max_cpu_seconds: int = 0
+    max_open_files: int = 0
+    max_processes: int = 0
+    cgroup_root: str = ""
+
+
+def default_review_skip_globs() -> list[str]:
+    return [
+        "*.lock",
+        "package-lock.json",
+        "pnpm-lock.yaml",
+        "go.sum",
+        "*.min.js",
+        "*.min.css",
+        "*_pb2.py",
+        "*.pb.go",
+        "vendor/*",
+        "node_modules/*",
+        "third_party/*",
+        "dist/*",
+    ]
+
+
+@dataclass(slots=True)
+class AgentReviewConfig:
+    max_chunk_tokens: int = 60000
+    max_parallel_chunks: int = 4
+    skip_globs: list[str] = field(default_factory=default_review_skip_globs)
+    diff_cache_max_bytes: int = 256 * 1024 * 1024
+    max_diff_bytes: int = 32 * 1024 * 1024
+
+
+def default_priority_labels() -> dict[str, int]:
+    return {"priority/high": 10, "priority/low": -10}
+
+
+@dataclass(slots=True)
+class AgentQueueConfig:
+    scheduler: str = "fifo"
+    priority_weight_seconds: float = 300.0
+    size_weight_seconds_per_kib: float = 0.5
+    max_concurrent_per_repo: int = 0
+    repo_weights: dict[str, float] = field(default_factory=dict)
+    priority_labels: dict[str, int] = field(default_factory=default_priority_labels)
+    max_depth: int = 200
+    max_prompt_bytes: int = 512 * 1024 * 1024
+    overflow: str = "reject"
+    retry_after_seconds: int = 30
+
+
+@dataclass(slots=True)
+class AgentRepoConfig:
+    token: str = ""
+    enabled: bool = True
+    weight: float = 1.0
+    max_concurrent: int = 0
+    skip_globs: list[str] | None = None
+    agent: str = ""
 
 
 @dataclass(slots=True)
@@ -115,3 +205,6 @@ class AgentConfig:
     server: AgentServerConfig = field(default_factory=AgentServerConfig)
     claude: AgentClaudeConfig = field(default_factory=AgentClaudeConfig)
     worker: AgentWorkerConfig = field(default_factory=AgentWorkerConfig)
+    queue: AgentQueueConfig = field(default_factory=AgentQueueConfig)
+    review: AgentReviewConfig = field(default_factory=AgentReviewConfig)
+    repos: dict[str, AgentRepoConfig] = field(default_factory=dict)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+
+class DeliveryStore:
+    """Remembers recently handled webhook delivery IDs so retries are ignored.
+
+    Entries expire after ``ttl_seconds`` and only the newest ``max_entries`` are
+    kept. With a ``path`` the IDs are also written to SQLite so they survive a
+    server restart. A ``max_entries`` of zero disables the store.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int,
+        max_entries: int,
+        path: Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._ttl_seconds = ttl_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._in_flight: set[str] = set()
+        self._db: sqlite3.Connection | None = None
+        if path is not None and max_entries > 0:
+            self._db = _open_db(path)
+            self._load()
+
+    def begin(self, delivery_id: str) -> bool:
+        # False when the delivery was already handled or is being handled now.
+        if self._max_entries == 0:
+            return True
+        self._expire()
+        if delivery_id in self._seen or delivery_id in self._in_flight:
+            return False
+        self._in_flight.add(delivery_id)
+        return True
+
+    def commit(self, delivery_id: str) -> None:
+        self._in_flight.discard(delivery_id)
+        if self._max_entries == 0:
+            return
+        now = self._clock()
+        self._seen[delivery_id] = now
+        self._seen.move_to_end(delivery_id)
+        evicted: list[str] = []
+        while len(self._seen) > self._max_entries:
+            evicted.append(self._seen.popitem(last=False)[0])
+        if self._db is not None:
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO deliveries (id, seen_at) VALUES (?, ?)", (delivery_id, now))
+                self._db.executemany("DELETE FROM deliveries WHERE id = ?", [(item,) for item in evicted])
+
+    def abort(self, delivery_id: str) -> None:
+        self._in_flight.discard(delivery_id)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self._ttl_seconds
+        expired = False
+        while self._seen:
+            seen_at = next(iter(self._seen.values()))
+            if seen_at > cutoff:
+                break
+            self._seen.popitem(last=False)
+            expired = True
+        if expired and self._db is not None:
+            with self._db:
+                self._db.execute("DELETE FROM deliveries WHERE seen_at <= ?", (cutoff,))
+
+    def _load(self) -> None:
+        if self._db is None:
+            return
+        cutoff = self._clock() - self._ttl_seconds
+        with self._db:
+            self._db.execute("DELETE FROM deliveries WHERE seen_at <= ?", (cutoff,))
+        rows = self._db.execute(
+            "SELECT id, seen_at FROM deliveries ORDER BY seen_at DESC LIMIT ?", (self._max_entries,)
+        ).fetchall()
+        for delivery_id, seen_at in reversed(rows):
+            self._seen[str(delivery_id)] = float(seen_at)
+
+
+def _open_db(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, check_same_thread=False)
+    with db:
+        db.execute("CREATE TABLE IF NOT EXISTS deliveries (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+    return db
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from collections.abc import Sequence
+from pathlib import Path
+from uuid import uuid4
+
+
+class DiffCache:
+    """Stores downloaded diffs on disk keyed by repository, commit range and skip globs.
+
+    A diff between two commits never changes, so retries and repeated review
+    requests for the same head reuse the stored copy. Stored diffs already have
+    skipped files stubbed out, so changing a repo's ``skip_globs`` misses the
+    cache instead of serving the old stubs. The least recently used
+    entries are removed once the cache grows past ``max_bytes``. Entries are
+    written with an atomic rename, so several processes can share one cache.
+    """
+
+    def __init__(self, root: Path | None, max_bytes: int) -> None:
+        self._root = root if max_bytes > 0 else None
+        self._max_bytes = max_bytes
+
+    def get(
+        self, owner: str, repo: str, base_sha: str, head_sha: str, skip_globs: Sequence[str] = ()
+    ) -> str | None:
+        if self._root is None:
+            return None
+        path = _entry_path(self._root, owner, repo, base_sha, head_sha, skip_globs)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return text
+
+    def put(
+        self, owner: str, repo: str, base_sha: str, head_sha: str, diff: str, skip_globs: Sequence[str] = ()
+    ) -> None:
+        if self._root is None:
+            return
+        data = diff.encode("utf-8")
+        if len(data) > self._max_bytes:
+            return
+        path = _entry_path(self._root, owner, repo, base_sha, head_sha, skip_globs)
+        self._root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{uuid4().hex}.tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+        _evict(self._root, self._max_bytes)
+
+
+def _evict(root: Path, max_bytes: int) -> None:
+    entries = []
+    for path in root.glob("*.diff"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def _entry_path(
+    root: Path, owner: str, repo: str, base_sha: str, head_sha: str, skip_globs: Sequence[str]
+) -> Path:
+    globs = "\n".join(skip_globs)
+    key = hashlib.sha256(f"{owner}/{repo}\0{base_sha}\0{head_sha}\0{globs}".encode()).hexdigest()
+    return root / f"{key}.diff"
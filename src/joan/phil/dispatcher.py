@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Executor
+from functools import partial
+
+import httpx
+
+from joan.phil.work_queue import ReviewJob, ReviewWorkQueue
+from joan.shell.forgejo_client import ForgejoError
+from joan.shell.tracing import active_tracer, traced_call
+
+MAX_RETRY_DELAY_SECONDS = 300.0
+_SERVER_ERROR = re.compile(r"Forgejo API 5\d\d")
+
+
+class TransientReviewError(RuntimeError):
+    pass
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    if isinstance(exc, (TransientReviewError, httpx.TransportError)):
+        return True
+    return isinstance(exc, ForgejoError) and bool(_SERVER_ERROR.match(str(exc)))
+
+
+def retry_delay(attempt: int, base_seconds: float) -> float:
+    return min(base_seconds * 2 ** max(attempt - 1, 0), MAX_RETRY_DELAY_SECONDS)
+
+
+class ReviewDispatcher:
+    """Runs queued reviews on a bounded executor when no worker is polling.
+
+    ``build_call`` turns a claimed job into a picklable callable so the default
+    process pool can run it; its return value becomes the job transcript.
+    """
+
+    def __init__(
+        self,
+        queue: ReviewWorkQueue,
+        executor: Executor,
+        build_call: Callable[[ReviewJob], Callable[[], object]],
+        *,
+        max_concurrent: int,
+        max_attempts: int,
+        retry_backoff_seconds: float,
+        on_complete: Callable[[ReviewJob], None] | None = None,
+    ) -> None:
+        self._queue = queue
+        self._executor = executor
+        self._build_call = build_call
+        self._max_attempts = max_attempts
+        self._retry_backoff_seconds = retry_backoff_seconds
+        self._on_complete = on_complete
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._loop_task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._loop_task = asyncio.create_task(self._dispatch_forever())
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *([self._loop_task] if self._loop_task is not None else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _dispatch_forever(self) -> None:
+        while True:
+            await self._slots.acquire()
+            job = await self._queue.claim_next()
+            if job is None:
+                self._slots.release()
+                await self._queue.wait_for_work()
+                continue
+            self._spawn(self._run_job(job))
+
+    async def _run_job(self, job: ReviewJob) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await self._run_call(loop, job)
+            except Exception as exc:  # noqa: BLE001
+                await self._handle_failure(job, exc)
+                return
+            transcript = result if isinstance(result, str) else json.dumps(result, default=str)
+            await self._queue.complete(job.id, transcript)
+            if self._on_complete is not None:
+                self._on_complete(job)
+        finally:
+            self._slots.release()
+
+    async def _run_call(self, loop: asyncio.AbstractEventLoop, job: ReviewJob) -> object:
+        call = self._build_call(job)
+        tracer = active_tracer()
+        if tracer is None:
+            return await loop.run_in_executor(self._executor, call)
+        # Spans recorded in a pool process come back with the result and join this process's trace.
+        traced = partial(traced_call, tracer.origin_ns, call)
+        result, error, events = await loop.run_in_executor(self._executor, traced)
+        tracer.extend(events)
+        if error is not None:
+            raise error
+        return result
+
+    async def _handle_failure(self, job: ReviewJob, exc: Exception) -> None:
+        error = f"{type(exc).__name__}: {exc}"
+        if job.attempts >= self._max_attempts or not is_transient_error(exc):
+            await self._queue.fail(job.id, error)
+            return
+        self._spawn(self._retry_later(job, error, retry_delay(job.attempts, self._retry_backoff_seconds)))
+
+    async def _retry_later(self, job: ReviewJob, error: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.requeue(job.id, error)
+
+    def _spawn(self, coro: Coroutine[object, object, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import resource
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from uuid import uuid4
+
+
+@dataclass(slots=True)
+class ResourceLimits:
+    # Zero means no limit. Memory and process caps need cgroup_root: RLIMIT_AS
+    # breaks runtimes such as Node that reserve far more address space than they
+    # use, and RLIMIT_NPROC counts every process the user owns.
+    max_memory_bytes: int = 0
+    max_cpu_seconds: int = 0
+    max_open_files: int = 0
+    max_processes: int = 0
+    cgroup_root: str = ""
+
+
+@dataclass(slots=True)
+class ResourceUsage:
+    peak_rss_bytes: int
+    cpu_seconds: float
+    wall_seconds: float
+
+    def to_dict(self) -> dict[str, float]:
+        return asdict(self)
+
+
+class JobCgroup:
+    """A throwaway cgroup v2 directory holding one agent run and its children."""
+
+    def __init__(self, root: Path, limits: ResourceLimits) -> None:
+        self.path = root / f"phil-job-{uuid4().hex[:12]}"
+        self.path.mkdir()
+        if limits.max_memory_bytes:
+            (self.path / "memory.max").write_text(str(limits.max_memory_bytes))
+            if (self.path / "memory.swap.max").exists():
+                (self.path / "memory.swap.max").write_text("0")
+        if limits.max_processes:
+            (self.path / "pids.max").write_text(str(limits.max_processes))
+
+    def attach(self, pid: int) -> None:
+        (self.path / "cgroup.procs").write_text(str(pid))
+
+    def peak_memory_bytes(self) -> int:
+        try:
+            return int((self.path / "memory.peak").read_text().strip())
+        except (OSError, ValueError):
+            return 0
+
+    def cpu_seconds(self) -> float:
+        try:
+            lines = (self.path / "cpu.stat").read_text().splitlines()
+        except OSError:
+            return 0.0
+        for line in lines:
+            key, _, value = line.partition(" ")
+            if key == "usage_usec":
+                return int(value) / 1_000_000
+        return 0.0
+
+    def remove(self) -> None:
+        kill_file = self.path / "cgroup.kill"
+        try:
+            if kill_file.exists():
+                kill_file.write_text("1")
+            self.path.rmdir()
+        except OSError:
+            # Processes still exiting keep the directory busy; the next prune removes it.
+            pass
+
+
+def open_job_cgroup(limits: ResourceLimits | None) -> JobCgroup | None:
+    if limits is None or not limits.cgroup_root:
+        return None
+    return JobCgroup(Path(limits.cgroup_root), limits)
+
+
+def apply_limits(pid: int, limits: ResourceLimits | None, cgroup: JobCgroup | None = None) -> None:
+    """Move a just-spawned agent into its cgroup and cap it with ``prlimit``.
+
+    This runs in the parent because the worker has other threads, which makes a
+    ``preexec_fn`` unsafe. Call it before the agent is sent any input.
+    """
+    if cgroup is not None:
+        cgroup.attach(pid)
+    if limits is None:
+        return
+    rlimits: list[tuple[int, int]] = []
+    if limits.max_cpu_seconds:
+        rlimits.append((resource.RLIMIT_CPU, limits.max_cpu_seconds))
+    if limits.max_open_files:
+        rlimits.append((resource.RLIMIT_NOFILE, limits.max_open_files))
+    for kind, value in rlimits:
+        _soft, hard = resource.prlimit(pid, kind)
+        ceiling = value if hard == resource.RLIM_INFINITY else min(value, hard)
+        resource.prlimit(pid, kind, (ceiling, ceiling))
+
+
+def usage_from_rusage(
+    rusage: resource.struct_rusage | None, wall_seconds: float, cgroup: JobCgroup | None = None
+) -> ResourceUsage:
+    peak = rusage.ru_maxrss * 1024 if rusage is not None else 0
+    cpu = rusage.ru_utime + rusage.ru_stime if rusage is not None else 0.0
+    if cgroup is not None:
+        # The cgroup also counts grandchildren that were never waited for.
+        peak = max(peak, cgroup.peak_memory_bytes())
+        cpu = max(cpu, cgroup.cpu_seconds())
+    return ResourceUsage(peak_rss_bytes=peak, cpu_seconds=round(cpu, 3), wall_seconds=round(wall_seconds, 3))
+
+
+class UsageTotals:
+    """Running totals of reported agent usage for ``/health``."""
+
+    def __init__(self) -> None:
+        self.jobs = 0
+        self.cpu_seconds = 0.0
+        self.wall_seconds = 0.0
+        self.peak_rss_bytes = 0
+
+    def add(self, usage: dict[str, float]) -> None:
+        self.jobs += 1
+        self.cpu_seconds += float(usage.get("cpu_seconds", 0.0))
+        self.wall_seconds += float(usage.get("wall_seconds", 0.0))
+        self.peak_rss_bytes = max(self.peak_rss_bytes, int(usage.get("peak_rss_bytes", 0)))
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "jobs": self.jobs,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "wall_seconds": round(self.wall_seconds, 3),
+            "peak_rss_bytes": self.peak_rss_bytes,
+        }
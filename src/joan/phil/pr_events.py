@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import httpx
+
+
+class PullRequestEventsError(RuntimeError):
+    pass
+
+
+class PullRequestEvents:
+    """Counts webhook deliveries per pull request so clients can long-poll for the next one.
+
+    Counters live in memory and restart at zero with the server, so waiters
+    compare for inequality rather than assuming the number only grows.
+    """
+
+    def __init__(self) -> None:
+        self._seqs: dict[tuple[str, str, int], int] = {}
+        self._changed = asyncio.Condition()
+
+    def current(self, owner: str, repo: str, pr_number: int) -> int:
+        return self._seqs.get((owner, repo, pr_number), 0)
+
+    async def publish(self, owner: str, repo: str, pr_number: int) -> int:
+        key = (owner, repo, pr_number)
+        async with self._changed:
+            seq = self._seqs[key] = self._seqs.get(key, 0) + 1
+            self._changed.notify_all()
+        return seq
+
+    async def wait(self, owner: str, repo: str, pr_number: int, since: int, timeout: float) -> int:
+        """Return the PR's sequence once it differs from ``since``, or after ``timeout`` seconds."""
+        key = (owner, repo, pr_number)
+        async with self._changed:
+            try:
+                await asyncio.wait_for(self._changed.wait_for(lambda: self._seqs.get(key, 0) != since), timeout)
+            except TimeoutError:
+                pass
+            return self._seqs.get(key, 0)
+
+
+class PullRequestEventsClient:
+    """Long-polls a phil server's ``/events/wait`` route; used by ``joan pr sync --watch``."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0, transport: httpx.BaseTransport | None = None) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._transport = transport
+
+    def wait(self, owner: str, repo: str, pr_number: int, since: int = -1, timeout: float = 30.0) -> int:
+        """Block until a webhook for the PR arrives or ``timeout`` passes; returns its event sequence number."""
+        params = {"owner": owner, "repo": repo, "pr": pr_number, "since": since, "timeout": timeout}
+        with httpx.Client(timeout=timeout + self.timeout, transport=self._transport) as client:
+            response = client.get(f"{self.base_url}/events/wait", params=params)
+        if response.status_code != 200:
+            raise PullRequestEventsError(f"event wait failed: HTTP {response.status_code} {response.text.strip()}")
+        return int(response.json()["seq"])
+
+
+def event_pull_request(payload: dict[str, Any]) -> int | None:
+    """The PR a Forgejo webhook payload is about, covering review and PR comment events."""
+    number = (payload.get("pull_request") or {}).get("number")
+    if isinstance(number, int):
+        return number
+    issue = payload.get("issue") or {}
+    if issue.get("pull_request") and isinstance(issue.get("number"), int):
+        return int(issue["number"])
+    return None
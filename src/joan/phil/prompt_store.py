@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+
+class PromptStore:
+    """Keeps job prompts on disk so queued jobs only hold a small reference.
+
+    The review queue lives in memory, so blobs left behind by a previous server
+    process can never be claimed again and are cleared when the store opens.
+    """
+
+    def __init__(self, root: Path | None = None) -> None:
+        self._root = root
+        if root is not None and root.exists():
+            for stale in root.glob("*.txt"):
+                stale.unlink(missing_ok=True)
+
+    @property
+    def root(self) -> Path:
+        if self._root is None:
+            self._root = Path(tempfile.mkdtemp(prefix="phil-prompts-"))
+        return self._root
+
+    def write(self, job_id: str, prompt: str) -> str:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / f"{job_id}.txt"
+        path.write_text(prompt, encoding="utf-8")
+        return path.name
+
+    def read(self, ref: str) -> str:
+        return (self.root / ref).read_text(encoding="utf-8")
+
+    def delete(self, ref: str) -> None:
+        if not ref:
+            return
+        (self.root / ref).unlink(missing_ok=True)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from dataclasses import replace
+
+from joan.core.models import AgentConfig, AgentRepoConfig, Config
+from joan.shell.forgejo_client import ForgejoClient
+
+
+class RepoRegistry:
+    """Maps webhook repositories to their Forgejo credentials and review policy.
+
+    Repos listed under ``[repos."owner/name"]`` use their own token and
+    overrides; other repos fall back to the joan config token unless
+    ``server.allow_unlisted_repos`` is off.
+    """
+
+    def __init__(
+        self,
+        joan_config: Config,
+        phil_config: AgentConfig,
+        client_factory: Callable[..., ForgejoClient] = ForgejoClient,
+    ) -> None:
+        self._joan_config = joan_config
+        self._phil_config = phil_config
+        self._client_factory = client_factory
+        self._clients: dict[tuple[str, str], ForgejoClient] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, owner: str, repo: str) -> AgentRepoConfig | None:
+        repo_config = self._phil_config.repos.get(f"{owner}/{repo}")
+        if repo_config is None:
+            return AgentRepoConfig() if self._phil_config.server.allow_unlisted_repos else None
+        return repo_config if repo_config.enabled else None
+
+    def client(self, owner: str, repo: str) -> ForgejoClient:
+        key = (owner, repo)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                forgejo = self.joan_config_for(owner, repo).forgejo
+                client = self._client_factory(forgejo.url, forgejo.token, http=forgejo.http)
+                self._clients[key] = client
+            return client
+
+    def joan_config_for(self, owner: str, repo: str) -> Config:
+        repo_config = self._phil_config.repos.get(f"{owner}/{repo}")
+        token = repo_config.token if repo_config is not None and repo_config.token else self._joan_config.forgejo.token
+        return replace(
+            self._joan_config,
+            forgejo=replace(self._joan_config.forgejo, token=token, owner=owner, repo=repo),
+        )
+
+    def agent_config_for(self, owner: str, repo: str) -> AgentConfig:
+        repo_config = self._phil_config.repos.get(f"{owner}/{repo}")
+        if repo_config is None or repo_config.skip_globs is None:
+            return self._phil_config
+        return replace(self._phil_config, review=replace(self._phil_config.review, skip_globs=repo_config.skip_globs))
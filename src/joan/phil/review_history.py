@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+
+
+class ReviewHistory:
+    """Remembers the head SHA of Phil's last completed review for each PR."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, str]] = self._load()
+
+    def last_reviewed_sha(self, owner: str, repo: str, pr_number: int) -> str | None:
+        with self._lock:
+            entry = self._entries.get(_key(owner, repo, pr_number))
+        if entry is None:
+            return None
+        return entry.get("head_sha") or None
+
+    def record(self, owner: str, repo: str, pr_number: int, head_sha: str) -> None:
+        stamp = datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+        with self._lock:
+            self._entries[_key(owner, repo, pr_number)] = {"head_sha": head_sha, "reviewed_at": stamp}
+            self._save()
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        if self._path is None or not self._path.exists():
+            return {}
+        try:
+            data = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {str(key): value for key, value in data.items() if isinstance(value, dict)}
+
+    def _save(self) -> None:
+        if self._path is None:
+            return
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._entries, indent=2, sort_keys=True), encoding="utf-8")
+        tmp_path.replace(self._path)
+
+
+def _key(owner: str, repo: str, pr_number: int) -> str:
+    return f"{owner}/{repo}#{pr_number}"
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import heapq
+from collections import deque
+from itertools import count
+from typing import TYPE_CHECKING, Protocol
+
+from joan.core.models import AgentQueueConfig, AgentRepoConfig
+
+if TYPE_CHECKING:
+    from joan.phil.work_queue import ReviewJob
+
+RepoKey = tuple[str, str]
+
+
+class Scheduler(Protocol):
+    def push(self, job: ReviewJob) -> None: ...
+
+    def pop(self) -> ReviewJob | None: ...
+
+    def release(self, job: ReviewJob) -> None: ...
+
+    def restore(self, job: ReviewJob) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class FifoScheduler:
+    def __init__(self) -> None:
+        self._jobs: deque[ReviewJob] = deque()
+
+    def push(self, job: ReviewJob) -> None:
+        self._jobs.append(job)
+
+    def pop(self) -> ReviewJob | None:
+        return self._jobs.popleft() if self._jobs else None
+
+    def release(self, job: ReviewJob) -> None:
+        return None
+
+    def restore(self, job: ReviewJob) -> None:
+        self._jobs.appendleft(job)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+
+class JobRanker:
+    """Turns priority, PR size and age into one static heap key.
+
+    Every pending job ages at the same rate, so ranking by
+    ``enqueue_time - priority_bonus + size_penalty`` orders jobs exactly as a
+    live ``priority + age - size`` score would, without re-keying the heap.
+    """
+
+    def __init__(self, priority_weight_seconds: float, size_weight_seconds_per_kib: float) -> None:
+        self.priority_weight_seconds = priority_weight_seconds
+        self.size_weight_seconds_per_kib = size_weight_seconds_per_kib
+
+    def key(self, job: ReviewJob) -> float:
+        return (
+            job.created_at.timestamp()
+            - job.priority * self.priority_weight_seconds
+            + (job.size_bytes / 1024) * self.size_weight_seconds_per_kib
+        )
+
+
+class PriorityScheduler:
+    def __init__(self, ranker: JobRanker) -> None:
+        self._ranker = ranker
+        self._heap: list[tuple[float, int, ReviewJob]] = []
+        self._seq = count()
+
+    def push(self, job: ReviewJob) -> None:
+        heapq.heappush(self._heap, (self._ranker.key(job), next(self._seq), job))
+
+    def pop(self) -> ReviewJob | None:
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[2]
+
+    def release(self, job: ReviewJob) -> None:
+        return None
+
+    def restore(self, job: ReviewJob) -> None:
+        self.push(job)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+
+class FairShareScheduler:
+    """Weighted fair queueing across (owner, repo) with per-repo concurrency caps.
+
+    Each repo has its own priority heap and a virtual finish time that advances
+    by ``1 / weight`` per dispatched job. The repo with the smallest virtual time
+    that is under its cap is served next, so a repo with 40 open PRs only gets
+    its weighted share of claims while other repos have work waiting.
+    """
+
+    def __init__(
+        self,
+        ranker: JobRanker,
+        weights: dict[RepoKey, float] | None = None,
+        max_concurrent_per_repo: int = 0,
+        repo_caps: dict[RepoKey, int] | None = None,
+    ) -> None:
+        self._ranker = ranker
+        self._weights = dict(weights or {})
+        self._max_concurrent = max_concurrent_per_repo
+        self._repo_caps = dict(repo_caps or {})
+        self._seq = count()
+        self._queues: dict[RepoKey, list[tuple[float, int, ReviewJob]]] = {}
+        self._running: dict[RepoKey, int] = {}
+        self._vtime: dict[RepoKey, float] = {}
+        self._ready: list[tuple[float, int, RepoKey]] = []
+        self._in_ready: set[RepoKey] = set()
+        self._clock = 0.0
+        self._size = 0
+        # The ready entry and clock from before each pop, so restore() can undo it.
+        self._charges: dict[str, tuple[float, int, float]] = {}
+
+    def push(self, job: ReviewJob) -> None:
+        self._enqueue(job)
+        self._activate((job.owner, job.repo))
+
+    def pop(self) -> ReviewJob | None:
+        while self._ready:
+            vtime, seq, key = heapq.heappop(self._ready)
+            self._in_ready.discard(key)
+            heap = self._queues.get(key)
+            if not heap or self._at_cap(key):
+                continue
+            job = heapq.heappop(heap)[2]
+            self._size -= 1
+            self._running[key] = self._running.get(key, 0) + 1
+            self._charges[job.id] = (vtime, seq, self._clock)
+            self._clock = vtime
+            self._vtime[key] = vtime + 1.0 / self._weights.get(key, 1.0)
+            if not heap:
+                del self._queues[key]
+            self._activate(key)
+            return job
+        return None
+
+    def release(self, job: ReviewJob) -> None:
+        self._charges.pop(job.id, None)
+        self._finish(job)
+        self._activate((job.owner, job.repo))
+
+    def restore(self, job: ReviewJob) -> None:
+        # Undo the pop so a repo is not penalised for work no worker could take:
+        # the repo gets back its virtual time and place in the ready heap, and
+        # the clock goes back too. Restores come in reverse pop order.
+        key = (job.owner, job.repo)
+        charge = self._charges.pop(job.id, None)
+        self._finish(job)
+        self._enqueue(job)
+        if charge is None:
+            self._activate(key)
+            return
+        vtime, seq, self._clock = charge
+        self._vtime[key] = vtime
+        if key in self._in_ready:
+            self._ready = [entry for entry in self._ready if entry[2] != key]
+            heapq.heapify(self._ready)
+        heapq.heappush(self._ready, (vtime, seq, key))
+        self._in_ready.add(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _enqueue(self, job: ReviewJob) -> None:
+        heap = self._queues.setdefault((job.owner, job.repo), [])
+        heapq.heappush(heap, (self._ranker.key(job), next(self._seq), job))
+        self._size += 1
+
+    def _finish(self, job: ReviewJob) -> None:
+        key = (job.owner, job.repo)
+        running = self._running.get(key, 0) - 1
+        if running > 0:
+            self._running[key] = running
+        else:
+            self._running.pop(key, None)
+
+    def _at_cap(self, key: RepoKey) -> bool:
+        cap = self._repo_caps.get(key) or self._max_concurrent
+        return cap > 0 and self._running.get(key, 0) >= cap
+
+    def _activate(self, key: RepoKey) -> None:
+        if key in self._in_ready or not self._queues.get(key) or self._at_cap(key):
+            return
+        # A repo that was idle re-enters at the current virtual clock so it
+        # cannot bank credit while it had nothing queued.
+        vtime = max(self._vtime.get(key, 0.0), self._clock)
+        self._vtime[key] = vtime
+        heapq.heappush(self._ready, (vtime, next(self._seq), key))
+        self._in_ready.add(key)
+
+
+def build_scheduler(config: AgentQueueConfig, repos: dict[str, AgentRepoConfig] | None = None) -> Scheduler:
+    ranker = JobRanker(config.priority_weight_seconds, config.size_weight_seconds_per_kib)
+    if config.scheduler == "priority":
+        return PriorityScheduler(ranker)
+    if config.scheduler == "fair_share":
+        weights: dict[RepoKey, float] = {}
+        caps: dict[RepoKey, int] = {}
+        for full_name, repo_config in (repos or {}).items():
+            key = _repo_key(full_name)
+            weights[key] = repo_config.weight
+            if repo_config.max_concurrent:
+                caps[key] = repo_config.max_concurrent
+        for full_name, weight in config.repo_weights.items():
+            weights[_repo_key(full_name)] = weight
+        return FairShareScheduler(ranker, weights, config.max_concurrent_per_repo, caps)
+    return FifoScheduler()
+
+
+def _repo_key(full_name: str) -> RepoKey:
+    owner, _, repo = full_name.partition("/")
+    return (owner, repo)
@@ -1,25 +1,107 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import json
+import multiprocessing
 import subprocess
+from collections.abc import AsyncIterator, Callable, Iterable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache, partial
 from importlib.resources import files
+from pathlib import Path
 from typing import Any
 
-from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.responses import JSONResponse, Response
 
-from joan.core.models import AgentConfig, Config
-from joan.phil.work_queue import ReviewWorkQueue
-from joan.shell.forgejo_client import ForgejoClient
-
-
-def create_app(joan_config: Config, phil_config: AgentConfig, worker_mode: bool | None = None) -> FastAPI:
-    app = FastAPI(title="phil", description="Phil AI code review bot")
+from joan.core.diff import filter_diff_files, pack_diff_chunks, parse_unified_diff, stub_skipped_sections
+from joan.core.models import AgentConfig, AgentReviewConfig, Comment, Config
+from joan.phil.delivery_store import DeliveryStore
+from joan.phil.diff_cache import DiffCache
+from joan.phil.dispatcher import ReviewDispatcher, TransientReviewError
+from joan.phil.limits import UsageTotals
+from joan.phil.pr_events import PullRequestEvents, event_pull_request
+from joan.phil.prompt_store import PromptStore
+from joan.phil.repo_registry import RepoRegistry
+from joan.phil.review_history import ReviewHistory
+from joan.phil.scheduling import build_scheduler
+from joan.phil.work_queue import QueueFullError, ReviewJob, ReviewWorkQueue
+from joan.phil.workers import WorkerRecord, WorkerRegistry
+from joan.shell.forgejo_client import DiffTooLargeError, ForgejoClient, ForgejoError
+from joan.shell.single_flight import SingleFlight
+from joan.shell.tracing import span
+
+REVIEW_KINDS = {"pr_review", "pr_review_summary"}
+
+
+@dataclass(slots=True)
+class ReviewInput:
+    diff: str
+    since_sha: str | None = None
+    previous_comments: list[Comment] = field(default_factory=list)
+
+
+def create_app(
+    joan_config: Config,
+    phil_config: AgentConfig,
+    worker_mode: bool | None = None,
+    state_dir: Path | None = None,
+    executor_factory: Callable[[int], Executor] | None = None,
+) -> FastAPI:
     effective_worker_mode = phil_config.worker.enabled if worker_mode is None else worker_mode
-    app.state.queue = ReviewWorkQueue()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+        # Without a worker polling /work/claim, reviews run in this process on a
+        # bounded executor fed from the same queue.
+        if effective_worker_mode:
+            yield
+            return
+        make_executor = executor_factory or _review_process_pool
+        dispatcher = ReviewDispatcher(
+            app.state.queue,
+            make_executor(phil_config.claude.max_concurrent),
+            lambda job: _direct_review_call(app, job),
+            max_concurrent=phil_config.claude.max_concurrent,
+            max_attempts=phil_config.claude.max_attempts,
+            retry_backoff_seconds=phil_config.claude.retry_backoff_seconds,
+            on_complete=lambda job: _record_review(app.state.review_history, job),
+        )
+        dispatcher.start()
+        try:
+            yield
+        finally:
+            await dispatcher.stop()
+
+    app = FastAPI(title="phil", description="Phil AI code review bot", lifespan=lifespan)
+    app.state.queue = ReviewWorkQueue(
+        build_scheduler(phil_config.queue, phil_config.repos),
+        PromptStore(state_dir / "prompts" if state_dir is not None else None),
+        max_depth=phil_config.queue.max_depth,
+        max_prompt_bytes=phil_config.queue.max_prompt_bytes,
+        overflow=phil_config.queue.overflow,
+        retry_after_seconds=phil_config.queue.retry_after_seconds,
+    )
     app.state.worker_mode = effective_worker_mode
+    app.state.repos = RepoRegistry(joan_config, phil_config, ForgejoClient)
+    app.state.workers = WorkerRegistry()
+    app.state.agent_usage = UsageTotals()
+    app.state.pr_events = PullRequestEvents()
+    app.state.review_history = ReviewHistory(state_dir / "reviews.json" if state_dir is not None else None)
+    app.state.deliveries = DeliveryStore(
+        phil_config.server.delivery_ttl_seconds,
+        phil_config.server.delivery_max_entries,
+        state_dir / "deliveries.sqlite3" if state_dir is not None and phil_config.server.persist_deliveries else None,
+    )
+    app.state.diff_cache = DiffCache(
+        state_dir / "diffs" if state_dir is not None else None, phil_config.review.diff_cache_max_bytes
+    )
+    # Worker-mode webhooks fetch on threads of this process; concurrent ones for the same range share a download.
+    app.state.diff_downloads = SingleFlight()
 
     @app.get("/health")
     async def health() -> dict[str, Any]:
@@ -29,10 +111,32 @@ def create_app(joan_config: Config, phil_config: AgentConfig, worker_mode: bool
             "agent": phil_config.name,
             "worker_mode": effective_worker_mode,
             **stats,
+            "agent_usage": app.state.agent_usage.summary(),
         }
 
     @app.post("/webhook")
-    async def webhook(request: Request, background_tasks: BackgroundTasks) -> Response:
+    async def webhook(request: Request) -> Response:
+        # Forgejo retries deliveries; a repeat is answered before any signature,
+        # diff or queue work. The ID is only remembered once handling succeeds.
+        delivery_id = request.headers.get("X-Gitea-Delivery", "")
+        if delivery_id and not app.state.deliveries.begin(delivery_id):
+            return JSONResponse(status_code=200, content={"status": "duplicate"})
+        try:
+            with span("phil.webhook", "phil", event=request.headers.get("X-Gitea-Event", "")) as attributes:
+                response = await handle_webhook(request)
+                attributes["status"] = response.status_code
+        except BaseException:
+            if delivery_id:
+                app.state.deliveries.abort(delivery_id)
+            raise
+        if delivery_id:
+            if response.status_code < 300:
+                app.state.deliveries.commit(delivery_id)
+            else:
+                app.state.deliveries.abort(delivery_id)
+        return response
+
+    async def handle_webhook(request: Request) -> Response:
         body = await request.body()
         _validate_signature(request.headers.get("X-Gitea-Signature", ""), body, phil_config.server.webhook_secret)
 
@@ -41,6 +145,16 @@ def create_app(joan_config: Config, phil_config: AgentConfig, worker_mode: bool
         except json.JSONDecodeError as exc:
             raise HTTPException(status_code=400, detail=f"Invalid JSON payload: {exc}") from exc
 
+        # Any review, comment or push on a PR wakes `joan pr sync --watch` clients waiting on it.
+        event_pr = event_pull_request(payload)
+        if event_pr is not None:
+            repository = payload.get("repository") or {}
+            await app.state.pr_events.publish(
+                str((repository.get("owner") or {}).get("login", joan_config.forgejo.owner)),
+                str(repository.get("name", joan_config.forgejo.repo)),
+                event_pr,
+            )
+
         if request.headers.get("X-Gitea-Event") != "pull_request":
             return JSONResponse(status_code=200, content={"status": "ignored"})
 
@@ -52,118 +166,623 @@ def create_app(joan_config: Config, phil_config: AgentConfig, worker_mode: bool
 
         repo_owner = payload.get("repository", {}).get("owner", {}).get("login", joan_config.forgejo.owner)
         repo_name = payload.get("repository", {}).get("name", joan_config.forgejo.repo)
+        head_sha = payload.get("pull_request", {}).get("head", {}).get("sha") or None
+        base_sha = payload.get("pull_request", {}).get("base", {}).get("sha") or None
 
+        owner_name, repo_slug = str(repo_owner), str(repo_name)
+        if app.state.repos.lookup(owner_name, repo_slug) is None:
+            return JSONResponse(status_code=200, content={"status": "ignored", "reason": "repository not enabled"})
+        priority = pr_priority(payload.get("pull_request", {}), phil_config.queue.priority_labels)
         if effective_worker_mode:
-            diff = ForgejoClient(joan_config.forgejo.url, joan_config.forgejo.token).get_pr_diff(
-                str(repo_owner), str(repo_name), pr_number
+            review_config = app.state.repos.agent_config_for(owner_name, repo_slug).review
+            try:
+                await app.state.queue.check_capacity()
+            except QueueFullError as exc:
+                return _queue_full_response(exc)
+            since_sha = app.state.review_history.last_reviewed_sha(owner_name, repo_slug, pr_number)
+            try:
+                # Retries, rate-limit waits and large diff streams block, so keep them off the event loop.
+                review_input = await asyncio.to_thread(
+                    fetch_review_input,
+                    app.state.repos.client(owner_name, repo_slug),
+                    phil_config.name,
+                    owner_name,
+                    repo_slug,
+                    pr_number,
+                    head_sha,
+                    since_sha=since_sha,
+                    base_sha=base_sha,
+                    diff_cache=app.state.diff_cache,
+                    review=review_config,
+                    diff_downloads=app.state.diff_downloads,
+                )
+            except DiffTooLargeError as exc:
+                return JSONResponse(
+                    status_code=413,
+                    content={"status": "rejected", "reason": "diff_too_large", "detail": str(exc)},
+                )
+            chunks, skipped = split_review_diff(review_input.diff, review_config)
+            try:
+                if len(chunks) <= 1:
+                    prompt = build_review_job_prompt(
+                        chunks[0] if chunks else "",
+                        phil_config.name,
+                        owner_name,
+                        repo_slug,
+                        pr_number,
+                        skipped_paths=skipped,
+                        review_input=review_input,
+                    )
+                    job = await app.state.queue.enqueue_pr_review(
+                        owner_name, repo_slug, pr_number, prompt, priority=priority, head_sha=head_sha
+                    )
+                    jobs = [job]
+                else:
+                    prompts = [
+                        build_review_job_prompt(
+                            chunk,
+                            phil_config.name,
+                            owner_name,
+                            repo_slug,
+                            pr_number,
+                            part=(position, len(chunks)),
+                            skipped_paths=skipped,
+                            review_input=review_input,
+                        )
+                        for position, chunk in enumerate(chunks, start=1)
+                    ]
+                    summary = build_review_summary_prompt(phil_config.name, owner_name, repo_slug, pr_number, len(chunks))
+                    jobs = await app.state.queue.enqueue_review_group(
+                        owner_name, repo_slug, pr_number, prompts, summary, priority=priority, head_sha=head_sha
+                    )
+            except QueueFullError as exc:
+                return _queue_full_response(exc)
+            return JSONResponse(
+                status_code=202,
+                content={
+                    "status": "accepted",
+                    "pr": pr_number,
+                    "job_id": jobs[0].id,
+                    "job_ids": [job.id for job in jobs],
+                },
             )
-            prompt = build_review_job_prompt(diff, phil_config.name, str(repo_owner), str(repo_name), pr_number)
-            job = await app.state.queue.enqueue_pr_review(str(repo_owner), str(repo_name), pr_number, prompt)
-            return JSONResponse(status_code=202, content={"status": "accepted", "pr": pr_number, "job_id": job.id})
 
-        background_tasks.add_task(run_review, joan_config, phil_config, str(repo_owner), str(repo_name), pr_number)
-        return JSONResponse(status_code=202, content={"status": "accepted", "pr": pr_number})
+        # The dispatcher fetches the diff itself, so the queued job carries no prompt.
+        try:
+            job = await app.state.queue.enqueue_pr_review(
+                owner_name, repo_slug, pr_number, "", priority=priority, head_sha=head_sha, base_sha=base_sha
+            )
+        except QueueFullError as exc:
+            return _queue_full_response(exc)
+        return JSONResponse(status_code=202, content={"status": "accepted", "pr": pr_number, "job_id": job.id})
+
+    @app.get("/events/wait")
+    async def events_wait(
+        owner: str,
+        repo: str,
+        pr: int,
+        since: int = -1,
+        timeout: float = Query(30.0, ge=0, le=300),
+    ) -> dict[str, int]:
+        return {"seq": await app.state.pr_events.wait(owner, repo, pr, since, timeout)}
+
+    def authorized_worker(request: Request) -> WorkerRecord | None:
+        token = _bearer_token(request)
+        if token:
+            worker = app.state.workers.authenticate(token)
+            if worker is None:
+                raise HTTPException(status_code=401, detail="unknown worker token; register again")
+            return worker
+        if phil_config.worker.registration_token:
+            raise HTTPException(status_code=401, detail="worker token required")
+        return None
+
+    def authorized_reader(request: Request) -> None:
+        # Job snapshots carry agent transcripts; with auth on, only workers or the registration token may read them.
+        expected = phil_config.worker.registration_token
+        if expected and hmac.compare_digest(_bearer_token(request), expected):
+            return
+        authorized_worker(request)
+
+    @app.get("/work")
+    async def work_list(
+        request: Request,
+        status: str | None = None,
+        owner: str | None = None,
+        repo: str | None = None,
+        pr: int | None = None,
+        cursor: str | None = None,
+        limit: int = Query(50, ge=1, le=500),
+    ) -> dict[str, Any]:
+        authorized_reader(request)
+        try:
+            jobs, next_cursor = await app.state.queue.list_jobs(
+                status=status,
+                owner=owner,
+                repo=repo,
+                pr_number=pr,
+                cursor=cursor,
+                limit=limit,
+            )
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+        return {"jobs": jobs, "next_cursor": next_cursor}
+
+    @app.get("/work/{job_id}")
+    async def work_get(job_id: str, request: Request) -> dict[str, Any]:
+        authorized_reader(request)
+        try:
+            return app.state.queue.snapshot(job_id)
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=f"unknown job: {job_id}") from exc
+
+    @app.post("/workers/register")
+    async def workers_register(request: Request, payload: dict[str, Any]) -> dict[str, str]:
+        expected = phil_config.worker.registration_token
+        if expected and not hmac.compare_digest(_bearer_token(request), expected):
+            raise HTTPException(status_code=401, detail="invalid registration token")
+        repos = payload.get("repos", [])
+        if not isinstance(repos, list) or not all(isinstance(item, str) for item in repos):
+            raise HTTPException(status_code=400, detail="repos must be a list of owner/name strings")
+        record, token = app.state.workers.register(
+            str(payload.get("name", "")), str(payload.get("agent", "")), repos
+        )
+        return {"worker_id": record.id, "token": token}
+
+    @app.get("/workers")
+    async def workers_list(request: Request) -> dict[str, Any]:
+        authorized_reader(request)
+        return {"workers": [worker.summary() for worker in app.state.workers.list()]}
 
     @app.post("/work/claim")
-    async def work_claim() -> Response:
-        job = await app.state.queue.claim_next()
+    async def work_claim(request: Request) -> Response:
+        worker = authorized_worker(request)
+        if not effective_worker_mode:
+            return Response(status_code=204)
+        if worker is None:
+            job = await app.state.queue.claim_next()
+        else:
+            job = await app.state.queue.claim_next(
+                worker.id,
+                lambda job: worker.serves(job.owner, job.repo, _required_agent(phil_config, job)),
+            )
         if job is None:
             return Response(status_code=204)
+        if worker is not None:
+            worker.claims += 1
         return JSONResponse(status_code=200, content=app.state.queue.serialize_claim(job))
 
     @app.post("/work/{job_id}/complete")
-    async def work_complete(job_id: str, payload: dict[str, Any]) -> dict[str, str]:
+    async def work_complete(job_id: str, payload: dict[str, Any], request: Request) -> dict[str, str]:
+        worker = authorized_worker(request)
         transcript = str(payload.get("transcript", ""))
+        usage = _reported_usage(payload)
         try:
-            await app.state.queue.complete(job_id, transcript)
+            job = await app.state.queue.complete(job_id, transcript, worker.id if worker else None, usage)
         except KeyError as exc:
             raise HTTPException(status_code=404, detail=f"unknown job: {job_id}") from exc
+        except PermissionError as exc:
+            raise HTTPException(status_code=409, detail=f"job is claimed by another worker: {job_id}") from exc
         except ValueError as exc:
             raise HTTPException(status_code=409, detail=f"job is not claimed: {job_id}") from exc
+        _record_review(app.state.review_history, job)
+        if usage is not None:
+            app.state.agent_usage.add(usage)
         return {"status": "completed"}
 
+    @app.post("/work/{job_id}/release")
+    async def work_release(job_id: str, payload: dict[str, Any], request: Request) -> dict[str, str]:
+        # A worker that is shutting down hands its job back so another worker can take it.
+        worker = authorized_worker(request)
+        reason = str(payload.get("reason", "released by worker"))
+        transcript = payload.get("transcript")
+        transcript_text = str(transcript) if transcript is not None else None
+        try:
+            await app.state.queue.requeue(job_id, reason, transcript_text, worker.id if worker else None)
+        except KeyError as exc:
+            raise HTTPException(status_code=404, detail=f"unknown job: {job_id}") from exc
+        except PermissionError as exc:
+            raise HTTPException(status_code=409, detail=f"job is claimed by another worker: {job_id}") from exc
+        except ValueError as exc:
+            raise HTTPException(status_code=409, detail=f"job is not claimed: {job_id}") from exc
+        return {"status": "pending"}
+
     @app.post("/work/{job_id}/fail")
-    async def work_fail(job_id: str, payload: dict[str, Any]) -> dict[str, str]:
+    async def work_fail(job_id: str, payload: dict[str, Any], request: Request) -> dict[str, str]:
+        worker = authorized_worker(request)
         error = str(payload.get("error", "job failed"))
         transcript = payload.get("transcript")
         transcript_text = str(transcript) if transcript is not None else None
+        usage = _reported_usage(payload)
         try:
-            await app.state.queue.fail(job_id, error, transcript_text)
+            await app.state.queue.fail(job_id, error, transcript_text, worker.id if worker else None, usage)
         except KeyError as exc:
             raise HTTPException(status_code=404, detail=f"unknown job: {job_id}") from exc
+        except PermissionError as exc:
+            raise HTTPException(status_code=409, detail=f"job is claimed by another worker: {job_id}") from exc
         except ValueError as exc:
             raise HTTPException(status_code=409, detail=f"job is not claimed: {job_id}") from exc
+        if usage is not None:
+            app.state.agent_usage.add(usage)
         return {"status": "failed"}
 
     return app
 
 
-def build_review_job_prompt(diff: str, agent_name: str, owner: str, repo: str, pr_number: int) -> str:
+def fetch_review_input(
+    client: ForgejoClient,
+    agent_name: str,
+    owner: str,
+    repo: str,
+    pr_number: int,
+    head_sha: str | None,
+    since_sha: str | None = None,
+    base_sha: str | None = None,
+    diff_cache: DiffCache | None = None,
+    review: AgentReviewConfig | None = None,
+    diff_downloads: SingleFlight[str] | None = None,
+) -> ReviewInput:
+    review = review if review is not None else AgentReviewConfig()
+    if head_sha and since_sha and since_sha != head_sha:
+        try:
+            diff = _cached_diff(
+                diff_cache,
+                diff_downloads,
+                owner,
+                repo,
+                since_sha,
+                head_sha,
+                review.skip_globs,
+                lambda: _read_diff(
+                    client.stream_compare_diff(owner, repo, since_sha, head_sha, review.max_diff_bytes), review
+                ),
+            )
+        except DiffTooLargeError:
+            raise
+        except ForgejoError:
+            # A force push can drop the old head; fall back to reviewing the whole PR.
+            pass
+        else:
+            comments = [
+                comment
+                for comment in client.fetch_comments(owner, repo, pr_number)
+                if comment.author == agent_name and not comment.resolved
+            ]
+            return ReviewInput(diff=diff, since_sha=since_sha, previous_comments=comments)
+    diff = _cached_diff(
+        diff_cache,
+        diff_downloads,
+        owner,
+        repo,
+        base_sha,
+        head_sha,
+        review.skip_globs,
+        lambda: _read_diff(client.stream_pr_diff(owner, repo, pr_number, review.max_diff_bytes), review),
+    )
+    return ReviewInput(diff=diff)
+
+
+def split_review_diff(diff: str, review: AgentReviewConfig) -> tuple[list[str], list[str]]:
+    files = parse_unified_diff(diff)
+    if not files:
+        return ([diff] if diff.strip() else []), []
+    kept, skipped = filter_diff_files(files, review.skip_globs)
+    return pack_diff_chunks(kept, review.max_chunk_tokens), skipped
+
+
+def build_review_job_prompt(
+    diff: str,
+    agent_name: str,
+    owner: str,
+    repo: str,
+    pr_number: int,
+    part: tuple[int, int] | None = None,
+    skipped_paths: list[str] | None = None,
+    review_input: ReviewInput | None = None,
+) -> str:
     system_prompt = _load_system_prompt().strip()
     inline_command = (
         f"joan pr comment add --agent {agent_name} --owner {owner} --repo {repo} "
         f"--pr {pr_number} --path <path> --line <line> --body \"<comment>\""
     )
-    review_command = (
-        f"joan pr review submit --agent {agent_name} --owner {owner} --repo {repo} "
-        f"--pr {pr_number} --verdict <approve|request_changes|comment> --body \"<summary>\""
-    )
+    review_command = _review_submit_command(agent_name, owner, repo, pr_number)
+    if part is None:
+        scope = f"You are reviewing PR #{pr_number} for {owner}/{repo}.\n"
+        finish = (
+            "When you are done, post exactly one final summary review using:\n"
+            f"{review_command}\n\n"
+            "Only post comments for real issues. After posting the final review, exit the CLI session.\n\n"
+        )
+    else:
+        position, total = part
+        scope = (
+            f"You are reviewing part {position} of {total} of PR #{pr_number} for {owner}/{repo}. "
+            "The other parts are reviewed separately.\n"
+        )
+        finish = (
+            "Do not submit a final review for this part; a separate pass posts one review for the whole PR.\n\n"
+            "Only post comments for real issues. When you are done with this part, exit the CLI session.\n\n"
+        )
     return (
         f"{system_prompt}\n\n"
-        f"You are reviewing PR #{pr_number} for {owner}/{repo}.\n"
+        f"{scope}"
         "Use Joan CLI commands to post your findings.\n"
         "For each concrete issue, post one inline comment immediately using this shape:\n"
         f"{inline_command}\n\n"
-        "When you are done, post exactly one final summary review using:\n"
-        f"{review_command}\n\n"
-        "Only post comments for real issues. After posting the final review, exit the CLI session.\n\n"
+        f"{finish}"
+        f"{_skipped_note(skipped_paths)}"
+        f"{_incremental_note(review_input)}"
         "Review this diff:\n\n"
         f"```diff\n{diff}\n```"
     )
 
 
+def build_review_summary_prompt(agent_name: str, owner: str, repo: str, pr_number: int, parts: int) -> str:
+    system_prompt = _load_system_prompt().strip()
+    return (
+        f"{system_prompt}\n\n"
+        f"PR #{pr_number} for {owner}/{repo} was too large for one pass and was reviewed in {parts} parts. "
+        "Inline comments from every part are already posted.\n"
+        "Read them with:\n"
+        f"joan api GET /api/v1/repos/{owner}/{repo}/pulls/{pr_number}/reviews\n"
+        f"joan pr comments --pr {pr_number} --all\n\n"
+        "Then post exactly one final summary review that merges those findings using:\n"
+        f"{_review_submit_command(agent_name, owner, repo, pr_number)}\n\n"
+        "Do not post new inline comments. After posting the final review, exit the CLI session."
+    )
+
+
+def merge_chunk_reviews(reviews: list[dict[str, Any]], skipped_paths: list[str] | None = None) -> dict[str, Any]:
+    verdicts = [str(review.get("verdict", "comment")).lower() for review in reviews]
+    if "request_changes" in verdicts:
+        verdict = "request_changes"
+    elif verdicts and all(item == "approve" for item in verdicts):
+        verdict = "approve"
+    else:
+        verdict = "comment"
+
+    comments: list[dict[str, Any]] = []
+    seen: set[tuple[str, object, str]] = set()
+    for review in reviews:
+        for comment in review.get("comments", []) or []:
+            if not isinstance(comment, dict):
+                continue
+            line = comment.get("new_position", comment.get("line"))
+            key = (str(comment.get("path", "")), line, str(comment.get("body", "")))
+            if key in seen:
+                continue
+            seen.add(key)
+            comments.append(comment)
+
+    bodies = [str(review.get("body", "")).strip() for review in reviews]
+    if len(reviews) > 1:
+        body = "\n\n".join(f"**Part {index}:** {text}" for index, text in enumerate(bodies, start=1) if text)
+    else:
+        body = bodies[0] if bodies else ""
+    if skipped_paths:
+        body = f"{body}\n\n{_skipped_note(skipped_paths)}".strip()
+    return {"body": body, "verdict": verdict, "comments": comments}
+
+
+def pr_priority(pull_request: dict[str, Any], priority_labels: dict[str, int]) -> int:
+    labels = pull_request.get("labels") or []
+    matched = [
+        priority_labels[str(label.get("name", ""))]
+        for label in labels
+        if isinstance(label, dict) and str(label.get("name", "")) in priority_labels
+    ]
+    return max(matched) if matched else 0
+
+
 def run_review(
     joan_config: Config,
     phil_config: AgentConfig,
     owner: str,
     repo: str,
     pr_number: int,
-) -> None:
-    joan_client = ForgejoClient(joan_config.forgejo.url, joan_config.forgejo.token)
-    diff = joan_client.get_pr_diff(owner, repo, pr_number)
-
-    system_prompt = _load_system_prompt()
-    raw_output = run_claude_review(diff, system_prompt, phil_config.claude.model)
-
-    review = _parse_review_output(raw_output)
-    if review is None:
-        raise RuntimeError(f"invalid claude review output for PR #{pr_number}")
-
-    phil_client = ForgejoClient(joan_config.forgejo.url, phil_config.forgejo.token)
-    phil_client.create_review(
-        owner=owner,
-        repo=repo,
-        index=pr_number,
-        body=str(review.get("body", "")),
-        verdict=str(review.get("verdict", "comment")),
-        comments=list(review.get("comments", [])),
+    head_sha: str | None = None,
+    since_sha: str | None = None,
+    base_sha: str | None = None,
+    diff_cache: DiffCache | None = None,
+) -> dict[str, Any]:
+    joan_client = ForgejoClient(joan_config.forgejo.url, joan_config.forgejo.token, http=joan_config.forgejo.http)
+    with span("review.fetch", "phil", repo=f"{owner}/{repo}", pr=pr_number):
+        review_input = fetch_review_input(
+            joan_client,
+            phil_config.name,
+            owner,
+            repo,
+            pr_number,
+            head_sha,
+            since_sha=since_sha,
+            base_sha=base_sha,
+            diff_cache=diff_cache,
+            review=phil_config.review,
+        )
+    chunks, skipped = split_review_diff(review_input.diff, phil_config.review)
+    note = _incremental_note(review_input)
+
+    if chunks:
+        system_prompt = _load_system_prompt()
+        total = len(chunks)
+
+        def review_chunk(item: tuple[int, str]) -> str:
+            position, chunk = item
+            part = (position, total) if total > 1 else None
+            with span("agent.review_chunk", "agent", part=position, bytes=len(chunk)):
+                return run_claude_review(
+                    chunk,
+                    system_prompt,
+                    phil_config.claude.model,
+                    part=part,
+                    note=note,
+                    timeout_seconds=phil_config.claude.timeout_seconds,
+                )
+
+        with ThreadPoolExecutor(max_workers=min(total, phil_config.review.max_parallel_chunks)) as pool:
+            raw_outputs = list(pool.map(review_chunk, enumerate(chunks, start=1)))
+
+        reviews: list[dict[str, Any]] = []
+        for raw_output in raw_outputs:
+            parsed = _parse_review_output(raw_output)
+            if parsed is None:
+                raise RuntimeError(f"invalid claude review output for PR #{pr_number}")
+            reviews.append(parsed)
+        review = merge_chunk_reviews(reviews, skipped)
+    else:
+        review = merge_chunk_reviews([], skipped)
+
+    phil_client = ForgejoClient(joan_config.forgejo.url, phil_config.forgejo.token, http=joan_config.forgejo.http)
+    with span("review.post", "phil", comments=len(review.get("comments", []))):
+        phil_client.create_review(
+            owner=owner,
+            repo=repo,
+            index=pr_number,
+            body=str(review.get("body", "")),
+            verdict=str(review.get("verdict", "comment")),
+            comments=list(review.get("comments", [])),
+        )
+    return review
+
+
+def run_claude_review(
+    diff: str,
+    system_prompt: str,
+    model: str,
+    part: tuple[int, int] | None = None,
+    note: str = "",
+    timeout_seconds: float = 120.0,
+) -> str:
+    scope = "the following git diff" if part is None else f"part {part[0]} of {part[1]} of a larger git diff"
+    user_message = f"{note}Please review {scope}:\n\n```diff\n{diff}\n```"
+    try:
+        result = subprocess.run(
+            ["claude", "--print", "--model", model, "--system", system_prompt, user_message],
+            capture_output=True,
+            text=True,
+            timeout=timeout_seconds,
+            check=False,
+        )
+    except subprocess.TimeoutExpired as exc:
+        raise TransientReviewError(f"claude timed out after {timeout_seconds:g}s") from exc
+    if result.returncode != 0:
+        raise RuntimeError(f"claude subprocess failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def _review_process_pool(max_workers: int) -> Executor:
+    # Spawned children do not inherit the server's threads or open sockets.
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _direct_review_call(app: FastAPI, job: ReviewJob) -> Callable[[], object]:
+    return partial(
+        run_review,
+        app.state.repos.joan_config_for(job.owner, job.repo),
+        app.state.repos.agent_config_for(job.owner, job.repo),
+        job.owner,
+        job.repo,
+        job.pr_number,
+        head_sha=job.head_sha,
+        since_sha=app.state.review_history.last_reviewed_sha(job.owner, job.repo, job.pr_number),
+        base_sha=job.base_sha,
+        diff_cache=app.state.diff_cache,
     )
 
 
-def run_claude_review(diff: str, system_prompt: str, model: str) -> str:
-    user_message = f"Please review the following git diff:\n\n```diff\n{diff}\n```"
-    result = subprocess.run(
-        ["claude", "--print", "--model", model, "--system", system_prompt, user_message],
-        capture_output=True,
-        text=True,
-        timeout=120,
-        check=False,
+def _reported_usage(payload: dict[str, Any]) -> dict[str, float] | None:
+    usage = payload.get("usage")
+    if not isinstance(usage, dict):
+        return None
+    return {
+        str(key): float(value)
+        for key, value in usage.items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+
+
+def _bearer_token(request: Request) -> str:
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return token.strip() if scheme.lower() == "bearer" else ""
+
+
+def _required_agent(phil_config: AgentConfig, job: ReviewJob) -> str:
+    repo_config = phil_config.repos.get(f"{job.owner}/{job.repo}")
+    return repo_config.agent if repo_config is not None else ""
+
+
+def _record_review(history: ReviewHistory, job: ReviewJob) -> None:
+    if job.kind in REVIEW_KINDS and job.head_sha:
+        history.record(job.owner, job.repo, job.pr_number, job.head_sha)
+
+
+def _review_submit_command(agent_name: str, owner: str, repo: str, pr_number: int) -> str:
+    return (
+        f"joan pr review submit --agent {agent_name} --owner {owner} --repo {repo} "
+        f"--pr {pr_number} --verdict <approve|request_changes|comment> --body \"<summary>\""
     )
-    if result.returncode != 0:
-        raise RuntimeError(f"claude subprocess failed: {result.stderr.strip()}")
-    return result.stdout
 
 
+def _skipped_note(skipped_paths: list[str] | None) -> str:
+    if not skipped_paths:
+        return ""
+    listed = ", ".join(skipped_paths[:20])
+    more = f" and {len(skipped_paths) - 20} more" if len(skipped_paths) > 20 else ""
+    return f"Generated, lock and vendored files were left out of this review: {listed}{more}.\n\n"
+
+
+def _incremental_note(review_input: ReviewInput | None) -> str:
+    if review_input is None or not review_input.since_sha:
+        return ""
+    note = (
+        f"You already reviewed this PR at commit {review_input.since_sha[:12]}. "
+        "The diff below only covers commits pushed since then.\n"
+    )
+    if review_input.previous_comments:
+        listed = "\n".join(
+            f"- {comment.path or '(general)'}{f':{comment.line}' if comment.line else ''}: {comment.body.strip()}"
+            for comment in review_input.previous_comments
+        )
+        note += (
+            "Your earlier comments that are still unresolved:\n"
+            f"{listed}\n"
+            "Check whether the new commits address them and do not repeat ones that are already posted.\n"
+        )
+    return note + "\n"
+
+
+def _read_diff(sections: Iterable[str], review: AgentReviewConfig) -> str:
+    return "".join(stub_skipped_sections(sections, review.skip_globs))
+
+
+def _cached_diff(
+    cache: DiffCache | None,
+    downloads: SingleFlight[str] | None,
+    owner: str,
+    repo: str,
+    base_sha: str | None,
+    head_sha: str | None,
+    skip_globs: list[str],
+    fetch: Callable[[], str],
+) -> str:
+    if cache is None or not base_sha or not head_sha:
+        return fetch()
+
+    def load() -> str:
+        diff = cache.get(owner, repo, base_sha, head_sha, skip_globs)
+        if diff is None:
+            diff = fetch()
+            cache.put(owner, repo, base_sha, head_sha, diff, skip_globs)
+        return diff
+
+    if downloads is None:
+        return load()
+    # Concurrent reviews of the same range wait for one download.
+    diff, _shared = downloads.do((owner, repo, base_sha, head_sha, tuple(skip_globs)), load)
+    return diff
+
+
+@lru_cache(maxsize=1)
 def _load_system_prompt() -> str:
     return files("joan.data.agents").joinpath("phil-system-prompt.txt").read_text(encoding="utf-8")
 
@@ -183,6 +802,14 @@ def _parse_review_output(raw: str) -> dict[str, Any] | None:
     return data
 
 
+def _queue_full_response(exc: QueueFullError) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after_seconds)},
+        content={"status": "rejected", "reason": exc.reason},
+    )
+
+
 def _validate_signature(signature: str, body: bytes, secret: str) -> None:
     if not secret:
         return
@@ -1,11 +1,25 @@
 from __future__ import annotations
 
 import asyncio
-from collections import deque
+from bisect import bisect_left, insort
+from collections.abc import Callable
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from uuid import uuid4
 
+from joan.phil.prompt_store import PromptStore
+from joan.phil.scheduling import FifoScheduler, Scheduler
+
+JOB_STATUSES = ("pending", "claimed", "completed", "failed", "superseded")
+_SUMMARY_EXCLUDED_FIELDS = ("transcript",)
+
+
+class QueueFullError(RuntimeError):
+    def __init__(self, reason: str, retry_after_seconds: int) -> None:
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after_seconds = retry_after_seconds
+
 
 @dataclass(slots=True)
 class ReviewJob:
@@ -19,85 +33,291 @@ class ReviewJob:
     owner: str
     repo: str
     pr_number: int
-    prompt: str
+    prompt_ref: str
     transcript: str | None = None
     error: str | None = None
+    priority: int = 0
+    size_bytes: int = 0
+    group_id: str | None = None
+    head_sha: str | None = None
+    base_sha: str | None = None
+    attempts: int = 0
+    worker_id: str | None = None
+    usage: dict[str, float] | None = None
+
+
+@dataclass(slots=True)
+class _ReviewGroup:
+    remaining: int
+    summary_prompt_ref: str
+    priority: int
+    head_sha: str | None
 
 
 class ReviewWorkQueue:
-    def __init__(self) -> None:
-        self._pending: deque[str] = deque()
+    def __init__(
+        self,
+        scheduler: Scheduler | None = None,
+        prompts: PromptStore | None = None,
+        *,
+        max_depth: int = 0,
+        max_prompt_bytes: int = 0,
+        overflow: str = "reject",
+        retry_after_seconds: int = 30,
+    ) -> None:
+        self._scheduler: Scheduler = scheduler if scheduler is not None else FifoScheduler()
+        self._prompts = prompts or PromptStore()
+        self._max_depth = max_depth
+        self._max_prompt_bytes = max_prompt_bytes
+        self._overflow = overflow
+        self._retry_after_seconds = retry_after_seconds
+        self._queued_prompt_bytes = 0
+        self._rejected = 0
+        self._shed = 0
         self._jobs: dict[str, ReviewJob] = {}
+        self._groups: dict[str, _ReviewGroup] = {}
         self._claimed: set[str] = set()
         self._lock = asyncio.Lock()
+        self._work_available = asyncio.Event()
+        # Secondary indexes hold job sequence numbers in ascending order so that
+        # listing is a bisect plus a slice instead of a scan over every job.
+        self._next_seq = 0
+        self._seq_by_id: dict[str, int] = {}
+        self._id_by_seq: dict[int, str] = {}
+        self._all: list[int] = []
+        self._by_status: dict[str, list[int]] = {status: [] for status in JOB_STATUSES}
+        self._by_repo: dict[tuple[str, str], list[int]] = {}
+        self._by_pr: dict[tuple[str, str, int], list[int]] = {}
 
-    async def enqueue_pr_review(self, owner: str, repo: str, pr_number: int, prompt: str) -> ReviewJob:
+    async def enqueue_pr_review(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        prompt: str,
+        priority: int = 0,
+        head_sha: str | None = None,
+        base_sha: str | None = None,
+    ) -> ReviewJob:
+        size_bytes = len(prompt.encode("utf-8"))
         async with self._lock:
-            job = ReviewJob(
-                id=f"job_{uuid4().hex}",
-                kind="pr_review",
-                status="pending",
-                created_at=datetime.now(UTC),
-                claimed_at=None,
-                completed_at=None,
-                failed_at=None,
-                owner=owner,
-                repo=repo,
-                pr_number=pr_number,
-                prompt=prompt,
+            self._admit(owner, repo, pr_number, size_bytes)
+            job_id = f"job_{uuid4().hex}"
+            prompt_ref = self._prompts.write(job_id, prompt)
+            return self._add_job(
+                job_id,
+                "pr_review",
+                owner,
+                repo,
+                pr_number,
+                prompt_ref,
+                size_bytes,
+                priority,
+                head_sha=head_sha,
+                base_sha=base_sha,
             )
-            self._jobs[job.id] = job
-            self._pending.append(job.id)
-            return job
 
-    async def claim_next(self) -> ReviewJob | None:
+    async def enqueue_review_group(
+        self,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        chunk_prompts: list[str],
+        summary_prompt: str,
+        priority: int = 0,
+        head_sha: str | None = None,
+    ) -> list[ReviewJob]:
+        # Chunk jobs can be claimed in parallel; the summary job is only queued
+        # once every chunk has finished so it sees all of their inline comments.
+        sizes = [len(prompt.encode("utf-8")) for prompt in chunk_prompts]
+        async with self._lock:
+            self._admit(owner, repo, pr_number, sum(sizes), job_count=len(chunk_prompts))
+            group_id = f"group_{uuid4().hex}"
+            self._groups[group_id] = _ReviewGroup(
+                remaining=len(chunk_prompts),
+                summary_prompt_ref=self._prompts.write(f"{group_id}_summary", summary_prompt),
+                priority=priority,
+                head_sha=head_sha,
+            )
+            jobs: list[ReviewJob] = []
+            for prompt, size_bytes in zip(chunk_prompts, sizes, strict=True):
+                job_id = f"job_{uuid4().hex}"
+                prompt_ref = self._prompts.write(job_id, prompt)
+                job = self._add_job(
+                    job_id, "pr_review_chunk", owner, repo, pr_number, prompt_ref, size_bytes, priority, group_id, head_sha
+                )
+                jobs.append(job)
+            return jobs
+
+    async def claim_next(
+        self,
+        worker_id: str | None = None,
+        accepts: Callable[[ReviewJob], bool] | None = None,
+    ) -> ReviewJob | None:
         async with self._lock:
-            if not self._pending:
+            skipped: list[ReviewJob] = []
+            try:
+                for _ in range(len(self._scheduler)):
+                    job = self._scheduler.pop()
+                    if job is None:
+                        break
+                    if job.status != "pending":
+                        # Shed jobs stay in the scheduler until popped; hand back
+                        # any concurrency slot they were just granted.
+                        self._scheduler.release(job)
+                        continue
+                    if accepts is not None and not accepts(job):
+                        skipped.append(job)
+                        continue
+                    self._queued_prompt_bytes -= job.size_bytes
+                    self._set_status(job, "claimed")
+                    job.claimed_at = datetime.now(UTC)
+                    job.attempts += 1
+                    job.worker_id = worker_id
+                    self._claimed.add(job.id)
+                    return job
+                if not skipped:
+                    self._work_available.clear()
                 return None
-            job_id = self._pending.popleft()
-            job = self._jobs[job_id]
-            job.status = "claimed"
-            job.claimed_at = datetime.now(UTC)
-            self._claimed.add(job_id)
+            finally:
+                # Jobs this worker cannot take go back in their original order.
+                for job in reversed(skipped):
+                    self._scheduler.restore(job)
+
+    async def wait_for_work(self) -> None:
+        await self._work_available.wait()
+
+    async def requeue(
+        self,
+        job_id: str,
+        error: str | None = None,
+        transcript: str | None = None,
+        worker_id: str | None = None,
+    ) -> ReviewJob:
+        async with self._lock:
+            job = self._require_claimed(job_id, worker_id)
+            self._set_status(job, "pending")
+            job.claimed_at = None
+            job.worker_id = None
+            job.error = error
+            job.transcript = transcript
+            self._claimed.remove(job_id)
+            self._scheduler.release(job)
+            self._queued_prompt_bytes += job.size_bytes
+            self._scheduler.push(job)
+            self._work_available.set()
             return job
 
-    async def complete(self, job_id: str, transcript: str) -> ReviewJob:
+    async def complete(
+        self,
+        job_id: str,
+        transcript: str,
+        worker_id: str | None = None,
+        usage: dict[str, float] | None = None,
+    ) -> ReviewJob:
         async with self._lock:
-            job = self._require_claimed(job_id)
-            job.status = "completed"
+            job = self._require_claimed(job_id, worker_id)
+            self._set_status(job, "completed")
             job.completed_at = datetime.now(UTC)
             job.transcript = transcript
+            job.usage = usage
             self._claimed.remove(job_id)
+            self._release(job)
+            self._prompts.delete(job.prompt_ref)
+            self._advance_group(job)
             return job
 
-    async def fail(self, job_id: str, error: str, transcript: str | None = None) -> ReviewJob:
+    async def fail(
+        self,
+        job_id: str,
+        error: str,
+        transcript: str | None = None,
+        worker_id: str | None = None,
+        usage: dict[str, float] | None = None,
+    ) -> ReviewJob:
         async with self._lock:
-            job = self._require_claimed(job_id)
-            job.status = "failed"
+            job = self._require_claimed(job_id, worker_id)
+            self._set_status(job, "failed")
             job.failed_at = datetime.now(UTC)
             job.error = error
             job.transcript = transcript
+            job.usage = usage
             self._claimed.remove(job_id)
+            self._release(job)
+            self._prompts.delete(job.prompt_ref)
+            self._advance_group(job)
             return job
 
+    async def check_capacity(self) -> None:
+        async with self._lock:
+            self._admit(None, None, None, 0)
+
     async def stats(self) -> dict[str, int]:
         async with self._lock:
-            failed = sum(1 for job in self._jobs.values() if job.status == "failed")
             return {
-                "queue_depth": len(self._pending),
+                "queue_depth": len(self._by_status["pending"]),
                 "claimed": len(self._claimed),
-                "failed": failed,
+                "failed": len(self._by_status["failed"]),
+                "queued_prompt_bytes": self._queued_prompt_bytes,
+                "rejected": self._rejected,
+                "shed": self._shed,
             }
 
+    async def list_jobs(
+        self,
+        *,
+        status: str | None = None,
+        owner: str | None = None,
+        repo: str | None = None,
+        pr_number: int | None = None,
+        cursor: str | None = None,
+        limit: int = 50,
+    ) -> tuple[list[dict[str, object]], str | None]:
+        if status is not None and status not in self._by_status:
+            raise ValueError(f"unknown status: {status}")
+        if pr_number is not None and (owner is None or repo is None):
+            raise ValueError("pr filter requires owner and repo")
+        if (owner is None) != (repo is None):
+            raise ValueError("owner and repo filters must be given together")
+        before = _decode_cursor(cursor)
+
+        async with self._lock:
+            candidates: list[list[int]] = []
+            if status is not None:
+                candidates.append(self._by_status[status])
+            if pr_number is not None:
+                candidates.append(self._by_pr.get((str(owner), str(repo), pr_number), []))
+            elif owner is not None:
+                candidates.append(self._by_repo.get((owner, str(repo)), []))
+            index = min(candidates, key=len) if candidates else self._all
+
+            # Newest first: walk the index backwards from the cursor. The cursor is
+            # the sequence number of the last job on the previous page.
+            page: list[dict[str, object]] = []
+            position = bisect_left(index, before) if before is not None else len(index)
+            last_seq: int | None = None
+            while position > 0:
+                position -= 1
+                seq = index[position]
+                job = self._jobs[self._id_by_seq[seq]]
+                if not _matches(job, status, owner, repo, pr_number):
+                    continue
+                if len(page) == limit:
+                    return page, str(last_seq)
+                page.append(self._summary(job))
+                last_seq = seq
+            return page, None
+
     def serialize_claim(self, job: ReviewJob) -> dict[str, object]:
         return {
             "id": job.id,
             "kind": job.kind,
-            "prompt": job.prompt,
+            "prompt": self._prompts.read(job.prompt_ref),
             "context": {
                 "owner": job.owner,
                 "repo": job.repo,
                 "pr_number": job.pr_number,
+                "head_sha": job.head_sha,
             },
         }
 
@@ -110,9 +330,212 @@ class ReviewWorkQueue:
                 payload[key] = value.isoformat().replace("+00:00", "Z")
         return payload
 
-    def _require_claimed(self, job_id: str) -> ReviewJob:
+    def _add_job(
+        self,
+        job_id: str,
+        kind: str,
+        owner: str,
+        repo: str,
+        pr_number: int,
+        prompt_ref: str,
+        size_bytes: int,
+        priority: int,
+        group_id: str | None = None,
+        head_sha: str | None = None,
+        base_sha: str | None = None,
+    ) -> ReviewJob:
+        job = ReviewJob(
+            id=job_id,
+            kind=kind,
+            status="pending",
+            created_at=datetime.now(UTC),
+            claimed_at=None,
+            completed_at=None,
+            failed_at=None,
+            owner=owner,
+            repo=repo,
+            pr_number=pr_number,
+            prompt_ref=prompt_ref,
+            priority=priority,
+            size_bytes=size_bytes,
+            group_id=group_id,
+            head_sha=head_sha,
+            base_sha=base_sha,
+        )
+        self._queued_prompt_bytes += size_bytes
+        self._jobs[job.id] = job
+        self._index(job)
+        self._scheduler.push(job)
+        self._work_available.set()
+        return job
+
+    def _release(self, job: ReviewJob) -> None:
+        self._scheduler.release(job)
+        # A per-repo cap may have held back every pending job at the last claim,
+        # which cleared the event; the freed slot can make one claimable again.
+        if len(self._scheduler):
+            self._work_available.set()
+
+    def _advance_group(self, job: ReviewJob) -> None:
+        if job.group_id is None or job.kind != "pr_review_chunk":
+            return
+        group = self._groups.get(job.group_id)
+        if group is None:
+            return
+        group.remaining -= 1
+        if group.remaining > 0:
+            return
+        del self._groups[job.group_id]
+        self._add_job(
+            f"job_{uuid4().hex}",
+            "pr_review_summary",
+            job.owner,
+            job.repo,
+            job.pr_number,
+            group.summary_prompt_ref,
+            0,
+            group.priority,
+            job.group_id,
+            group.head_sha,
+        )
+
+    def _admit(
+        self,
+        owner: str | None,
+        repo: str | None,
+        pr_number: int | None,
+        size_bytes: int,
+        job_count: int = 1,
+    ) -> None:
+        if self._fits(size_bytes, job_count):
+            return
+        if self._overflow == "shed":
+            for request in self._superseded_pending(owner, repo, pr_number):
+                for job in request:
+                    self._shed_job(job)
+                if self._fits(size_bytes, job_count):
+                    return
+        self._rejected += 1
+        if self._max_depth and len(self._by_status["pending"]) + job_count > self._max_depth:
+            reason = f"queue depth limit reached ({self._max_depth} pending jobs)"
+        else:
+            reason = f"queued prompt byte limit reached ({self._max_prompt_bytes} bytes)"
+        raise QueueFullError(reason, self._retry_after_seconds)
+
+    def _fits(self, size_bytes: int, job_count: int = 1) -> bool:
+        if self._max_depth and len(self._by_status["pending"]) + job_count > self._max_depth:
+            return False
+        if self._max_prompt_bytes and self._queued_prompt_bytes + size_bytes > self._max_prompt_bytes:
+            return False
+        return True
+
+    def _superseded_pending(
+        self, owner: str | None, repo: str | None, pr_number: int | None
+    ) -> list[list[ReviewJob]]:
+        # A pending request (one job, or every chunk of a review group) is
+        # superseded when a newer request for the same PR is queued, or is
+        # arriving right now. Groups are shed whole, so one with chunks already
+        # claimed is kept. Oldest first.
+        incoming = (owner, repo, pr_number)
+        requests: dict[str, list[ReviewJob]] = {}
+        for seq in self._by_status["pending"]:
+            job = self._jobs[self._id_by_seq[seq]]
+            requests.setdefault(_request_id(job), []).append(job)
+        superseded: list[list[ReviewJob]] = []
+        for request_id, jobs in requests.items():
+            key = (jobs[0].owner, jobs[0].repo, jobs[0].pr_number)
+            if key != incoming and self._newest_pending_request(key) == request_id:
+                continue
+            if jobs[0].kind == "pr_review_chunk":
+                group = self._groups.get(request_id)
+                if group is None or group.remaining != len(jobs):
+                    continue
+            superseded.append(jobs)
+        return superseded
+
+    def _newest_pending_request(self, key: tuple[str, str, int]) -> str | None:
+        for seq in reversed(self._by_pr.get(key, [])):
+            job = self._jobs[self._id_by_seq[seq]]
+            if job.status == "pending":
+                return _request_id(job)
+        return None
+
+    def _shed_job(self, job: ReviewJob) -> None:
+        self._set_status(job, "superseded")
+        job.failed_at = datetime.now(UTC)
+        job.error = "superseded by a newer review request for the same PR"
+        self._queued_prompt_bytes -= job.size_bytes
+        self._prompts.delete(job.prompt_ref)
+        self._shed += 1
+        if job.group_id is not None:
+            group = self._groups.pop(job.group_id, None)
+            if group is not None:
+                self._prompts.delete(group.summary_prompt_ref)
+
+    def _summary(self, job: ReviewJob) -> dict[str, object]:
+        payload = self.snapshot(job.id)
+        for key in _SUMMARY_EXCLUDED_FIELDS:
+            payload.pop(key, None)
+        return payload
+
+    def _index(self, job: ReviewJob) -> None:
+        seq = self._next_seq
+        self._next_seq += 1
+        self._seq_by_id[job.id] = seq
+        self._id_by_seq[seq] = job.id
+        self._all.append(seq)
+        self._by_status[job.status].append(seq)
+        self._by_repo.setdefault((job.owner, job.repo), []).append(seq)
+        self._by_pr.setdefault((job.owner, job.repo, job.pr_number), []).append(seq)
+
+    def _set_status(self, job: ReviewJob, status: str) -> None:
+        seq = self._seq_by_id[job.id]
+        previous = self._by_status[job.status]
+        position = bisect_left(previous, seq)
+        if position < len(previous) and previous[position] == seq:
+            del previous[position]
+        insort(self._by_status[status], seq)
+        job.status = status
+
+    def _require_claimed(self, job_id: str, worker_id: str | None = None) -> ReviewJob:
         if job_id not in self._jobs:
             raise KeyError(job_id)
         if job_id not in self._claimed:
             raise ValueError(job_id)
-        return self._jobs[job_id]
+        job = self._jobs[job_id]
+        if worker_id is not None and job.worker_id is not None and job.worker_id != worker_id:
+            raise PermissionError(job_id)
+        return job
+
+
+def _request_id(job: ReviewJob) -> str:
+    # Chunks and the summary of a review group came from one review request.
+    return job.group_id or job.id
+
+
+def _decode_cursor(cursor: str | None) -> int | None:
+    if cursor is None or cursor == "":
+        return None
+    try:
+        value = int(cursor)
+    except ValueError as exc:
+        raise ValueError(f"invalid cursor: {cursor}") from exc
+    if value < 0:
+        raise ValueError(f"invalid cursor: {cursor}")
+    return value
+
+
+def _matches(
+    job: ReviewJob,
+    status: str | None,
+    owner: str | None,
+    repo: str | None,
+    pr_number: int | None,
+) -> bool:
+    if status is not None and job.status != status:
+        return False
+    if owner is not None and (job.owner != owner or job.repo != repo):
+        return False
+    if pr_number is not None and job.pr_number != pr_number:
+        return False
+    return True
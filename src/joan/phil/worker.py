@@ -3,26 +3,54 @@ from __future__ import annotations
 import errno
 import os
 import pty
+import queue
+import resource
 import select
+import signal
 import subprocess
+import termios
 import threading
 import time
+from collections.abc import Callable
 from dataclasses import dataclass
 from pathlib import Path
 
 import httpx
 
+from joan.phil.limits import (
+    JobCgroup,
+    ResourceLimits,
+    ResourceUsage,
+    apply_limits,
+    open_job_cgroup,
+    usage_from_rusage,
+)
+from joan.phil.worktrees import WorktreePool
+from joan.shell.git_runner import GitError
+from joan.shell.tracing import span
+
+
+AGENT_STOP_GRACE_SECONDS = 5.0
+
 
 class WorkerClientError(RuntimeError):
     pass
 
 
+class WorkerUnauthorizedError(WorkerClientError):
+    pass
+
+
 class AgentRunError(RuntimeError):
     def __init__(self, message: str, transcript: str = "") -> None:
         super().__init__(message)
         self.transcript = transcript
 
 
+class AgentCancelledError(AgentRunError):
+    pass
+
+
 @dataclass(slots=True)
 class WorkerJob:
     id: str
@@ -31,17 +59,44 @@ class WorkerJob:
     owner: str
     repo: str
     pr_number: int
+    head_sha: str = ""
+
+
+@dataclass(slots=True)
+class WorkerRegistration:
+    name: str
+    agent: str
+    repos: list[str]
+    token: str = ""
 
 
 class WorkerClient:
-    def __init__(self, base_url: str, timeout: float = 10.0) -> None:
+    def __init__(self, base_url: str, timeout: float = 10.0, token: str | None = None) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        self.token = token
+        self.worker_id: str | None = None
+
+    def register(self, registration: WorkerRegistration) -> str:
+        response = self._request(
+            "POST",
+            "/workers/register",
+            json={"name": registration.name, "agent": registration.agent, "repos": registration.repos},
+            token=registration.token,
+        )
+        if response.status_code != 200:
+            raise WorkerClientError(f"register failed: HTTP {response.status_code} {response.text.strip()}")
+        data = response.json()
+        self.worker_id = str(data["worker_id"])
+        self.token = str(data["token"])
+        return self.worker_id
 
     def claim(self) -> WorkerJob | None:
         response = self._request("POST", "/work/claim")
         if response.status_code == 204:
             return None
+        if response.status_code == 401:
+            raise WorkerUnauthorizedError(f"claim refused: {response.text.strip()}")
         if response.status_code != 200:
             raise WorkerClientError(f"claim failed: HTTP {response.status_code} {response.text.strip()}")
         data = response.json()
@@ -53,59 +108,99 @@ class WorkerClient:
             owner=str(context.get("owner", "")),
             repo=str(context.get("repo", "")),
             pr_number=int(context.get("pr_number", 0)),
+            head_sha=str(context.get("head_sha") or ""),
         )
 
-    def complete(self, job_id: str, transcript: str) -> None:
-        response = self._request("POST", f"/work/{job_id}/complete", json={"transcript": transcript})
+    def complete(self, job_id: str, transcript: str, usage: dict[str, float] | None = None) -> None:
+        payload: dict[str, object] = {"transcript": transcript}
+        if usage:
+            payload["usage"] = usage
+        response = self._request("POST", f"/work/{job_id}/complete", json=payload)
         if response.status_code != 200:
             raise WorkerClientError(f"complete failed: HTTP {response.status_code} {response.text.strip()}")
 
-    def fail(self, job_id: str, error: str, transcript: str = "") -> None:
-        payload = {"error": error}
+    def fail(self, job_id: str, error: str, transcript: str = "", usage: dict[str, float] | None = None) -> None:
+        payload: dict[str, object] = {"error": error}
         if transcript:
             payload["transcript"] = transcript
+        if usage:
+            payload["usage"] = usage
         response = self._request("POST", f"/work/{job_id}/fail", json=payload)
         if response.status_code != 200:
             raise WorkerClientError(f"fail failed: HTTP {response.status_code} {response.text.strip()}")
 
-    def _request(self, method: str, path: str, **kwargs: object) -> httpx.Response:
+    def release(self, job_id: str, transcript: str = "", reason: str = "worker shutting down") -> None:
+        payload: dict[str, object] = {"reason": reason}
+        if transcript:
+            payload["transcript"] = transcript
+        response = self._request("POST", f"/work/{job_id}/release", json=payload)
+        if response.status_code != 200:
+            raise WorkerClientError(f"release failed: HTTP {response.status_code} {response.text.strip()}")
+
+    def _request(self, method: str, path: str, token: str | None = None, **kwargs: object) -> httpx.Response:
+        bearer = token if token is not None else self.token
+        headers = {"Authorization": f"Bearer {bearer}"} if bearer else None
         with httpx.Client(timeout=self.timeout) as client:
-            return client.request(method, f"{self.base_url}{path}", **kwargs)
+            return client.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
 
 
 class PTYAgentRunner:
-    def __init__(self, command: list[str], timeout_seconds: float, workdir: Path | None = None) -> None:
+    def __init__(
+        self,
+        command: list[str],
+        timeout_seconds: float,
+        workdir: Path | None = None,
+        limits: ResourceLimits | None = None,
+    ) -> None:
         self.command = command
         self.timeout_seconds = timeout_seconds
         self.workdir = workdir
+        self.limits = limits
+        self.last_usage: ResourceUsage | None = None
 
-    def run(self, prompt: str) -> str:
+    def run(
+        self,
+        prompt: str,
+        workdir: Path | None = None,
+        cancel_event: threading.Event | None = None,
+    ) -> str:
         if not self.command:
             raise AgentRunError("worker command is empty")
+        cwd = workdir or self.workdir
+        self.last_usage = None
 
+        try:
+            cgroup = open_job_cgroup(self.limits)
+        except OSError as exc:
+            raise AgentRunError(f"failed to create agent cgroup: {exc}") from exc
         master_fd, slave_fd = pty.openpty()
         proc: subprocess.Popen[bytes] | None = None
         transcript = bytearray()
+        started = time.monotonic()
+        rusage: resource.struct_rusage | None = None
         try:
             proc = subprocess.Popen(
                 self.command,
                 stdin=slave_fd,
                 stdout=slave_fd,
                 stderr=slave_fd,
-                cwd=str(self.workdir) if self.workdir is not None else None,
+                cwd=str(cwd) if cwd is not None else None,
                 start_new_session=True,
             )
             os.close(slave_fd)
             slave_fd = -1
+            apply_limits(proc.pid, self.limits, cgroup)
 
             os.write(master_fd, prompt.encode("utf-8", errors="replace"))
             os.write(master_fd, b"\n")
 
             deadline = time.monotonic() + self.timeout_seconds
             while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    rusage = self._stop_process_group(proc, master_fd, transcript)
+                    raise AgentCancelledError("agent run cancelled", transcript.decode("utf-8", errors="replace"))
                 if time.monotonic() >= deadline:
-                    proc.kill()
-                    proc.wait(timeout=5)
+                    rusage = self._stop_process_group(proc, master_fd, transcript)
                     raise AgentRunError("agent process timed out", transcript.decode("utf-8", errors="replace"))
 
                 ready, _, _ = select.select([master_fd], [], [], 0.1)
@@ -115,7 +210,8 @@ class PTYAgentRunner:
                         transcript.extend(chunk)
                         continue
 
-                if proc.poll() is not None:
+                rusage = _poll_with_usage(proc)
+                if rusage is not None:
                     while True:
                         chunk = self._read_chunk(master_fd)
                         if not chunk:
@@ -128,15 +224,38 @@ class PTYAgentRunner:
                 raise AgentRunError(f"agent process exited with status {proc.returncode}", output)
             return output
         except OSError as exc:
-            if proc is not None and proc.poll() is None:
-                proc.kill()
-                proc.wait(timeout=5)
+            if proc is not None and proc.returncode is None:
+                _signal_group(proc, signal.SIGKILL)
+                rusage = _wait_with_usage(proc)
             raise AgentRunError(f"failed to run agent: {exc}", transcript.decode("utf-8", errors="replace")) from exc
         finally:
+            if proc is not None:
+                self.last_usage = usage_from_rusage(rusage, time.monotonic() - started, cgroup)
+            if cgroup is not None:
+                cgroup.remove()
             if slave_fd >= 0:
                 os.close(slave_fd)
             os.close(master_fd)
 
+    def _stop_process_group(
+        self, proc: subprocess.Popen[bytes], master_fd: int, transcript: bytearray
+    ) -> resource.struct_rusage:
+        # The agent runs in its own session, so signalling the group also stops
+        # the tools it spawned. Keep reading so a chatty agent cannot block on
+        # a full PTY while it shuts down.
+        _signal_group(proc, signal.SIGTERM)
+        deadline = time.monotonic() + AGENT_STOP_GRACE_SECONDS
+        while time.monotonic() < deadline:
+            ready, _, _ = select.select([master_fd], [], [], 0.05)
+            if ready:
+                transcript.extend(self._read_chunk(master_fd))
+            rusage = _poll_with_usage(proc)
+            if rusage is not None:
+                _signal_group(proc, signal.SIGKILL)
+                return rusage
+        _signal_group(proc, signal.SIGKILL)
+        return _wait_with_usage(proc)
+
     @staticmethod
     def _read_chunk(master_fd: int) -> bytes:
         try:
@@ -147,18 +266,344 @@ class PTYAgentRunner:
             raise
 
 
+class PTYAgentSession:
+    """One long-lived agent process that reviews jobs back to back.
+
+    The agent is considered ready for the next prompt once it prints
+    ``done_marker`` (usually its input prompt). ``reset_input`` is sent before
+    every job after the first, e.g. ``/clear`` to start a fresh conversation.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        timeout_seconds: float,
+        done_marker: str,
+        reset_input: str = "",
+        workdir: Path | None = None,
+        limits: ResourceLimits | None = None,
+    ) -> None:
+        self.command = command
+        self.timeout_seconds = timeout_seconds
+        self.done_marker = done_marker.encode("utf-8")
+        self.reset_input = reset_input
+        self.workdir = workdir
+        self.limits = limits
+        self.jobs_run = 0
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._master_fd = -1
+        self._cgroup: JobCgroup | None = None
+
+    def start(self) -> None:
+        if not self.command:
+            raise AgentRunError("worker command is empty")
+        try:
+            self._cgroup = open_job_cgroup(self.limits)
+        except OSError as exc:
+            raise AgentRunError(f"failed to create agent cgroup: {exc}") from exc
+        master_fd, slave_fd = pty.openpty()
+        try:
+            # Without echo the prompt text can never be mistaken for the done marker.
+            attrs = termios.tcgetattr(slave_fd)
+            attrs[3] &= ~termios.ECHO
+            termios.tcsetattr(slave_fd, termios.TCSANOW, attrs)
+            self._proc = subprocess.Popen(
+                self.command,
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                cwd=str(self.workdir) if self.workdir is not None else None,
+                start_new_session=True,
+            )
+            apply_limits(self._proc.pid, self.limits, self._cgroup)
+        except OSError as exc:
+            if self._proc is not None:
+                _signal_group(self._proc, signal.SIGKILL)
+                self._proc.wait()
+                self._proc = None
+            os.close(master_fd)
+            self._remove_cgroup()
+            raise AgentRunError(f"failed to start agent: {exc}") from exc
+        finally:
+            os.close(slave_fd)
+        self._master_fd = master_fd
+        try:
+            self._read_until_done()
+        except AgentRunError:
+            self.close()
+            raise
+
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def rss_bytes(self) -> int:
+        if self._proc is None:
+            return 0
+        try:
+            status = Path(f"/proc/{self._proc.pid}/status").read_text(encoding="utf-8")
+        except OSError:
+            return 0
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+        return 0
+
+    def run(self, prompt: str, cancel_event: threading.Event | None = None) -> str:
+        if not self.alive():
+            raise AgentRunError("agent session is not running")
+        try:
+            if self.jobs_run and self.reset_input:
+                os.write(self._master_fd, self.reset_input.encode("utf-8") + b"\n")
+                self._read_until_done(cancel_event)
+            os.write(self._master_fd, prompt.encode("utf-8", errors="replace"))
+            os.write(self._master_fd, b"\n")
+            output = self._read_until_done(cancel_event)
+        except OSError as exc:
+            raise AgentRunError(f"agent session failed: {exc}") from exc
+        self.jobs_run += 1
+        return output
+
+    def terminate(self) -> None:
+        """Kill the agent from another thread; the thread using the session sees it exit and closes it."""
+        if self._proc is not None:
+            _signal_group(self._proc, signal.SIGKILL)
+
+    def close(self) -> None:
+        if self._proc is not None and self._proc.poll() is None:
+            _signal_group(self._proc, signal.SIGTERM)
+            try:
+                self._proc.wait(timeout=AGENT_STOP_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                _signal_group(self._proc, signal.SIGKILL)
+                self._proc.wait(timeout=5)
+        if self._master_fd >= 0:
+            os.close(self._master_fd)
+            self._master_fd = -1
+        self._remove_cgroup()
+
+    def _remove_cgroup(self) -> None:
+        if self._cgroup is not None:
+            self._cgroup.remove()
+            self._cgroup = None
+
+    def _read_until_done(self, cancel_event: threading.Event | None = None) -> str:
+        transcript = bytearray()
+        deadline = time.monotonic() + self.timeout_seconds
+        while True:
+            if cancel_event is not None and cancel_event.is_set():
+                raise AgentCancelledError("agent run cancelled", transcript.decode("utf-8", errors="replace"))
+            if time.monotonic() >= deadline:
+                raise AgentRunError("agent session timed out", transcript.decode("utf-8", errors="replace"))
+            ready, _, _ = select.select([self._master_fd], [], [], 0.1)
+            chunk = PTYAgentRunner._read_chunk(self._master_fd) if ready else b""
+            if chunk:
+                transcript.extend(chunk)
+                marker_at = transcript.find(self.done_marker)
+                if marker_at >= 0:
+                    return transcript[:marker_at].decode("utf-8", errors="replace")
+                continue
+            if self._proc is not None and self._proc.poll() is not None:
+                raise AgentRunError(
+                    f"agent session exited with status {self._proc.returncode}",
+                    transcript.decode("utf-8", errors="replace"),
+                )
+
+
+class AgentSessionPool:
+    """Keeps up to ``size`` warm agent sessions and hands each job to an idle one.
+
+    A session is replaced after ``max_jobs`` jobs, once its resident memory
+    passes ``max_rss_bytes`` (0 disables the check), or when a job fails.
+    Replacements start in the background so the next pickup stays warm.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        session_factory: Callable[[], PTYAgentSession],
+        max_jobs: int = 0,
+        max_rss_bytes: int = 0,
+    ) -> None:
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_rss_bytes = max_rss_bytes
+        self._session_factory = session_factory
+        self._idle: queue.Queue[PTYAgentSession] = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = 0
+        self._closed = False
+        # Every started session, idle or not, and the warmup threads, so close() can reach all of them.
+        self._sessions: set[PTYAgentSession] = set()
+        self._warmups: list[threading.Thread] = []
+
+    def start(self) -> None:
+        for _ in range(self.size):
+            self._spawn_in_background()
+
+    def run(self, prompt: str, cancel_event: threading.Event | None = None) -> str:
+        session = self._acquire()
+        try:
+            output = session.run(prompt, cancel_event)
+        except AgentRunError:
+            self._retire(session)
+            raise
+        if self._worn_out(session) or not self._park(session):
+            self._retire(session)
+        return output
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._forget(session)
+            session.close()
+        # Sessions still warming up or running a job belong to other threads; killing
+        # the agent makes those threads close them. Repeat until the warmups finish,
+        # since one may only start its agent after the first pass.
+        while True:
+            with self._lock:
+                sessions = list(self._sessions)
+                warmups = [thread for thread in self._warmups if thread.is_alive()]
+            for session in sessions:
+                session.terminate()
+            if not warmups:
+                return
+            for thread in warmups:
+                thread.join(timeout=0.1)
+
+    def _acquire(self) -> PTYAgentSession:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                if self._closed:
+                    raise AgentRunError("agent session pool is closed")
+                can_spawn = self._live < self.size
+                if can_spawn:
+                    self._live += 1
+            if can_spawn:
+                break
+            # A session is warming up; wait for it, but notice if its start fails.
+            try:
+                return self._idle.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        session = self._track(self._session_factory())
+        try:
+            session.start()
+        except AgentRunError:
+            self._forget(session)
+            raise
+        return session
+
+    def _worn_out(self, session: PTYAgentSession) -> bool:
+        if not session.alive():
+            return True
+        if self.max_jobs and session.jobs_run >= self.max_jobs:
+            return True
+        return bool(self.max_rss_bytes) and session.rss_bytes() > self.max_rss_bytes
+
+    def _retire(self, session: PTYAgentSession) -> None:
+        session.close()
+        self._forget(session)
+        self._spawn_in_background()
+
+    def _spawn_in_background(self) -> None:
+        with self._lock:
+            if self._closed or self._live >= self.size:
+                return
+            self._live += 1
+            thread = threading.Thread(target=self._warm_one, daemon=True, name="phil-agent-warmup")
+            self._warmups = [warmup for warmup in self._warmups if warmup.is_alive()]
+            self._warmups.append(thread)
+            thread.start()
+
+    def _warm_one(self) -> None:
+        session = self._track(self._session_factory())
+        try:
+            session.start()
+        except AgentRunError:
+            self._forget(session)
+            return
+        if not self._park(session):
+            session.close()
+            self._forget(session)
+
+    def _track(self, session: PTYAgentSession) -> PTYAgentSession:
+        with self._lock:
+            self._sessions.add(session)
+        return session
+
+    def _forget(self, session: PTYAgentSession) -> None:
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.discard(session)
+                self._live -= 1
+
+    def _park(self, session: PTYAgentSession) -> bool:
+        # Under the lock, so close() either sees the session in the idle queue or this sees the pool closed.
+        with self._lock:
+            if self._closed:
+                return False
+            self._idle.put(session)
+            return True
+
+
+def _signal_group(proc: subprocess.Popen[bytes], sig: int) -> None:
+    try:
+        os.killpg(proc.pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _poll_with_usage(proc: subprocess.Popen[bytes]) -> resource.struct_rusage | None:
+    # Like Popen.poll, but wait4 also returns the child's peak RSS and CPU time.
+    pid, status, rusage = os.wait4(proc.pid, os.WNOHANG)
+    if pid == 0:
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
+def _wait_with_usage(proc: subprocess.Popen[bytes]) -> resource.struct_rusage:
+    _pid, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return rusage
+
+
 def run_worker_loop(
     api_url: str,
     runner: PTYAgentRunner,
     poll_interval_seconds: float,
     stop_event: threading.Event | None = None,
+    registration: WorkerRegistration | None = None,
+    worktrees: WorktreePool | None = None,
+    cancel_event: threading.Event | None = None,
 ) -> None:
+    # ``stop_event`` drains: no new claims, the current job finishes.
+    # ``cancel_event`` also stops the running agent and hands its job back.
     client = WorkerClient(api_url)
     stopper = stop_event or threading.Event()
+    registered = False
 
     while not stopper.is_set():
         try:
+            if registration is not None and not registered:
+                client.register(registration)
+                registered = True
             job = client.claim()
+        except WorkerUnauthorizedError:
+            # The server forgot this worker (usually a restart); register again.
+            registered = False
+            if stopper.wait(poll_interval_seconds):
+                break
+            continue
         except (httpx.HTTPError, WorkerClientError):
             if stopper.wait(poll_interval_seconds):
                 break
@@ -169,16 +614,37 @@ def run_worker_loop(
                 break
             continue
 
+        options = {"cancel_event": cancel_event} if cancel_event is not None else {}
+        job_span = span("worker.job", "phil", job_id=job.id, repo=f"{job.owner}/{job.repo}", pr=job.pr_number)
         try:
-            transcript = runner.run(job.prompt)
-            client.complete(job.id, transcript)
+            with job_span:
+                if worktrees is not None and job.pr_number and worktrees.serves(job.owner, job.repo):
+                    with span("worktree.lease", "git"), worktrees.checkout(job.pr_number, job.head_sha) as workdir:
+                        with span("agent.run", "agent"):
+                            transcript = runner.run(job.prompt, workdir=workdir, **options)
+                else:
+                    with span("agent.run", "agent"):
+                        transcript = runner.run(job.prompt, **options)
+                client.complete(job.id, transcript, usage=_job_usage(runner))
+        except AgentCancelledError as exc:
+            try:
+                client.release(job.id, exc.transcript)
+            except (httpx.HTTPError, WorkerClientError):
+                pass
+            break
         except AgentRunError as exc:
             try:
-                client.fail(job.id, str(exc), exc.transcript)
+                client.fail(job.id, str(exc), exc.transcript, usage=_job_usage(runner))
             except (httpx.HTTPError, WorkerClientError):
                 pass
-        except (httpx.HTTPError, WorkerClientError) as exc:
+        except (httpx.HTTPError, WorkerClientError, GitError) as exc:
             try:
                 client.fail(job.id, str(exc))
             except (httpx.HTTPError, WorkerClientError):
                 pass
+
+
+def _job_usage(runner: object) -> dict[str, float] | None:
+    # Warm sessions share one process across jobs, so only per-job runners report usage.
+    usage = getattr(runner, "last_usage", None)
+    return usage.to_dict() if isinstance(usage, ResourceUsage) else None
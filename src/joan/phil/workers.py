@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import hashlib
+import secrets
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from uuid import uuid4
+
+
+@dataclass(slots=True)
+class WorkerRecord:
+    id: str
+    name: str
+    agent: str
+    repos: list[str]
+    token_hash: str
+    registered_at: datetime
+    last_seen_at: datetime
+    claims: int = 0
+
+    def serves(self, owner: str, repo: str, required_agent: str = "") -> bool:
+        if self.repos and f"{owner}/{repo}" not in self.repos:
+            return False
+        return not required_agent or required_agent == self.agent
+
+    def summary(self) -> dict[str, object]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "agent": self.agent,
+            "repos": self.repos,
+            "claims": self.claims,
+            "registered_at": _iso(self.registered_at),
+            "last_seen_at": _iso(self.last_seen_at),
+        }
+
+
+class WorkerRegistry:
+    """Issues per-worker bearer tokens and remembers each worker's capabilities.
+
+    Only a hash of each token is kept. Registrations live in memory, so workers
+    register again when the server restarts and their old token is refused.
+    """
+
+    def __init__(self) -> None:
+        self._workers: dict[str, WorkerRecord] = {}
+        self._by_token_hash: dict[str, str] = {}
+
+    def register(self, name: str, agent: str, repos: list[str]) -> tuple[WorkerRecord, str]:
+        token = secrets.token_urlsafe(32)
+        now = datetime.now(UTC)
+        record = WorkerRecord(
+            id=f"worker_{uuid4().hex}",
+            name=name,
+            agent=agent,
+            repos=list(repos),
+            token_hash=_hash_token(token),
+            registered_at=now,
+            last_seen_at=now,
+        )
+        self._workers[record.id] = record
+        self._by_token_hash[record.token_hash] = record.id
+        return record, token
+
+    def authenticate(self, token: str) -> WorkerRecord | None:
+        worker_id = self._by_token_hash.get(_hash_token(token))
+        if worker_id is None:
+            return None
+        record = self._workers[worker_id]
+        record.last_seen_at = datetime.now(UTC)
+        return record
+
+    def list(self) -> list[WorkerRecord]:
+        return list(self._workers.values())
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _iso(value: datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import queue
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from joan.core.git import (
+    checkout_detached_args,
+    clean_untracked_args,
+    fetch_pr_head_args,
+    pr_head_ref,
+    worktree_add_detached_args,
+    worktree_prune_args,
+)
+from joan.shell.git_runner import run_git
+
+
+class WorktreePool:
+    """Reusable detached worktrees so each review job gets its own checkout.
+
+    Worktrees share the main repository's objects, so moving one to a PR head
+    only fetches that PR's ref and rewrites the files that changed.
+    """
+
+    def __init__(
+        self,
+        repo_root: Path,
+        root: Path,
+        size: int,
+        remote: str,
+        repo: str = "",
+        git: Callable[..., str] = run_git,
+    ) -> None:
+        self.repo_root = repo_root
+        self.repo = repo
+        self.root = root
+        self.size = size
+        self.remote = remote
+        self._git = git
+        self._free: queue.Queue[Path] = queue.Queue()
+        self._fetch_lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> None:
+        with self._fetch_lock:
+            if self._started:
+                return
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._git(worktree_prune_args(), cwd=self.repo_root)
+            for index in range(self.size):
+                path = self.root / f"wt-{index}"
+                if not (path / ".git").exists():
+                    self._git(worktree_add_detached_args(str(path)), cwd=self.repo_root)
+                self._free.put(path)
+            self._started = True
+
+    def serves(self, owner: str, repo: str) -> bool:
+        return not self.repo or self.repo == f"{owner}/{repo}"
+
+    @contextmanager
+    def checkout(self, pr_number: int, head_sha: str = "") -> Iterator[Path]:
+        self.start()
+        path = self._free.get()
+        try:
+            with self._fetch_lock:
+                # Concurrent fetches into one repository contend for the same ref locks.
+                self._git(fetch_pr_head_args(self.remote, pr_number), cwd=self.repo_root)
+            self._git(checkout_detached_args(head_sha or pr_head_ref(pr_number)), cwd=path)
+            self._git(clean_untracked_args(), cwd=path)
+            yield path
+        finally:
+            self._free.put(path)
@@ -15,6 +15,7 @@ from joan.core.config import (
 )
 from joan.core.models import Config, GlobalConfig, RepoConfig
 from joan.shell.repo_state import repo_state_candidates, repo_state_dir, repo_state_write_lock
+from joan.shell.tracing import span
 
 
 def global_config_path() -> Path:
@@ -53,6 +54,11 @@ def write_repo_config(cfg: RepoConfig, repo_root: Path | None = None) -> Path:
 
 
 def read_config(repo_root: Path | None = None) -> Config:
+    with span("config.read", "config"):
+        return _read_config(repo_root)
+
+
+def _read_config(repo_root: Path | None = None) -> Config:
     candidate_paths = _config_candidates(repo_root)
     repo_path = candidate_paths[0]
     global_cfg = read_global_config()
@@ -1,14 +1,47 @@
 from __future__ import annotations
 
+import codecs
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
 from typing import Any
 
 import httpx
 
+from joan.core import json_codec
+from joan.core.forgejo import decode_comments, decode_reviews
+from joan.core.diff import iter_diff_sections
+from joan.core.models import Comment, HttpConfig, Review
+from joan.shell.rate_limit import backoff_delay, retry_after_seconds, shared_bucket, should_retry
+from joan.shell.request_trace import RequestHook, RequestRecord, template_path
+from joan.shell.single_flight import SingleFlight, TTLMemo
+from joan.shell.tracing import span, tracing_enabled
+
+# Called once per API request with its method, templated path, status, size and duration.
+_request_hooks: list[RequestHook] = []
+
+
+def add_request_hook(hook: RequestHook) -> None:
+    _request_hooks.append(hook)
+
+
+def remove_request_hook(hook: RequestHook) -> None:
+    if hook in _request_hooks:
+        _request_hooks.remove(hook)
+
 
 class ForgejoError(RuntimeError):
     pass
 
 
+class DiffTooLargeError(ForgejoError):
+    pass
+
+
+# Forgejo's default MAX_RESPONSE_ITEMS; list endpoints never return more per page.
+PAGE_SIZE = 50
+
+
 class ForgejoClient:
     _VERDICT_MAP = {
         "approve": "APPROVE",
@@ -16,9 +49,38 @@ class ForgejoClient:
         "comment": "COMMENT",
     }
 
-    def __init__(self, base_url: str, token: str | None = None) -> None:
+    def __init__(self, base_url: str, token: str | None = None, http: HttpConfig | None = None) -> None:
         self.base_url = base_url.rstrip("/")
         self.token = token
+        self.http = http or HttpConfig()
+        self._bucket = (
+            shared_bucket(self.base_url, self.http.rate_limit_per_second, self.http.rate_limit_burst)
+            if self.http.rate_limit_per_second > 0
+            else None
+        )
+        # Successful GET bodies, shared by concurrent callers and reused briefly afterwards.
+        self._inflight: SingleFlight[bytes] = SingleFlight()
+        self._memo: TTLMemo[bytes] = TTLMemo(self.http.cache_ttl_seconds)
+        # ETag and body of recent GETs, so a repeat read can be answered by a 304.
+        self._validators: TTLMemo[tuple[str, bytes]] = TTLMemo(float("inf"), max_entries=64)
+        self._session: httpx.Client | None = None
+
+    @contextmanager
+    def session(self) -> Iterator[ForgejoClient]:
+        """Send every request made inside the block over one pooled connection."""
+        if self._session is not None:
+            yield self
+            return
+        with httpx.Client(timeout=self.http.timeout_seconds) as pool:
+            self._session = pool
+            try:
+                yield self
+            finally:
+                self._session = None
+
+    def clear_cache(self) -> None:
+        """Forget recently read responses; the next read still revalidates with its ETag."""
+        self._memo.clear()
 
     def _headers(self) -> dict[str, str]:
         headers = {"Accept": "application/json"}
@@ -40,7 +102,7 @@ class ForgejoClient:
         with httpx.Client(timeout=30.0, auth=auth) as client:
             response = client.post(url, json=payload)
         self._raise_for_status(response)
-        data = response.json()
+        data = json_codec.loads(response.content)
         token = data.get("sha1") or data.get("token")
         if not token:
             raise ForgejoError("Forgejo token response did not include token value")
@@ -67,7 +129,7 @@ class ForgejoClient:
         with httpx.Client(timeout=30.0, auth=(admin_username, admin_password)) as client:
             response = client.post(url, json=payload)
         self._raise_for_status(response)
-        return response.json()
+        return json_codec.loads(response.content)
 
     def create_webhook(
         self,
@@ -93,7 +155,7 @@ class ForgejoClient:
         with httpx.Client(timeout=30.0, auth=(admin_username, admin_password)) as client:
             response = client.post(url, json=payload)
         self._raise_for_status(response)
-        return response.json()
+        return json_codec.loads(response.content)
 
     def create_repo(self, name: str, private: bool = True) -> dict[str, Any]:
         return self._request_json("POST", "/api/v1/user/repos", json={"name": name, "private": private})
@@ -171,6 +233,44 @@ class ForgejoClient:
                     seen_ids.add(item_id)
         return comments
 
+    def fetch_reviews(self, owner: str, repo: str, index: int) -> list[Review]:
+        return decode_reviews(self._shared_get(f"/api/v1/repos/{owner}/{repo}/pulls/{index}/reviews"))
+
+    def fetch_comments(self, owner: str, repo: str, index: int) -> list[Comment]:
+        """Typed ``get_comments``: the same endpoints and de-duplication, decoded from the response bytes."""
+        return list(self.iter_comments(owner, repo, index))
+
+    def iter_comments(self, owner: str, repo: str, index: int) -> Iterator[Comment]:
+        """Yield PR-level comments, then each review's inline comments as its response arrives."""
+        primary = f"/api/v1/repos/{owner}/{repo}/issues/{index}/comments"
+        try:
+            comments = decode_comments(self._shared_get(primary))
+        except ForgejoError as exc:
+            if "Forgejo API 404" not in str(exc):
+                raise
+            comments = decode_comments(self._shared_get(f"/api/v1/repos/{owner}/{repo}/pulls/{index}/comments"))
+        yield from comments
+        seen_ids = {comment.id for comment in comments}
+        try:
+            reviews = self.fetch_reviews(owner, repo, index)
+        except ForgejoError as exc:
+            if "Forgejo API 404" not in str(exc):
+                raise
+            reviews = []
+
+        for review in reviews:
+            path = f"/api/v1/repos/{owner}/{repo}/pulls/{index}/reviews/{review.id}/comments"
+            try:
+                review_comments = decode_comments(self._shared_get(path))
+            except ForgejoError as exc:
+                if "Forgejo API 404" not in str(exc):
+                    raise
+                continue
+            for comment in review_comments:
+                if comment.id not in seen_ids:
+                    seen_ids.add(comment.id)
+                    yield comment
+
     def get_review_comments(self, owner: str, repo: str, index: int, review_id: int) -> list[dict[str, Any]]:
         path = f"/api/v1/repos/{owner}/{repo}/pulls/{index}/reviews/{review_id}/comments"
         try:
@@ -216,9 +316,39 @@ class ForgejoClient:
         return self._request_json("GET", f"/api/v1/repos/{owner}/{repo}/issues/{index}")
 
     def list_issues(self, owner: str, repo: str, state: str = "open", limit: int = 50) -> list[dict[str, Any]]:
-        params = {"state": state, "limit": str(limit)}
-        data = self._request_json("GET", f"/api/v1/repos/{owner}/{repo}/issues", params=params)
-        return list(data)
+        return list(self.iter_issues(owner, repo, state=state, limit=limit))
+
+    def iter_issues(self, owner: str, repo: str, state: str = "open", limit: int = 50) -> Iterator[dict[str, Any]]:
+        for page in self.iter_pages(f"/api/v1/repos/{owner}/{repo}/issues", params={"state": state}, limit=limit):
+            yield from page
+
+    def iter_pages(
+        self,
+        path: str,
+        params: dict[str, str] | None = None,
+        limit: int | None = None,
+    ) -> Iterator[list[Any]]:
+        """Yield successive pages of a list endpoint until it runs dry or ``limit`` items have been seen.
+
+        Forgejo silently caps ``limit`` at its page size, so asking for more than
+        one page in a single request would truncate the list.
+        """
+        remaining = limit
+        page = 1
+        while remaining is None or remaining > 0:
+            # The page size must stay fixed: Forgejo offsets by (page - 1) * limit.
+            query = {**(params or {}), "page": str(page), "limit": str(PAGE_SIZE)}
+            items = list(self._request_json("GET", path, params=query))
+            received = len(items)
+            if remaining is not None:
+                items = items[:remaining]
+                remaining -= len(items)
+            if items:
+                yield items
+            # A short page is the last one; a long one means the server ignored paging.
+            if received != PAGE_SIZE:
+                return
+            page += 1
 
     def close_issue(self, owner: str, repo: str, index: int) -> dict[str, Any]:
         return self._request_json("PATCH", f"/api/v1/repos/{owner}/{repo}/issues/{index}", json={"state": "closed"})
@@ -299,9 +429,26 @@ class ForgejoClient:
         return self._request_json("PATCH", f"/api/v1/repos/{owner}/{repo}/pulls/{index}", json=payload)
 
     def get_pr_diff(self, owner: str, repo: str, index: int) -> str:
-        response = self._request_raw("GET", f"/api/v1/repos/{owner}/{repo}/pulls/{index}.diff")
-        self._raise_for_status(response)
-        return response.text
+        content = self._shared_get(f"/api/v1/repos/{owner}/{repo}/pulls/{index}.diff")
+        return content.decode("utf-8", errors="replace")
+
+    def get_compare_diff(self, owner: str, repo: str, base_sha: str, head_sha: str) -> str:
+        # The API has no raw compare diff; Forgejo serves one from the web route.
+        content = self._shared_get(f"/{owner}/{repo}/compare/{base_sha}...{head_sha}.diff")
+        return content.decode("utf-8", errors="replace")
+
+    def stream_pr_diff(self, owner: str, repo: str, index: int, max_bytes: int = 0) -> Iterator[str]:
+        return self._stream_diff_sections(f"/api/v1/repos/{owner}/{repo}/pulls/{index}.diff", max_bytes)
+
+    def stream_compare_diff(
+        self,
+        owner: str,
+        repo: str,
+        base_sha: str,
+        head_sha: str,
+        max_bytes: int = 0,
+    ) -> Iterator[str]:
+        return self._stream_diff_sections(f"/{owner}/{repo}/compare/{base_sha}...{head_sha}.diff", max_bytes)
 
     def resolve_comment(
         self,
@@ -352,18 +499,144 @@ class ForgejoClient:
         return self._request_json("POST", f"/api/v1/repos/{owner}/{repo}/pulls/{index}/reviews", json=payload)
 
     def _request_json(self, method: str, path: str, **kwargs: Any) -> Any:
+        if method == "GET" and set(kwargs) <= {"params"}:
+            return json_codec.loads(self._shared_get(path, kwargs.get("params")))
         response = self._request_raw(method, path, **kwargs)
         self._raise_for_status(response, request_context=kwargs.get("json"))
-        return response.json()
+        return json_codec.loads(response.content)
+
+    def _shared_get(self, path: str, params: dict[str, str] | None = None) -> bytes:
+        """GET ``path`` and return the body, reusing an identical in-flight or recent request.
+
+        Callers get bytes and parse their own copy, so nobody can mutate another
+        caller's result. Error responses are shared with concurrent callers but
+        never cached.
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+
+        def fetch() -> bytes:
+            kwargs: dict[str, Any] = {"params": params} if params is not None else {}
+            validator = self._validators.get(key)
+            if validator is not None:
+                kwargs["headers"] = {"If-None-Match": validator[0]}
+            response = self._request_raw("GET", path, **kwargs)
+            if response.status_code == 304 and validator is not None:
+                content = validator[1]
+            else:
+                self._raise_for_status(response)
+                content = response.content
+                etag = response.headers.get("ETag")
+                if etag:
+                    self._validators.put(key, (etag, content))
+            self._memo.put(key, content)
+            return content
+
+        content, _shared = self._inflight.do(key, fetch)
+        return content
 
     def _request_raw(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        if method not in ("GET", "HEAD"):
+            # Any write may change what a cached read would return.
+            self._memo.clear()
         url = f"{self.base_url}{path}"
         headers = self._headers()
         extra_headers = kwargs.pop("headers", None)
         if extra_headers:
             headers.update(extra_headers)
-        with httpx.Client(timeout=30.0, headers=headers) as client:
-            return client.request(method, url, **kwargs)
+        started = time.perf_counter()
+        retries = 0
+        with _http_span(method, path) as attributes:
+            attributes["retries"] = 0
+            while True:
+                self._throttle()
+                try:
+                    with self._http_client() as client:
+                        response = client.request(method, url, headers=headers, **kwargs)
+                except httpx.TransportError as exc:
+                    delay = self._retry_delay(method, retries, exc=exc)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._retry_delay(method, retries, response=response)
+                    if delay is None:
+                        break
+                retries += 1
+                attributes["retries"] = retries
+                _sleep(delay)
+            attributes["status"] = response.status_code
+        if _request_hooks:
+            _notify_request_hooks(method, path, response.status_code, len(response.content), started, retries)
+        return response
+
+    @contextmanager
+    def _stream_raw(self, method: str, path: str, **kwargs: Any) -> Iterator[httpx.Response]:
+        url = f"{self.base_url}{path}"
+        started = time.perf_counter()
+        retries = 0
+        with _http_span(method, path) as attributes, ExitStack() as attempt:
+            attributes["retries"] = 0
+            while True:
+                self._throttle()
+                try:
+                    client = attempt.enter_context(self._http_client())
+                    response = attempt.enter_context(client.stream(method, url, headers=self._headers(), **kwargs))
+                except httpx.TransportError as exc:
+                    delay = self._retry_delay(method, retries, exc=exc)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._retry_delay(method, retries, response=response)
+                    if delay is None:
+                        break
+                # Close the failed attempt's connection before waiting out the backoff.
+                attempt.close()
+                retries += 1
+                attributes["retries"] = retries
+                _sleep(delay)
+            attributes["status"] = response.status_code
+            try:
+                yield response
+            finally:
+                if _request_hooks:
+                    size = response.num_bytes_downloaded
+                    _notify_request_hooks(method, path, response.status_code, size, started, retries)
+
+    def _http_client(self) -> AbstractContextManager[httpx.Client]:
+        if self._session is not None:
+            return nullcontext(self._session)
+        return httpx.Client(timeout=self.http.timeout_seconds)
+
+    def _throttle(self) -> None:
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+    def _retry_delay(
+        self,
+        method: str,
+        retries: int,
+        response: httpx.Response | None = None,
+        exc: BaseException | None = None,
+    ) -> float | None:
+        # None means give up: the attempt succeeded, is not retryable, or the budget is spent.
+        if retries >= self.http.max_retries:
+            return None
+        if not should_retry(method, response.status_code if response is not None else None, exc):
+            return None
+        retry_after = retry_after_seconds(response.headers.get("Retry-After")) if response is not None else None
+        return backoff_delay(retries + 1, self.http.retry_backoff_seconds, retry_after)
+
+    def _stream_diff_sections(self, path: str, max_bytes: int) -> Iterator[str]:
+        with self._stream_raw("GET", path) as response:
+            if not response.is_success:
+                response.read()
+                self._raise_for_status(response)
+            length = response.headers.get("Content-Length", "")
+            if max_bytes and length.isdigit() and int(length) > max_bytes:
+                raise DiffTooLargeError(f"diff is {length} bytes, over the {max_bytes} byte limit")
+            yield from iter_diff_sections(_iter_text_lines(response.iter_bytes(), max_bytes))
 
     def _raise_for_status(self, response: httpx.Response, request_context: Any = None) -> None:
         if response.is_success:
@@ -435,3 +708,42 @@ class ForgejoClient:
         if isinstance(raw, str) and raw.isdigit():
             return int(raw)
         return None
+
+
+def _http_span(method: str, path: str) -> AbstractContextManager[dict[str, Any]]:
+    # Templating the path is skipped unless a trace is being recorded.
+    return span(f"{method} {template_path(path)}" if tracing_enabled() else "", "http")
+
+
+def _sleep(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def _notify_request_hooks(method: str, path: str, status: int, size: int, started: float, retries: int = 0) -> None:
+    record = RequestRecord(
+        method=method,
+        path=template_path(path),
+        status=status,
+        bytes=size,
+        duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        retries=retries,
+    )
+    for hook in list(_request_hooks):
+        hook(record)
+
+
+def _iter_text_lines(chunks: Iterable[bytes], max_bytes: int) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    received = 0
+    pending = ""
+    for chunk in chunks:
+        received += len(chunk)
+        if max_bytes and received > max_bytes:
+            raise DiffTooLargeError(f"diff is over the {max_bytes} byte limit")
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
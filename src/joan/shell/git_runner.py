@@ -3,6 +3,8 @@ from __future__ import annotations
 import subprocess
 from pathlib import Path
 
+from joan.shell.tracing import span
+
 
 class GitError(RuntimeError):
     pass
@@ -10,13 +12,16 @@ class GitError(RuntimeError):
 
 def run_git(args: list[str], cwd: Path | None = None) -> str:
     cmd = ["git", *args]
-    proc = subprocess.run(
-        cmd,
-        cwd=cwd,
-        check=False,
-        text=True,
-        capture_output=True,
-    )
+    # Only the subcommand is recorded; full argument lists can carry remote URLs with credentials.
+    with span(f"git {args[0] if args else ''}".strip(), "git") as attributes:
+        proc = subprocess.run(
+            cmd,
+            cwd=cwd,
+            check=False,
+            text=True,
+            capture_output=True,
+        )
+        attributes["returncode"] = proc.returncode
     if proc.returncode != 0:
         msg = proc.stderr.strip() or proc.stdout.strip() or "unknown git error"
         raise GitError(f"git {' '.join(args)} failed: {msg}")
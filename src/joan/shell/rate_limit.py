@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections.abc import Callable
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+# Methods that are safe to send again after a 5xx or a dropped connection.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRY_DELAY_SECONDS = 60.0
+
+
+class TokenBucket:
+    """Allows ``rate`` requests per second on average with bursts of up to ``burst``.
+
+    Callers that find the bucket empty reserve the next token and sleep until it
+    is due, so concurrent threads queue up instead of all waking at once.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+_buckets: dict[tuple[str, float, int], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def shared_bucket(key: str, rate: float, burst: int) -> TokenBucket:
+    # The CLI builds a fresh client per call site; sharing by host keeps them under one budget.
+    with _buckets_lock:
+        bucket = _buckets.get((key, rate, burst))
+        if bucket is None:
+            bucket = _buckets[(key, rate, burst)] = TokenBucket(rate, burst)
+        return bucket
+
+
+def should_retry(method: str, status: int | None, exc: BaseException | None = None) -> bool:
+    """Whether a failed attempt may be sent again.
+
+    A 429 or a connection that never opened means the server did not act on the
+    request, so any method is retried. Other gateway errors and dropped
+    connections are only retried for idempotent methods.
+    """
+    if exc is not None:
+        if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return True
+        return isinstance(exc, httpx.TransportError) and method.upper() in IDEMPOTENT_METHODS
+    if status == 429:
+        return True
+    return status in RETRYABLE_STATUSES and method.upper() in IDEMPOTENT_METHODS
+
+
+def retry_after_seconds(value: str | None, now: datetime | None = None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=UTC)
+    return max((when - (now or datetime.now(UTC))).total_seconds(), 0.0)
+
+
+def backoff_delay(
+    attempt: int,
+    base_seconds: float,
+    retry_after: float | None = None,
+    rng: Callable[[float, float], float] = random.uniform,
+) -> float:
+    # Full jitter spreads retries from many clients; Retry-After is a floor, not a suggestion.
+    ceiling = min(base_seconds * 2 ** max(attempt - 1, 0), MAX_RETRY_DELAY_SECONDS)
+    delay = rng(0.0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, MAX_RETRY_DELAY_SECONDS))
+    return delay
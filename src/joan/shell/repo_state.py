@@ -6,6 +6,7 @@ from pathlib import Path
 import shutil
 
 from joan.shell.git_runner import run_git
+from joan.shell.tracing import span
 
 
 def _repo_root(repo_root: Path | None = None) -> Path:
@@ -41,12 +42,13 @@ def shared_repo_state_dir(repo_root: Path | None = None) -> Path | None:
 def _file_lock(path: Path):
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("a+", encoding="utf-8") as handle:
-        try:
-            import fcntl
+        with span("repo_state.lock_wait", "lock", path=path.name):
+            try:
+                import fcntl
 
-            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
-        except Exception:  # noqa: BLE001
-            pass
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            except Exception:  # noqa: BLE001
+                pass
         try:
             yield
         finally:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TextIO
+
+_REPO_PATH = re.compile(r"^(/api/v1/repos|)/[^/]+/[^/]+(?=/|$)")
+_COMPARE_RANGE = re.compile(r"/compare/[^/]+\.diff$")
+_NUMBER_SEGMENT = re.compile(r"/\d+(?=/|\.|$)")
+
+
+@dataclass(slots=True)
+class RequestRecord:
+    method: str
+    path: str
+    status: int
+    bytes: int
+    duration_ms: float
+    retries: int = 0
+
+
+RequestHook = Callable[[RequestRecord], None]
+
+
+def template_path(path: str) -> str:
+    """Collapse owner, repo, numbers and compare ranges so calls group by endpoint."""
+    path = path.split("?", 1)[0]
+    if path.startswith("/api/v1/repos/") or _COMPARE_RANGE.search(path):
+        path = _REPO_PATH.sub(lambda match: f"{match.group(1)}/{{owner}}/{{repo}}", path, count=1)
+    path = _COMPARE_RANGE.sub("/compare/{range}.diff", path)
+    return _NUMBER_SEGMENT.sub("/{n}", path)
+
+
+class RequestTrace:
+    """Collects request records for one command and reports them when it ends."""
+
+    def __init__(self, jsonl_path: Path | None = None) -> None:
+        self.records: list[RequestRecord] = []
+        self._jsonl_path = jsonl_path
+        self._lock = threading.Lock()
+
+    def __call__(self, record: RequestRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            if self._jsonl_path is not None:
+                with self._jsonl_path.open("a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(asdict(record)) + "\n")
+
+    def summary_rows(self) -> list[dict[str, object]]:
+        groups: dict[tuple[str, str], list[RequestRecord]] = {}
+        for record in self.records:
+            groups.setdefault((record.method, record.path), []).append(record)
+        rows = [
+            {
+                "method": method,
+                "path": path,
+                "count": len(records),
+                "errors": sum(1 for record in records if record.status >= 400),
+                "retries": sum(record.retries for record in records),
+                "bytes": sum(record.bytes for record in records),
+                "total_ms": round(sum(record.duration_ms for record in records), 1),
+                "max_ms": round(max(record.duration_ms for record in records), 1),
+            }
+            for (method, path), records in groups.items()
+        ]
+        return sorted(rows, key=lambda row: (-int(row["count"]), -float(row["total_ms"])))
+
+    def write_summary(self, stream: TextIO) -> None:
+        rows = self.summary_rows()
+        width = max([len(f"{row['method']} {row['path']}") for row in rows] + [len("request")])
+        stream.write(
+            f"{'request':<{width}}  {'count':>5}  {'errors':>6}  {'retries':>7}  {'bytes':>10}"
+            f"  {'total ms':>9}  {'max ms':>8}\n"
+        )
+        for row in rows:
+            name = f"{row['method']} {row['path']}"
+            stream.write(
+                f"{name:<{width}}  {row['count']:>5}  {row['errors']:>6}  {row['retries']:>7}  {row['bytes']:>10}"
+                f"  {row['total_ms']:>9.1f}  {row['max_ms']:>8.1f}\n"
+            )
+        total_ms = sum(record.duration_ms for record in self.records)
+        total_bytes = sum(record.bytes for record in self.records)
+        total_retries = sum(record.retries for record in self.records)
+        stream.write(
+            f"{'total':<{width}}  {len(self.records):>5}  {'':>6}  {total_retries:>7}  {total_bytes:>10}"
+            f"  {total_ms:>9.1f}\n"
+        )
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+_active: Tracer | None = None
+
+
+class Tracer:
+    """Records finished spans as Chrome trace events.
+
+    Spans on the same thread nest by time, which is how ``chrome://tracing``
+    and Perfetto draw them, so no parent bookkeeping is needed.
+    """
+
+    def __init__(self, origin_ns: int | None = None) -> None:
+        self.events: list[dict[str, Any]] = []
+        self.origin_ns = time.perf_counter_ns() if origin_ns is None else origin_ns
+        self._lock = threading.Lock()
+
+    def record(self, name: str, category: str, start_ns: int, end_ns: int, attributes: dict[str, Any]) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self.origin_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": attributes,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def extend(self, events: list[dict[str, Any]]) -> None:
+        """Add events recorded by ``traced_call`` in another process."""
+        with self._lock:
+            self.events.extend(events)
+
+    def chrome_trace(self) -> dict[str, Any]:
+        with self._lock:
+            events = list(self.events)
+        threads = {(event["pid"], event["tid"]) for event in events}
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own_pid = os.getpid()
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": pid,
+                "tid": tid,
+                "args": {"name": names.get(tid, str(tid)) if pid == own_pid else str(tid)},
+            }
+            for pid, tid in sorted(threads)
+        ]
+        return {"traceEvents": metadata + sorted(events, key=lambda event: event["ts"]), "displayTimeUnit": "ms"}
+
+    def write(self, path: Path) -> None:
+        path.write_text(json.dumps(self.chrome_trace()) + "\n", encoding="utf-8")
+
+
+def start_tracing() -> Tracer:
+    global _active
+    _active = Tracer()
+    return _active
+
+
+def stop_tracing() -> Tracer | None:
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+def tracing_enabled() -> bool:
+    return _active is not None
+
+
+def active_tracer() -> Tracer | None:
+    return _active
+
+
+def traced_call(origin_ns: int, fn: Callable[[], T]) -> tuple[T | None, BaseException | None, list[dict[str, Any]]]:
+    """Run ``fn`` in a worker process and return its outcome with the spans it recorded.
+
+    The spans are timed against the caller's ``origin_ns``; ``perf_counter``
+    reads a system-wide monotonic clock, so they line up with the caller's own.
+    Where a tracer is already active (a thread of the caller), spans go to it
+    directly and none are returned.
+    """
+    global _active
+    tracer = None
+    if _active is None:
+        tracer = _active = Tracer(origin_ns)
+    events = tracer.events if tracer is not None else []
+    try:
+        return fn(), None, events
+    except Exception as exc:  # noqa: BLE001 - the caller re-raises it
+        return None, exc, events
+    finally:
+        if tracer is not None:
+            _active = None
+
+
+@contextmanager
+def span(name: str, category: str = "joan", **attributes: Any) -> Iterator[dict[str, Any]]:
+    """Time the enclosed block; the yielded dict takes attributes known only at the end."""
+    tracer = _active
+    if tracer is None:
+        yield attributes
+        return
+    start_ns = time.perf_counter_ns()
+    try:
+        yield attributes
+    except BaseException as exc:
+        attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        tracer.record(name, category, start_ns, time.perf_counter_ns(), attributes)
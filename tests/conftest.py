@@ -5,9 +5,23 @@ from datetime import UTC, datetime
 import httpx
 import pytest
 
+from joan.core import forgejo, json_codec
 from joan.core.models import Comment, Config, ForgejoConfig, PullRequest, RemotesConfig, Review
 
 
+@pytest.fixture(params=["orjson", "msgspec", "json"])
+def json_backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run a test once per JSON backend, hiding the other optional libraries."""
+    backend = request.param
+    if backend != "json" and getattr(json_codec, backend) is None:
+        pytest.skip(f"{backend} is not installed")
+    for name in ("orjson", "msgspec"):
+        if name != backend:
+            monkeypatch.setattr(json_codec, name, None)
+    monkeypatch.setattr(forgejo, "msgspec", json_codec.msgspec)
+    return backend
+
+
 @pytest.fixture
 def sample_config() -> Config:
     return Config(
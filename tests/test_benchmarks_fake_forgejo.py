@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from benchmarks.fake_forgejo import OWNER, PR_NUMBER, REPO, FakeForgejo, seed_data
+from benchmarks.run import BenchmarkResult, compare_to_baseline, run_benchmark
+from joan.shell.forgejo_client import ForgejoClient
+
+
+def test_fake_forgejo_caps_list_pages_and_counts_requests() -> None:
+    with FakeForgejo(seed_data(120), max_page_size=50) as forge:
+        client = ForgejoClient(forge.url, "token")
+        first_page = client._request_json("GET", f"/api/v1/repos/{OWNER}/{REPO}/issues", params={"limit": "500"})
+        issues = client.list_issues(OWNER, REPO, state="all", limit=500)
+
+        assert len(first_page) == 50
+        assert len(issues) == 120
+        assert forge.requests["issues"] == 4
+        assert forge.request_count == 4
+
+        client.clear_cache()
+        partial = client.list_issues(OWNER, REPO, state="all", limit=80)
+        assert len({issue["number"] for issue in partial}) == 80
+
+
+def test_fake_forgejo_missing_route_exercises_client_fallback() -> None:
+    with FakeForgejo(seed_data(10), missing_routes={"issue_comments"}) as forge:
+        client = ForgejoClient(forge.url, "token")
+        comments = client.get_comments(OWNER, REPO, PR_NUMBER)
+
+        # Ten PR comments from the fallback route plus one review of ten inline comments.
+        assert len(comments) == 20
+        assert forge.requests["issue_comments"] == 1
+        assert forge.requests["pull_comments"] == 1
+
+
+def test_run_benchmark_reports_requests_per_route() -> None:
+    result = run_benchmark("pr comments", 10, repeat=1)
+
+    assert result.scenario == "pr comments"
+    assert result.requests == sum(result.requests_by_route.values())
+    assert result.requests_by_route["pulls"] >= 1
+    assert result.git_calls >= 1
+
+
+def test_compare_to_baseline_flags_added_round_trips() -> None:
+    baselines = {
+        "wall_tolerance": 2.0,
+        "wall_slack_seconds": 0.0,
+        "results": {"pr sync@10": {"requests": 5, "git_calls": 2, "wall_seconds": 0.1}},
+    }
+    same = BenchmarkResult("pr sync", 10, wall_seconds=0.15, requests=5, git_calls=2, requests_by_route={})
+    worse = BenchmarkResult("pr sync", 10, wall_seconds=0.3, requests=6, git_calls=3, requests_by_route={})
+
+    assert compare_to_baseline(same, baselines) == []
+    assert compare_to_baseline(worse, baselines) == [
+        "pr sync@10: 6 API requests, baseline 5",
+        "pr sync@10: 3 git calls, baseline 2",
+        "pr sync@10: p50 0.300s, limit 0.200s",
+    ]
+    assert "no baseline" in compare_to_baseline(BenchmarkResult("pr sync", 99, 0.1, 1, 1, {}), baselines)[0]
@@ -45,7 +45,7 @@ def test_doctor_happy_path_with_user_check(monkeypatch) -> None:
     monkeypatch.setattr(doctor_mod, "run_git", fake_run_git)
 
     class FakeForgejoClient:
-        def __init__(self, base_url, token):
+        def __init__(self, base_url, token, http=None):
             assert base_url == "http://forgejo.local"
             assert token == "tok"
 
@@ -97,7 +97,7 @@ def test_doctor_warns_when_review_remote_missing(monkeypatch) -> None:
     monkeypatch.setattr(doctor_mod, "run_git", fake_run_git)
 
     class FakeForgejoClient:
-        def __init__(self, _base_url, _token):
+        def __init__(self, _base_url, _token, http=None):
             pass
 
         def get_current_user(self):
@@ -133,7 +133,7 @@ def test_doctor_fails_when_user_lacks_admin_access(monkeypatch) -> None:
     monkeypatch.setattr(doctor_mod, "run_git", fake_run_git)
 
     class FakeForgejoClient:
-        def __init__(self, _base_url, _token):
+        def __init__(self, _base_url, _token, http=None):
             pass
 
         def get_current_user(self):
@@ -170,7 +170,7 @@ def test_doctor_reports_missing_collaborator(monkeypatch) -> None:
     monkeypatch.setattr(doctor_mod, "run_git", fake_run_git)
 
     class FakeForgejoClient:
-        def __init__(self, _base_url, _token):
+        def __init__(self, _base_url, _token, http=None):
             pass
 
         def get_current_user(self):
@@ -207,7 +207,7 @@ def test_doctor_uses_configured_human_user_by_default(monkeypatch) -> None:
     monkeypatch.setattr(doctor_mod, "run_git", fake_run_git)
 
     class FakeForgejoClient:
-        def __init__(self, _base_url, _token):
+        def __init__(self, _base_url, _token, http=None):
             pass
 
         def get_current_user(self):
@@ -125,7 +125,7 @@ def test_issue_read_list_and_single(monkeypatch) -> None:
     config = make_config()
 
     class FakeClient:
-        def list_issues(self, owner, repo, state="open", limit=50):
+        def iter_issues(self, owner, repo, state="open", limit=50):
             assert owner == "sam"
             assert repo == "joan"
             assert state == "all"
@@ -221,7 +221,7 @@ def test_issue_get_work_groups_ready_and_blocked(monkeypatch) -> None:
     config = make_config()
 
     class FakeClient:
-        def list_issues(self, owner, repo, state="open", limit=50):
+        def iter_issues(self, owner, repo, state="open", limit=50):
             assert (owner, repo, state, limit) == ("sam", "joan", "open", 50)
             return [
                 {"number": 1, "title": "Ready one", "state": "open"},
@@ -258,3 +258,40 @@ def test_issue_get_work_groups_ready_and_blocked(monkeypatch) -> None:
     assert payload["ready"][0]["issue"]["number"] == 1
     assert payload["blocked"][0]["issue"]["number"] == 2
     assert payload["blocked"][0]["open_blockers"][0]["number"] == 9
+
+
+def test_issue_get_work_ndjson_streams_one_issue_per_line(monkeypatch) -> None:
+    import joan.cli._common as common_mod
+
+    runner = CliRunner()
+    config = make_config()
+    events: list[object] = []
+
+    class FakeClient:
+        def iter_issues(self, owner, repo, state="open", limit=50):
+            for number in (5, 2, 3, 4):
+                events.append(f"fetched {number}")
+                yield {"number": number, "title": f"Issue {number}", "state": "open"}
+
+        def list_issue_blocked_by(self, owner, repo, index):
+            return [{"number": 9, "state": "open"}] if index == 2 else []
+
+    monkeypatch.setattr(common_mod, "_json_mode", "ndjson")
+    monkeypatch.setattr(common_mod.typer, "echo", lambda message, **_kw: events.append(json.loads(message)))
+    monkeypatch.setattr(issue_mod, "load_config_or_exit", lambda: config)
+    monkeypatch.setattr(issue_mod, "forgejo_client", lambda _cfg: FakeClient())
+
+    result = runner.invoke(issue_mod.app, ["get-work", "--ready-limit", "2"])
+
+    assert result.exit_code == 0, result.output
+    # Each issue is printed before the next one is fetched; ready issues past the limit are dropped.
+    assert [event if isinstance(event, str) else (event["status"], event["issue"]["number"]) for event in events] == [
+        "fetched 5",
+        ("ready", 5),
+        "fetched 2",
+        ("blocked", 2),
+        "fetched 3",
+        ("ready", 3),
+        "fetched 4",
+    ]
+    assert events[3]["open_blocker_count"] == 1
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from pathlib import Path
 import sys
+import threading
 import types
 
 import joan.cli.phil as phil_mod
@@ -110,12 +111,17 @@ def test_phil_work_runs_loop(monkeypatch) -> None:
     called: dict[str, object] = {}
 
     monkeypatch.setattr(phil_mod, "_load_configs", lambda: (object(), phil_config))
+    monkeypatch.setattr(phil_mod, "_interrupt_on_sigterm", lambda: None)
 
-    def fake_run_worker_loop(api_url, runner_obj, poll_interval, stop_event=None):
+    def fake_run_worker_loop(
+        api_url, runner_obj, poll_interval, stop_event=None, registration=None, worktrees=None, cancel_event=None
+    ):
         called["api_url"] = api_url
         called["runner"] = runner_obj
         called["poll_interval"] = poll_interval
         called["stop_event"] = stop_event
+        called["registration"] = registration
+        called["cancel_event"] = cancel_event
 
     monkeypatch.setattr(phil_mod, "run_worker_loop", fake_run_worker_loop)
 
@@ -123,48 +129,77 @@ def test_phil_work_runs_loop(monkeypatch) -> None:
     assert result.exit_code == 0, result.output
     assert called["api_url"] == "http://127.0.0.1:9000"
     assert called["poll_interval"] == 2.0
-    assert called["stop_event"] is None
+    assert not called["stop_event"].is_set()
+    assert not called["cancel_event"].is_set()
+    assert called["registration"].agent == "codex"
+
+
+def test_drain_worker_cancels_on_second_interrupt(monkeypatch) -> None:
+    stop_event = threading.Event()
+    cancel_event = threading.Event()
+    joins: list[float | None] = []
+
+    class FakeThread:
+        def is_alive(self):
+            return not cancel_event.is_set()
+
+        def join(self, timeout=None):
+            joins.append(timeout)
+            if not cancel_event.is_set():
+                raise KeyboardInterrupt
+
+    phil_mod._drain_worker(phil_mod._WorkerHandle(FakeThread(), stop_event, cancel_event))
+
+    assert stop_event.is_set()
+    assert cancel_event.is_set()
+    assert joins == [0.5, phil_mod._WORKER_CANCEL_TIMEOUT_SECONDS]
 
 
 def test_phil_up_starts_server_and_worker(monkeypatch) -> None:
     runner = CliRunner()
     phil_config = make_phil_config()
-    calls: dict[str, object] = {}
+    calls: dict[str, object] = {"threads": []}
 
     monkeypatch.setattr(phil_mod, "_load_configs", lambda: (object(), phil_config))
     monkeypatch.setattr(phil_mod, "_repo_root", lambda: Path("/tmp/test-repo"))
+    monkeypatch.setattr(phil_mod, "_phil_state_dir", lambda: Path("/tmp/test-repo/.git/joan/phil"))
+    monkeypatch.setattr(phil_mod, "_interrupt_on_sigterm", lambda: None)
 
     class FakeThread:
-        def __init__(self, target, args, daemon, name):
-            calls["thread_target"] = target
-            calls["thread_args"] = args
-            calls["thread_daemon"] = daemon
-            calls["thread_name"] = name
+        def __init__(self, target, args=(), kwargs=None, daemon=False, name=""):
+            self.target = target
+            self.args = args
+            self.kwargs = kwargs or {}
+            self.name = name
+            self.started = False
+            calls["threads"].append(self)
 
         def start(self):
-            calls["started"] = True
+            self.started = True
+
+        def is_alive(self):
+            return False
 
         def join(self, timeout=None):
-            calls["join_timeout"] = timeout
+            calls[f"join_{self.name}"] = timeout
 
     monkeypatch.setattr(phil_mod.threading, "Thread", FakeThread)
 
-    class FakeStopEvent:
-        def __init__(self):
-            self.set_called = False
+    class FakeServer:
+        def __init__(self, config):
+            self.config = config
+            self.should_exit = False
+            calls["server"] = self
 
-        def set(self):
-            self.set_called = True
-            calls["stop_set"] = True
-
-    monkeypatch.setattr(phil_mod.threading, "Event", FakeStopEvent)
+        def run(self):
+            pass
 
     class FakeUvicorn:
         @staticmethod
-        def run(app_instance, host, port):
-            calls["uvicorn_app"] = app_instance
-            calls["uvicorn_host"] = host
-            calls["uvicorn_port"] = port
+        def Config(app_instance, host, port):
+            return {"app": app_instance, "host": host, "port": port}
+
+        Server = FakeServer
 
     monkeypatch.setitem(sys.modules, "uvicorn", FakeUvicorn)
 
@@ -177,9 +212,11 @@ def test_phil_up_starts_server_and_worker(monkeypatch) -> None:
 
     result = runner.invoke(phil_mod.app, ["up", "--port", "9012"])
     assert result.exit_code == 0, result.output
-    assert calls["started"] is True
-    assert calls["uvicorn_app"] is sentinel_app
-    assert calls["uvicorn_port"] == 9012
-    assert calls["thread_args"][0] == "http://127.0.0.1:9012"
-    assert calls["join_timeout"] == 5
-    assert calls["stop_set"] is True
+    server_thread, worker_thread = calls["threads"]
+    assert server_thread.name == "phil-server"
+    assert server_thread.started and worker_thread.started
+    assert calls["server"].config == {"app": sentinel_app, "host": "0.0.0.0", "port": 9012}
+    assert calls["server"].should_exit is True
+    assert worker_thread.args[0] == "http://127.0.0.1:9012"
+    assert isinstance(worker_thread.kwargs["cancel_event"], threading.Event)
+    assert calls["join_phil-server"] == phil_mod._SERVER_STOP_TIMEOUT_SECONDS
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 
 import joan.cli.pr as pr_mod
+from joan.core.forgejo import parse_reviews
 from typer.testing import CliRunner
 
 
@@ -10,19 +11,21 @@ def test_pr_reviews_outputs_json(monkeypatch, sample_config, sample_pr) -> None:
     runner = CliRunner()
 
     class FakeClient:
-        def get_reviews(self, owner, repo, index):
+        def fetch_reviews(self, owner, repo, index):
             assert owner == "sam"
             assert repo == "joan"
             assert index == 7  # sample_pr.number
-            return [
-                {
-                    "id": 7,
-                    "state": "REQUEST_CHANGES",
-                    "body": "Please refactor the auth module",
-                    "submitted_at": "2026-02-28T14:00:00Z",
-                    "user": {"login": "reviewer"},
-                }
-            ]
+            return parse_reviews(
+                [
+                    {
+                        "id": 7,
+                        "state": "REQUEST_CHANGES",
+                        "body": "Please refactor the auth module",
+                        "submitted_at": "2026-02-28T14:00:00Z",
+                        "user": {"login": "reviewer"},
+                    }
+                ]
+            )
 
     monkeypatch.setattr(pr_mod, "load_config_or_exit", lambda: sample_config)
     monkeypatch.setattr(pr_mod, "forgejo_client", lambda _cfg: FakeClient())
@@ -42,8 +45,8 @@ def test_pr_reviews_empty_list(monkeypatch, sample_config, sample_pr) -> None:
     runner = CliRunner()
 
     class FakeClient:
-        def get_reviews(self, _owner, _repo, _index):
-            return []
+        def fetch_reviews(self, _owner, _repo, _index):
+            return parse_reviews([])
 
     monkeypatch.setattr(pr_mod, "load_config_or_exit", lambda: sample_config)
     monkeypatch.setattr(pr_mod, "forgejo_client", lambda _cfg: FakeClient())
@@ -52,3 +55,30 @@ def test_pr_reviews_empty_list(monkeypatch, sample_config, sample_pr) -> None:
     result = runner.invoke(pr_mod.app, ["reviews"])
     assert result.exit_code == 0
     assert json.loads(result.output) == []
+
+
+def test_pr_reviews_ndjson_prints_one_review_per_line(monkeypatch, sample_config, sample_pr) -> None:
+    import joan
+
+    class FakeClient:
+        def fetch_reviews(self, _owner, _repo, _index):
+            return parse_reviews(
+                [
+                    {"id": 1, "state": "COMMENT", "body": "é", "submitted_at": None, "user": {"login": "a"}},
+                    {"id": 2, "state": "APPROVED", "body": "", "submitted_at": None, "user": {"login": "b"}},
+                ]
+            )
+
+    monkeypatch.setattr(pr_mod, "load_config_or_exit", lambda: sample_config)
+    monkeypatch.setattr(pr_mod, "forgejo_client", lambda _cfg: FakeClient())
+    monkeypatch.setattr(pr_mod, "current_pr_or_exit", lambda _cfg, **_kw: sample_pr)
+
+    result = CliRunner().invoke(joan.app, ["--ndjson", "pr", "reviews"])
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1, 2]
+    assert '"body":"é"' in lines[0]
+
+    compact = CliRunner().invoke(joan.app, ["--compact", "pr", "reviews"])
+    assert compact.output.count("\n") == 1
+    assert [review["id"] for review in json.loads(compact.output)] == [1, 2]
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import json
+from contextlib import contextmanager
 from pathlib import Path
 
+import httpx
 from typer.testing import CliRunner
 
 import joan
 import joan.cli.pr as pr_mod
+from joan.core.forgejo import parse_comments, parse_reviews
 
 
 def test_root_cli_has_expected_commands() -> None:
@@ -132,14 +135,16 @@ def test_pr_sync(monkeypatch, sample_config, sample_pr) -> None:
     runner = CliRunner()
 
     class FakeClient:
-        def get_reviews(self, *_args, **_kwargs):
-            return [{"id": 1, "state": "APPROVED", "submitted_at": None, "user": {"login": "r"}}]
+        def fetch_reviews(self, *_args, **_kwargs):
+            return parse_reviews([{"id": 1, "state": "APPROVED", "submitted_at": None, "user": {"login": "r"}}])
 
-        def get_comments(self, *_args, **_kwargs):
-            return [
-                {"id": 9, "resolved": False, "user": {"login": "r"}},
-                {"id": 10, "resolved": False, "user": {"login": sample_config.forgejo.owner}},
-            ]
+        def fetch_comments(self, *_args, **_kwargs):
+            return parse_comments(
+                [
+                    {"id": 9, "resolved": False, "user": {"login": "r"}},
+                    {"id": 10, "resolved": False, "user": {"login": sample_config.forgejo.owner}},
+                ]
+            )
 
     monkeypatch.setattr(pr_mod, "load_config_or_exit", lambda: sample_config)
     monkeypatch.setattr(pr_mod, "forgejo_client", lambda _cfg: FakeClient())
@@ -152,16 +157,95 @@ def test_pr_sync(monkeypatch, sample_config, sample_pr) -> None:
     assert payload["unresolved_comments"] == 1
 
 
+class WatchClient:
+    def __init__(self, review_states: list[list[str]]) -> None:
+        self.review_states = review_states
+        self.polls = 0
+
+    @contextmanager
+    def session(self):
+        yield self
+
+    def clear_cache(self):
+        pass
+
+    def fetch_reviews(self, *_args, **_kwargs):
+        states = self.review_states[min(self.polls, len(self.review_states) - 1)]
+        self.polls += 1
+        return parse_reviews([{"id": n, "state": state, "user": {"login": "r"}} for n, state in enumerate(states)])
+
+    def fetch_comments(self, *_args, **_kwargs):
+        return []
+
+
+def test_pr_sync_watch_prints_changes_until_approved(monkeypatch, sample_config, sample_pr) -> None:
+    client = WatchClient([[], [], ["COMMENT"], ["COMMENT"], ["COMMENT", "APPROVED"]])
+    sleeps: list[float] = []
+    monkeypatch.setattr(pr_mod, "load_config_or_exit", lambda: sample_config)
+    monkeypatch.setattr(pr_mod, "forgejo_client", lambda _cfg: client)
+    monkeypatch.setattr(pr_mod, "current_pr_or_exit", lambda _cfg, **_kwargs: sample_pr)
+    monkeypatch.setattr(pr_mod, "_sleep", sleeps.append)
+
+    result = CliRunner().invoke(pr_mod.app, ["sync", "--until", "approved", "--interval", "2", "--max-interval", "4"])
+
+    assert result.exit_code == 0
+    assert [json.loads(line)["latest_review_state"] for line in result.output.splitlines()] == [
+        None,
+        "COMMENT",
+        "APPROVED",
+    ]
+    # Unchanged polls back off by half again each time; a change resets the interval.
+    assert sleeps == [2.0, 3.0, 2.0, 3.0]
+
+
+def test_pr_sync_watch_times_out_with_exit_code_3(monkeypatch, sample_config, sample_pr) -> None:
+    client = WatchClient([["COMMENT"]])
+    now = [0.0]
+
+    def fake_sleep(seconds: float) -> None:
+        now[0] += seconds
+
+    monkeypatch.setattr(pr_mod, "load_config_or_exit", lambda: sample_config)
+    monkeypatch.setattr(pr_mod, "forgejo_client", lambda _cfg: client)
+    monkeypatch.setattr(pr_mod, "current_pr_or_exit", lambda _cfg, **_kwargs: sample_pr)
+    monkeypatch.setattr(pr_mod, "_sleep", fake_sleep)
+    monkeypatch.setattr(pr_mod, "_monotonic", lambda: now[0])
+
+    result = CliRunner().invoke(pr_mod.app, ["sync", "--watch", "--interval", "2", "--timeout", "5"])
+
+    assert result.exit_code == 3
+    assert len(result.output.splitlines()) == 1
+    assert now[0] == 5.0
+    assert client.polls == 3
+
+
+def test_pr_sync_watch_exits_with_code_2_when_forgejo_is_unreachable(monkeypatch, sample_config, sample_pr) -> None:
+    class UnreachableClient(WatchClient):
+        def fetch_reviews(self, *_args, **_kwargs):
+            raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(pr_mod, "load_config_or_exit", lambda: sample_config)
+    monkeypatch.setattr(pr_mod, "forgejo_client", lambda _cfg: UnreachableClient([]))
+    monkeypatch.setattr(pr_mod, "current_pr_or_exit", lambda _cfg, **_kwargs: sample_pr)
+
+    result = CliRunner().invoke(pr_mod.app, ["sync", "--watch"])
+
+    assert result.exit_code == 2
+    assert "Failed to read PR #7: connection refused" in result.output
+
+
 def test_pr_comments_and_resolve(monkeypatch, sample_config, sample_pr) -> None:
     runner = CliRunner()
 
     class FakeClient:
-        def get_comments(self, *_args, **_kwargs):
-            return [
-                {"id": 1, "resolved": False, "user": {"login": "r"}},
-                {"id": 2, "resolved": True, "user": {"login": "r"}},
-                {"id": 3, "resolved": False, "user": {"login": sample_config.forgejo.owner}},
-            ]
+        def iter_comments(self, *_args, **_kwargs):
+            return parse_comments(
+                [
+                    {"id": 1, "resolved": False, "user": {"login": "r"}},
+                    {"id": 2, "resolved": True, "user": {"login": "r"}},
+                    {"id": 3, "resolved": False, "user": {"login": sample_config.forgejo.owner}},
+                ]
+            )
 
         def resolve_comment(self, *_args, **_kwargs):
             return None
@@ -196,11 +280,11 @@ def test_pr_finish_merges_into_stage_branch(monkeypatch, sample_config) -> None:
     calls: list[list[str]] = []
 
     class FakeClient:
-        def get_reviews(self, *_args, **_kwargs):
-            return [{"id": 1, "state": "APPROVED", "submitted_at": None, "user": {"login": "r"}}]
+        def fetch_reviews(self, *_args, **_kwargs):
+            return parse_reviews([{"id": 1, "state": "APPROVED", "submitted_at": None, "user": {"login": "r"}}])
 
-        def get_comments(self, *_args, **_kwargs):
-            return []
+        def fetch_comments(self, *_args, **_kwargs):
+            return parse_comments([])
 
         def merge_pr(self, owner, repo, index):
             assert (owner, repo, index) == ("sam", "joan", 7)
@@ -239,3 +323,19 @@ def test_pr_finish_rejects_wrong_base(monkeypatch, sample_config) -> None:
 
     assert result.exit_code == 1
     assert "expected stage branch" in result.output
+
+
+def test_root_trace_option_reports_forgejo_calls(tmp_path: Path) -> None:
+    from benchmarks.fake_forgejo import FakeForgejo, seed_data
+    from benchmarks.run import bench_workspace
+    from joan.shell import forgejo_client as client_mod
+
+    trace_file = tmp_path / "trace.jsonl"
+    with FakeForgejo(seed_data(6)) as forge, bench_workspace(forge.url):
+        result = CliRunner().invoke(joan.app, ["--trace", "--trace-file", str(trace_file), "issue", "get-work"])
+
+    assert result.exit_code == 0
+    assert "GET /api/v1/repos/{owner}/{repo}/issues/{n}/dependencies" in result.output
+    records = [json.loads(line) for line in trace_file.read_text(encoding="utf-8").splitlines()]
+    assert len(records) == forge.request_count
+    assert client_mod._request_hooks == []
@@ -4,6 +4,7 @@ import json
 from pathlib import Path
 
 import joan.cli.review_memory as review_memory_mod
+from joan.core.forgejo import parse_comments, parse_reviews
 from joan.core.models import PullRequest
 from typer.testing import CliRunner
 
@@ -29,20 +30,24 @@ def test_review_memory_ingest_writes_rules(monkeypatch, sample_config, tmp_path:
     )
 
     class FakeClient:
-        def get_reviews(self, *_args, **_kwargs):
-            return [{"id": 1, "state": "REQUESTED_CHANGES", "body": "Please add a regression test", "user": {"login": "r"}}]
-
-        def get_comments(self, *_args, **_kwargs):
-            return [
-                {
-                    "id": 9,
-                    "body": "Please improve typing here",
-                    "path": "src/joan/cli/pr.py",
-                    "line": 10,
-                    "resolved": False,
-                    "user": {"login": "r"},
-                }
-            ]
+        def fetch_reviews(self, *_args, **_kwargs):
+            return parse_reviews(
+                [{"id": 1, "state": "REQUESTED_CHANGES", "body": "Please add a regression test", "user": {"login": "r"}}]
+            )
+
+        def fetch_comments(self, *_args, **_kwargs):
+            return parse_comments(
+                [
+                    {
+                        "id": 9,
+                        "body": "Please improve typing here",
+                        "path": "src/joan/cli/pr.py",
+                        "line": 10,
+                        "resolved": False,
+                        "user": {"login": "r"},
+                    }
+                ]
+            )
 
     monkeypatch.setattr(review_memory_mod, "forgejo_client", lambda _cfg: FakeClient())
 
@@ -121,3 +121,114 @@ def test_write_and_read_agent_config(tmp_path: Path) -> None:
 def test_read_agent_config_missing(tmp_path: Path) -> None:
     with pytest.raises(FileNotFoundError):
         read_agent_config("phil", tmp_path)
+
+
+def test_parse_agent_config_queue_section() -> None:
+    raw = """
+[forgejo]
+token = "tok"
+
+[queue]
+scheduler = "fair_share"
+max_concurrent_per_repo = 2
+
+[queue.repo_weights]
+"sam/joan" = 2.5
+
+[queue.priority_labels]
+"urgent" = 20
+"""
+    config = parse_agent_config(raw, "phil")
+
+    assert config.queue.scheduler == "fair_share"
+    assert config.queue.max_concurrent_per_repo == 2
+    assert config.queue.repo_weights == {"sam/joan": 2.5}
+    assert config.queue.priority_labels == {"urgent": 20}
+
+
+def test_parse_agent_config_rejects_unknown_scheduler() -> None:
+    raw = """
+[forgejo]
+token = "tok"
+
+[queue]
+scheduler = "lottery"
+"""
+    with pytest.raises(AgentConfigError, match="queue.scheduler"):
+        parse_agent_config(raw, "phil")
+
+
+def test_parse_agent_config_review_section() -> None:
+    raw = """
+[forgejo]
+token = "tok"
+
+[review]
+max_chunk_tokens = 1000
+skip_globs = ["*.svg"]
+diff_cache_max_bytes = 0
+"""
+    config = parse_agent_config(raw, "phil")
+
+    assert config.review.max_chunk_tokens == 1000
+    assert config.review.max_parallel_chunks == 4
+    assert config.review.skip_globs == ["*.svg"]
+    assert config.review.diff_cache_max_bytes == 0
+    assert config.review.max_diff_bytes == 32 * 1024 * 1024
+
+
+def test_parse_agent_config_repos_section() -> None:
+    raw = """
+[forgejo]
+token = "tok"
+
+[server]
+allow_unlisted_repos = false
+
+[repos."sam/joan"]
+token = "joan-repo-tok"
+weight = 2.0
+max_concurrent = 1
+skip_globs = ["*.snap"]
+
+[repos."sam/archived"]
+enabled = false
+"""
+    config = parse_agent_config(raw, "phil")
+
+    assert config.server.allow_unlisted_repos is False
+    assert config.repos["sam/joan"].token == "joan-repo-tok"
+    assert config.repos["sam/joan"].weight == 2.0
+    assert config.repos["sam/joan"].max_concurrent == 1
+    assert config.repos["sam/joan"].skip_globs == ["*.snap"]
+    assert config.repos["sam/archived"].enabled is False
+    assert config.repos["sam/archived"].skip_globs is None
+
+
+def test_parse_agent_config_rejects_bad_repo_key() -> None:
+    raw = """
+[forgejo]
+token = "tok"
+
+[repos.joan]
+token = "x"
+"""
+    with pytest.raises(AgentConfigError, match="owner/name"):
+        parse_agent_config(raw, "phil")
+
+
+def test_parse_agent_config_worker_session_pool_requires_done_marker() -> None:
+    raw = """
+[forgejo]
+token = "tok"
+
+[worker]
+session_pool_size = 2
+"""
+    with pytest.raises(AgentConfigError, match="session_done_marker"):
+        parse_agent_config(raw, "phil")
+
+    config = parse_agent_config(raw + 'session_done_marker = "> "\nsession_max_jobs = 5\n', "phil")
+    assert config.worker.session_pool_size == 2
+    assert config.worker.session_max_jobs == 5
+    assert config.worker.session_done_marker == "> "
@@ -82,3 +82,25 @@ def test_config_to_dict_roundtrip(sample_config: Config) -> None:
     out = config_to_dict(sample_config)
     again = parse_config_dict(out)
     assert again == sample_config
+
+
+def test_parse_config_http_policy_roundtrips() -> None:
+    data = {
+        "forgejo": {"url": "http://x", "token": "t", "owner": "o", "repo": "r"},
+        "http": {"max_retries": 4, "rate_limit_per_second": 5, "rate_limit_burst": 20},
+    }
+    config = parse_config_dict(data)
+
+    assert config.forgejo.http.max_retries == 4
+    assert config.forgejo.http.rate_limit_per_second == 5
+    assert config.forgejo.http.timeout_seconds == 30.0
+    assert config_to_dict(config)["http"] == data["http"]
+    assert "http" not in config_to_dict(parse_config_dict({"forgejo": data["forgejo"]}))
+
+
+def test_parse_config_rejects_bad_http_policy() -> None:
+    base = {"forgejo": {"url": "http://x", "token": "t", "owner": "o", "repo": "r"}}
+    with pytest.raises(ConfigError, match="http.max_retries must be a non-negative number"):
+        parse_config_dict({**base, "http": {"max_retries": -1}})
+    with pytest.raises(ConfigError, match="http.timeout_seconds must be positive"):
+        parse_config_dict({**base, "http": {"timeout_seconds": 0}})
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+from joan.core.diff import (
+    estimate_tokens,
+    filter_diff_files,
+    is_skipped_path,
+    iter_diff_sections,
+    pack_diff_chunks,
+    parse_unified_diff,
+    stub_skipped_sections,
+)
+from joan.core.models import default_review_skip_globs
+
+SAMPLE_DIFF = """diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,2 +1,3 @@
+ import os
++import sys
+ print(os)
+@@ -10,2 +11,2 @@ def main():
+-    return 1
++    return 0
+diff --git a/uv.lock b/uv.lock
+index 3333333..4444444 100644
+--- a/uv.lock
++++ b/uv.lock
+@@ -1 +1 @@
+-old
++new
+diff --git a/docs/old.md b/docs/old.md
+deleted file mode 100644
+index 5555555..0000000
+--- a/docs/old.md
++++ /dev/null
+@@ -1 +0,0 @@
+-gone
+"""
+
+
+def test_parse_unified_diff_splits_files_and_hunks() -> None:
+    files = parse_unified_diff(SAMPLE_DIFF)
+
+    assert [item.path for item in files] == ["src/app.py", "uv.lock", "docs/old.md"]
+    assert len(files[0].hunks) == 2
+    assert files[0].header.startswith("diff --git a/src/app.py")
+    assert files[0].header.endswith("+++ b/src/app.py\n")
+    assert files[0].hunks[1].startswith("@@ -10,2 +11,2 @@")
+    assert "".join(item.text() for item in files) == SAMPLE_DIFF
+
+
+def test_skip_globs_match_lock_vendored_and_generated_paths() -> None:
+    globs = default_review_skip_globs()
+    assert is_skipped_path("uv.lock", globs)
+    assert is_skipped_path("web/package-lock.json", globs)
+    assert is_skipped_path("vendor/github.com/x/y.go", globs)
+    assert is_skipped_path("services/api/node_modules/left-pad/index.js", globs)
+    assert is_skipped_path("proto/service_pb2.py", globs)
+    assert not is_skipped_path("src/vendored_helpers.py", globs)
+
+    kept, skipped = filter_diff_files(parse_unified_diff(SAMPLE_DIFF), globs)
+    assert [item.path for item in kept] == ["src/app.py", "docs/old.md"]
+    assert skipped == ["uv.lock"]
+
+
+def test_pack_diff_chunks_respects_budget_and_splits_large_files_on_hunks() -> None:
+    files = parse_unified_diff(SAMPLE_DIFF)
+    whole = pack_diff_chunks(files, max_tokens=10_000)
+    assert whole == [SAMPLE_DIFF]
+
+    app_file = files[0]
+    budget = estimate_tokens(app_file.header + app_file.hunks[0]) + 1
+    chunks = pack_diff_chunks([app_file], max_tokens=budget)
+    assert len(chunks) == 2
+    assert all(chunk.startswith(app_file.header) for chunk in chunks)
+    assert chunks[0].endswith(app_file.hunks[0])
+    assert chunks[1].endswith(app_file.hunks[1])
+
+
+def test_iter_diff_sections_and_stub_skipped_files() -> None:
+    sections = list(iter_diff_sections(SAMPLE_DIFF.splitlines(keepends=True)))
+    assert [section.split("\n", 1)[0] for section in sections] == [
+        "diff --git a/src/app.py b/src/app.py",
+        "diff --git a/uv.lock b/uv.lock",
+        "diff --git a/docs/old.md b/docs/old.md",
+    ]
+
+    stubbed = "".join(stub_skipped_sections(sections, ["*.lock"]))
+    assert "+new" not in stubbed
+    assert "+import sys" in stubbed
+    kept, skipped = filter_diff_files(parse_unified_diff(stubbed), ["*.lock"])
+    assert skipped == ["uv.lock"]
+    assert [item.path for item in kept] == ["src/app.py", "docs/old.md"]
@@ -8,6 +8,8 @@ from joan.core.forgejo import (
     build_create_pr_payload,
     build_create_repo_payload,
     compute_sync_status,
+    decode_comments,
+    decode_reviews,
     exclude_comments_by_author,
     format_comments_json,
     format_reviews_json,
@@ -81,6 +83,45 @@ def test_parse_reviews_and_comments() -> None:
     assert comments[0].author == "reviewer"
 
 
+def test_decode_matches_parse_for_forgejo_payloads(json_backend: str) -> None:
+    reviews = [
+        {
+            "id": 1,
+            "state": "APPROVED",
+            "body": "ok",
+            "submitted_at": "2026-02-27T10:30:00+02:00",
+            "user": {"login": "sam", "id": 5, "avatar_url": "http://x"},
+            "commit_id": "abc",
+        },
+        {"id": 2, "body": None, "user": None},
+    ]
+    comments = [
+        {
+            "id": 3,
+            "body": "Fix this",
+            "path": "src/a.py",
+            "line": 9,
+            "created_at": "2026-02-27T00:00:00Z",
+            "user": {"login": "reviewer"},
+            "diff_hunk": "@@ -1 +1 @@",
+        },
+        {"id": 4, "body": "é", "resolved": True, "line": None},
+    ]
+
+    assert decode_reviews(json.dumps(reviews).encode()) == parse_reviews(reviews)
+    assert decode_comments(json.dumps(comments).encode()) == parse_comments(comments)
+    assert decode_reviews(b"[]") == []
+
+
+def test_decode_falls_back_for_unexpected_shapes(json_backend: str) -> None:
+    comments = [{"id": 1, "created_at": "not-a-date", "resolved": None, "line": "7"}]
+
+    decoded = decode_comments(json.dumps(comments).encode())
+
+    assert decoded == parse_comments(comments)
+    assert decoded[0].created_at is None
+
+
 def test_compute_sync_status() -> None:
     reviews = [
         Review(id=1, state="COMMENTED", body="", submitted_at=None, user="a"),
@@ -26,6 +26,14 @@ def test_basic_git_arg_helpers() -> None:
     assert git_mod.current_branch_args() == ["rev-parse", "--abbrev-ref", "HEAD"]
     assert git_mod.worktree_add_args("/tmp/wt", branch="feat") == ["worktree", "add", "-b", "feat", "/tmp/wt"]
     assert git_mod.worktree_remove_args("/tmp/wt") == ["worktree", "remove", "/tmp/wt"]
+    assert git_mod.worktree_add_detached_args("/tmp/wt") == ["worktree", "add", "--detach", "/tmp/wt"]
+    assert git_mod.fetch_pr_head_args("joan-review", 7) == [
+        "fetch",
+        "--no-tags",
+        "joan-review",
+        "+refs/pull/7/head:refs/joan/phil/pr-7",
+    ]
+    assert git_mod.checkout_detached_args("abc") == ["checkout", "--detach", "--force", "abc"]
     assert git_mod.remote_add_args("review", "http://x") == ["remote", "add", "review", "http://x"]
     assert git_mod.remote_set_url_args("review", "http://x") == ["remote", "set-url", "review", "http://x"]
     assert git_mod.list_remotes_args() == ["remote"]
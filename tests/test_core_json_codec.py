@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import json
+
+from joan.core import json_codec
+
+
+def test_dumps_modes_round_trip(json_backend: str) -> None:
+    payload = [{"id": 1, "body": "naïve", "tags": []}, {"id": 2, "body": None, "tags": ["x"]}]
+
+    pretty = json_codec.dumps(payload)
+    assert json.loads(pretty) == payload
+    assert pretty == json.dumps(payload, indent=2, ensure_ascii=False)
+    assert json_codec.dumps({"ratio": 0.5, "id": 2**40}) == '{\n  "ratio": 0.5,\n  "id": 1099511627776\n}'
+    assert pretty.startswith('[\n  {\n    "id": 1,')
+    assert "naïve" in pretty
+
+    assert json_codec.dumps(payload, "compact") == '[{"id":1,"body":"naïve","tags":[]},{"id":2,"body":null,"tags":["x"]}]'
+    assert [json.loads(line) for line in json_codec.dumps(payload, "ndjson").splitlines()] == payload
+    assert json_codec.dumps({"approved": True}, "ndjson") == '{"approved":true}'
+
+
+def test_loads_accepts_bytes_and_text(json_backend: str) -> None:
+    assert json_codec.loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert json_codec.loads('"x"') == "x"
+    assert json_codec.loads('{"é": null}') == {"é": None}
+    assert json_codec.BACKEND in ("orjson", "msgspec", "json")
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.run import GATE_SCALES, SCENARIOS, compare_to_baseline, load_baselines, run_benchmark
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.mark.parametrize("scale", GATE_SCALES)
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_cli_flow_stays_within_baseline(scenario: str, scale: int) -> None:
+    result = run_benchmark(scenario, scale, repeat=3)
+
+    assert compare_to_baseline(result, load_baselines()) == []
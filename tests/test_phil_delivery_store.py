@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from joan.phil.delivery_store import DeliveryStore
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_delivery_store_rejects_seen_and_in_flight_ids() -> None:
+    store = DeliveryStore(ttl_seconds=60, max_entries=10, clock=FakeClock())
+
+    assert store.begin("d1") is True
+    assert store.begin("d1") is False
+    store.abort("d1")
+    assert store.begin("d1") is True
+    store.commit("d1")
+    assert store.begin("d1") is False
+
+
+def test_delivery_store_expires_and_bounds_entries() -> None:
+    clock = FakeClock()
+    store = DeliveryStore(ttl_seconds=60, max_entries=2, clock=clock)
+    for delivery_id in ("d1", "d2", "d3"):
+        store.begin(delivery_id)
+        store.commit(delivery_id)
+        clock.now += 1
+
+    assert len(store) == 2
+    assert store.begin("d1") is True
+    assert store.begin("d3") is False
+
+    clock.now += 120
+    assert store.begin("d3") is True
+
+
+def test_delivery_store_persists_to_sqlite(tmp_path) -> None:
+    clock = FakeClock()
+    path = tmp_path / "deliveries.sqlite3"
+    store = DeliveryStore(ttl_seconds=60, max_entries=10, path=path, clock=clock)
+    store.begin("d1")
+    store.commit("d1")
+
+    assert DeliveryStore(ttl_seconds=60, max_entries=10, path=path, clock=clock).begin("d1") is False
+    clock.now += 120
+    assert DeliveryStore(ttl_seconds=60, max_entries=10, path=path, clock=clock).begin("d1") is True
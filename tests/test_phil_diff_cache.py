@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+
+from joan.phil.diff_cache import DiffCache
+
+
+def test_diff_cache_round_trips_by_commit_range(tmp_path) -> None:
+    cache = DiffCache(tmp_path, max_bytes=1024)
+
+    assert cache.get("sam", "joan", "base", "head") is None
+    cache.put("sam", "joan", "base", "head", "diff --git a/x b/x\n")
+
+    assert cache.get("sam", "joan", "base", "head") == "diff --git a/x b/x\n"
+    assert cache.get("sam", "joan", "base", "other") is None
+    assert cache.get("sam", "other", "base", "head") is None
+    assert DiffCache(tmp_path, max_bytes=1024).get("sam", "joan", "base", "head") is not None
+
+
+def test_diff_cache_keys_entries_by_skip_globs(tmp_path) -> None:
+    cache = DiffCache(tmp_path, max_bytes=1024)
+    cache.put("sam", "joan", "base", "head", "stubbed lock file\n", ["*.lock"])
+
+    assert cache.get("sam", "joan", "base", "head", ["*.lock"]) == "stubbed lock file\n"
+    assert cache.get("sam", "joan", "base", "head", ["*.lock", "vendor/**"]) is None
+    assert cache.get("sam", "joan", "base", "head") is None
+
+
+def test_diff_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = DiffCache(tmp_path, max_bytes=250)
+    cache.put("sam", "joan", "b", "h1", "1" * 100)
+    cache.put("sam", "joan", "b", "h2", "2" * 100)
+    for offset, path in enumerate(sorted(tmp_path.glob("*.diff"), key=lambda item: item.stat().st_mtime_ns)):
+        os.utime(path, ns=(offset * 10**9, offset * 10**9))
+    # Reading h1 makes it the most recently used entry.
+    assert cache.get("sam", "joan", "b", "h1") is not None
+
+    cache.put("sam", "joan", "b", "h3", "3" * 100)
+
+    assert cache.get("sam", "joan", "b", "h1") is not None
+    assert cache.get("sam", "joan", "b", "h2") is None
+    assert cache.get("sam", "joan", "b", "h3") is not None
+
+
+def test_diff_cache_disabled_without_root_or_budget(tmp_path) -> None:
+    for cache in (DiffCache(None, max_bytes=1024), DiffCache(tmp_path, max_bytes=0)):
+        cache.put("sam", "joan", "b", "h", "diff")
+        assert cache.get("sam", "joan", "b", "h") is None
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import httpx
+
+from joan.phil.dispatcher import ReviewDispatcher, TransientReviewError, is_transient_error, retry_delay
+from joan.phil.prompt_store import PromptStore
+from joan.phil.scheduling import FairShareScheduler, JobRanker
+from joan.phil.work_queue import ReviewWorkQueue
+from joan.shell.tracing import span, start_tracing, stop_tracing
+from joan.shell.forgejo_client import ForgejoError
+
+
+def test_is_transient_error_classifies_failures() -> None:
+    assert is_transient_error(TransientReviewError("timed out"))
+    assert is_transient_error(httpx.ConnectError("refused"))
+    assert is_transient_error(ForgejoError("Forgejo API 502: bad gateway"))
+    assert not is_transient_error(ForgejoError("Forgejo API 404: not found"))
+    assert not is_transient_error(RuntimeError("invalid claude review output for PR #5"))
+
+
+def test_retry_delay_doubles_up_to_cap() -> None:
+    assert [retry_delay(attempt, 5.0) for attempt in (1, 2, 3)] == [5.0, 10.0, 20.0]
+    assert retry_delay(20, 5.0) == 300.0
+
+
+def test_dispatcher_resumes_jobs_held_back_by_a_repo_cap(tmp_path) -> None:
+    async def scenario() -> None:
+        scheduler = FairShareScheduler(JobRanker(300.0, 0.0), max_concurrent_per_repo=1)
+        queue = ReviewWorkQueue(scheduler, prompts=PromptStore(tmp_path))
+        jobs = [await queue.enqueue_pr_review("sam", "joan", number, "diff") for number in (1, 2)]
+        dispatcher = ReviewDispatcher(
+            queue,
+            ThreadPoolExecutor(max_workers=2),
+            lambda job: lambda: "done",
+            max_concurrent=2,
+            max_attempts=1,
+            retry_backoff_seconds=0.0,
+        )
+        dispatcher.start()
+        try:
+            async with asyncio.timeout(5):
+                while any(queue.snapshot(job.id)["status"] != "completed" for job in jobs):
+                    await asyncio.sleep(0.01)
+        finally:
+            await dispatcher.stop()
+
+    asyncio.run(scenario())
+
+
+def _review_in_pool() -> str:
+    with span("review.fetch", "phil"):
+        return "done"
+
+
+def test_dispatcher_merges_spans_recorded_in_pool_processes(tmp_path) -> None:
+    async def scenario() -> str:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path))
+        job = await queue.enqueue_pr_review("sam", "joan", 1, "diff")
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        dispatcher = ReviewDispatcher(
+            queue, pool, lambda job: _review_in_pool, max_concurrent=1, max_attempts=1, retry_backoff_seconds=0.0
+        )
+        dispatcher.start()
+        try:
+            async with asyncio.timeout(30):
+                while queue.snapshot(job.id)["status"] != "completed":
+                    await asyncio.sleep(0.01)
+        finally:
+            await dispatcher.stop()
+        return queue.snapshot(job.id)["transcript"]
+
+    tracer = start_tracing()
+    try:
+        assert asyncio.run(scenario()) == "done"
+    finally:
+        stop_tracing()
+
+    [event] = [event for event in tracer.chrome_trace()["traceEvents"] if event["ph"] == "X"]
+    assert event["name"] == "review.fetch"
+    assert event["pid"] != os.getpid()
+    assert event["ts"] > 0
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import resource
+import subprocess
+
+from joan.phil.limits import JobCgroup, ResourceLimits, UsageTotals, apply_limits, usage_from_rusage
+
+
+def test_apply_limits_caps_a_running_child_from_the_parent() -> None:
+    proc = subprocess.Popen(["sleep", "30"])
+    try:
+        memory_before = resource.prlimit(proc.pid, resource.RLIMIT_AS)
+        processes_before = resource.prlimit(proc.pid, resource.RLIMIT_NPROC)
+        apply_limits(proc.pid, ResourceLimits(max_open_files=64, max_memory_bytes=1 << 30, max_processes=32))
+
+        assert resource.prlimit(proc.pid, resource.RLIMIT_NOFILE) == (64, 64)
+        # Memory and process caps only go through a cgroup.
+        assert resource.prlimit(proc.pid, resource.RLIMIT_AS) == memory_before
+        assert resource.prlimit(proc.pid, resource.RLIMIT_NPROC) == processes_before
+    finally:
+        proc.kill()
+        proc.wait()
+
+
+def test_apply_limits_moves_the_child_into_its_cgroup(tmp_path) -> None:
+    limits = ResourceLimits(max_memory_bytes=1 << 30, cgroup_root=str(tmp_path))
+    cgroup = JobCgroup(tmp_path, limits)
+
+    apply_limits(4242, limits, cgroup)
+
+    assert (cgroup.path / "cgroup.procs").read_text() == "4242"
+
+
+def test_job_cgroup_writes_limits_and_reads_peak_usage(tmp_path) -> None:
+    cgroup = JobCgroup(tmp_path, ResourceLimits(max_memory_bytes=1 << 30, max_processes=32, cgroup_root=str(tmp_path)))
+    assert (cgroup.path / "memory.max").read_text() == str(1 << 30)
+    assert (cgroup.path / "pids.max").read_text() == "32"
+
+    (cgroup.path / "memory.peak").write_text("5242880\n")
+    (cgroup.path / "cpu.stat").write_text("usage_usec 2500000\nuser_usec 2000000\n")
+    usage = usage_from_rusage(None, 3.0, cgroup)
+    assert usage.peak_rss_bytes == 5242880
+    assert usage.cpu_seconds == 2.5
+
+
+def test_usage_totals_sum_cpu_and_keep_peak_rss() -> None:
+    totals = UsageTotals()
+    totals.add({"peak_rss_bytes": 100.0, "cpu_seconds": 1.5, "wall_seconds": 2.0})
+    totals.add({"peak_rss_bytes": 50.0, "cpu_seconds": 0.5, "wall_seconds": 1.0})
+
+    assert totals.summary() == {"jobs": 2, "cpu_seconds": 2.0, "wall_seconds": 3.0, "peak_rss_bytes": 100}
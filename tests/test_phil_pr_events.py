@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from joan.phil.pr_events import PullRequestEvents, PullRequestEventsClient, PullRequestEventsError, event_pull_request
+
+
+def test_wait_wakes_on_publish_for_the_same_pr_only() -> None:
+    async def scenario() -> None:
+        events = PullRequestEvents()
+        waiter = asyncio.create_task(events.wait("sam", "joan", 7, since=0, timeout=5))
+        await events.publish("sam", "joan", 8)
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await events.publish("sam", "joan", 7)
+        assert await waiter == 1
+        assert events.current("sam", "joan", 8) == 1
+
+    asyncio.run(scenario())
+
+
+def test_wait_times_out_with_the_current_sequence() -> None:
+    async def scenario() -> None:
+        events = PullRequestEvents()
+        await events.publish("sam", "joan", 7)
+        assert await events.wait("sam", "joan", 7, since=1, timeout=0.01) == 1
+        # A restarted server counts from zero again, which still differs from the caller's number.
+        assert await events.wait("sam", "joan", 7, since=5, timeout=5) == 1
+
+    asyncio.run(scenario())
+
+
+def test_event_pull_request_reads_pr_and_pr_comment_payloads() -> None:
+    assert event_pull_request({"pull_request": {"number": 3}}) == 3
+    assert event_pull_request({"issue": {"number": 4, "pull_request": {"merged": False}}}) == 4
+    assert event_pull_request({"issue": {"number": 5, "pull_request": None}}) is None
+    assert event_pull_request({"ref": "refs/heads/main"}) is None
+
+
+def test_events_client_long_polls_the_wait_route() -> None:
+    seen: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        if request.url.params["pr"] == "8":
+            return httpx.Response(404, text="not found")
+        return httpx.Response(200, json={"seq": 3})
+
+    client = PullRequestEventsClient("http://phil/", transport=httpx.MockTransport(handler))
+
+    assert client.wait("sam", "joan", 7, since=2, timeout=5) == 3
+    assert seen[0].url.path == "/events/wait"
+    assert dict(seen[0].url.params) == {"owner": "sam", "repo": "joan", "pr": "7", "since": "2", "timeout": "5"}
+    with pytest.raises(PullRequestEventsError, match="HTTP 404"):
+        client.wait("sam", "joan", 8)
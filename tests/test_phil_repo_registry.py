@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from joan.core.models import AgentConfig, AgentForgejoConfig, AgentRepoConfig, AgentServerConfig, Config, ForgejoConfig
+from joan.phil.repo_registry import RepoRegistry
+
+
+def make_registry(allow_unlisted: bool = True) -> tuple[RepoRegistry, list[tuple[str, str | None]]]:
+    created: list[tuple[str, str | None]] = []
+
+    def client_factory(url: str, token: str | None = None, http: object = None) -> object:
+        created.append((url, token))
+        return object()
+
+    joan_config = Config(forgejo=ForgejoConfig(url="http://forgejo.local", token="joan-tok", owner="sam", repo="joan"))
+    phil_config = AgentConfig(
+        name="phil",
+        forgejo=AgentForgejoConfig(token="phil-tok"),
+        server=AgentServerConfig(allow_unlisted_repos=allow_unlisted),
+        repos={
+            "team/api": AgentRepoConfig(token="api-tok", skip_globs=["*.snap"]),
+            "team/old": AgentRepoConfig(enabled=False),
+        },
+    )
+    return RepoRegistry(joan_config, phil_config, client_factory), created
+
+
+def test_registry_resolves_per_repo_credentials_and_policy() -> None:
+    registry, created = make_registry()
+
+    assert registry.joan_config_for("team", "api").forgejo.token == "api-tok"
+    assert registry.joan_config_for("team", "api").forgejo.repo == "api"
+    assert registry.joan_config_for("sam", "other").forgejo.token == "joan-tok"
+    assert registry.agent_config_for("team", "api").review.skip_globs == ["*.snap"]
+    assert registry.agent_config_for("sam", "other").review.skip_globs != ["*.snap"]
+
+    assert registry.client("team", "api") is registry.client("team", "api")
+    registry.client("sam", "other")
+    assert created == [("http://forgejo.local", "api-tok"), ("http://forgejo.local", "joan-tok")]
+
+
+def test_registry_lookup_honours_enabled_and_unlisted_policy() -> None:
+    registry, _ = make_registry(allow_unlisted=False)
+
+    assert registry.lookup("team", "api") is not None
+    assert registry.lookup("team", "old") is None
+    assert registry.lookup("sam", "other") is None
+    assert make_registry()[0].lookup("sam", "other") is not None
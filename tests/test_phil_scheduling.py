@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+from joan.core.models import AgentQueueConfig, AgentRepoConfig
+from joan.phil.scheduling import FairShareScheduler, FifoScheduler, JobRanker, PriorityScheduler, build_scheduler
+from joan.phil.work_queue import ReviewJob
+
+_BASE = datetime(2026, 3, 1, tzinfo=UTC)
+
+
+def make_job(
+    job_id: str,
+    owner: str = "sam",
+    repo: str = "joan",
+    *,
+    age_offset: float = 0.0,
+    priority: int = 0,
+    size_bytes: int = 0,
+) -> ReviewJob:
+    return ReviewJob(
+        id=job_id,
+        kind="pr_review",
+        status="pending",
+        created_at=_BASE + timedelta(seconds=age_offset),
+        claimed_at=None,
+        completed_at=None,
+        failed_at=None,
+        owner=owner,
+        repo=repo,
+        pr_number=1,
+        prompt_ref="",
+        priority=priority,
+        size_bytes=size_bytes,
+    )
+
+
+def drain(scheduler) -> list[str]:
+    out: list[str] = []
+    while (job := scheduler.pop()) is not None:
+        out.append(job.id)
+    return out
+
+
+def test_priority_scheduler_orders_by_priority_size_and_age() -> None:
+    scheduler = PriorityScheduler(JobRanker(priority_weight_seconds=300.0, size_weight_seconds_per_kib=1.0))
+    scheduler.push(make_job("old", age_offset=0))
+    scheduler.push(make_job("newer", age_offset=10))
+    scheduler.push(make_job("urgent", age_offset=60, priority=1))
+    scheduler.push(make_job("huge", age_offset=-100, size_bytes=1024 * 1024))
+
+    assert len(scheduler) == 4
+    assert drain(scheduler) == ["urgent", "old", "newer", "huge"]
+
+
+def test_fair_share_interleaves_repos_by_weight() -> None:
+    ranker = JobRanker(300.0, 0.0)
+    scheduler = FairShareScheduler(ranker, weights={("sam", "busy"): 2.0})
+    for index in range(6):
+        scheduler.push(make_job(f"busy-{index}", repo="busy", age_offset=index))
+    for index in range(2):
+        scheduler.push(make_job(f"quiet-{index}", repo="quiet", age_offset=100 + index))
+
+    order = drain(scheduler)
+    assert order[:3].count("quiet-0") == 1
+    assert order.index("quiet-1") < 6
+    assert [job for job in order if job.startswith("busy")] == [f"busy-{index}" for index in range(6)]
+
+
+def test_fair_share_respects_per_repo_cap_until_release() -> None:
+    scheduler = FairShareScheduler(JobRanker(300.0, 0.0), max_concurrent_per_repo=1)
+    first = make_job("a-1", repo="a")
+    scheduler.push(first)
+    scheduler.push(make_job("a-2", repo="a", age_offset=1))
+    scheduler.push(make_job("b-1", repo="b", age_offset=2))
+
+    assert scheduler.pop().id == "a-1"
+    assert scheduler.pop().id == "b-1"
+    assert scheduler.pop() is None
+    assert len(scheduler) == 1
+
+    scheduler.release(first)
+    assert scheduler.pop().id == "a-2"
+
+
+def test_fair_share_restored_job_is_popped_next() -> None:
+    scheduler = FairShareScheduler(JobRanker(300.0, 0.0))
+    scheduler.push(make_job("a-1", repo="a", age_offset=0))
+    scheduler.push(make_job("a-2", repo="a", age_offset=1))
+    scheduler.push(make_job("b-1", repo="b", age_offset=2))
+
+    skipped = [scheduler.pop(), scheduler.pop()]
+    assert [job.id for job in skipped] == ["a-1", "b-1"]
+    for job in reversed(skipped):
+        scheduler.restore(job)
+
+    assert len(scheduler) == 3
+    assert drain(scheduler) == ["a-1", "b-1", "a-2"]
+
+
+def test_build_scheduler_selects_implementation() -> None:
+    assert isinstance(build_scheduler(AgentQueueConfig()), FifoScheduler)
+    assert isinstance(build_scheduler(AgentQueueConfig(scheduler="priority")), PriorityScheduler)
+    fair = build_scheduler(AgentQueueConfig(scheduler="fair_share", repo_weights={"sam/joan": 3.0}))
+    assert isinstance(fair, FairShareScheduler)
+
+
+def test_build_scheduler_applies_per_repo_caps_from_registry() -> None:
+    repos = {"sam/a": AgentRepoConfig(max_concurrent=1), "sam/b": AgentRepoConfig(weight=2.0)}
+    scheduler = build_scheduler(AgentQueueConfig(scheduler="fair_share", max_concurrent_per_repo=3), repos)
+    for index in range(2):
+        scheduler.push(make_job(f"a-{index}", repo="a", age_offset=index))
+        scheduler.push(make_job(f"b-{index}", repo="b", age_offset=index))
+
+    claimed = [scheduler.pop(), scheduler.pop(), scheduler.pop()]
+
+    assert sorted(job.id for job in claimed) == ["a-0", "b-0", "b-1"]
+    assert scheduler.pop() is None
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import hmac
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 
+from joan.core.forgejo import parse_comments
 from joan.core.models import (
     AgentClaudeConfig,
     AgentConfig,
     AgentForgejoConfig,
+    AgentRepoConfig,
     AgentServerConfig,
     AgentWorkerConfig,
     Config,
@@ -18,6 +25,7 @@ from joan.core.models import (
     RemotesConfig,
 )
 from joan.phil import server as server_mod
+from joan.phil.dispatcher import TransientReviewError
 
 
 @pytest.fixture
@@ -84,6 +92,34 @@ def test_webhook_ignores_non_review_requested(joan_config, phil_config) -> None:
     assert resp.json()["status"] == "ignored"
 
 
+def test_review_webhook_advances_pr_event_sequence(joan_config, phil_config) -> None:
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app)
+    query = {"owner": "sam", "repo": "myrepo", "pr": 4}
+
+    assert client.get("/events/wait", params={**query, "timeout": 0}).json() == {"seq": 0}
+
+    payload = {
+        "action": "reviewed",
+        "pull_request": {"number": 4},
+        "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+    }
+    body = json.dumps(payload).encode()
+    resp = client.post(
+        "/webhook",
+        content=body,
+        headers={
+            "X-Gitea-Event": "pull_request_review_approved",
+            "X-Gitea-Signature": sign_payload(body, "test-secret"),
+            "Content-Type": "application/json",
+        },
+    )
+
+    assert resp.json()["status"] == "ignored"
+    assert client.get("/events/wait", params={**query, "since": 0, "timeout": 5}).json() == {"seq": 1}
+    assert client.get("/events/wait", params={**query, "since": 1, "timeout": 0}).json() == {"seq": 1}
+
+
 def test_webhook_rejects_bad_signature(joan_config, phil_config) -> None:
     app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
     client = TestClient(app)
@@ -105,14 +141,14 @@ def test_webhook_rejects_bad_signature(joan_config, phil_config) -> None:
 
 def test_webhook_enqueues_job_in_worker_mode(monkeypatch, joan_config, phil_config) -> None:
     class FakeForgejoClient:
-        def __init__(self, _url, _token=None):
+        def __init__(self, _url, _token=None, http=None):
             pass
 
-        def get_pr_diff(self, owner, repo, index):
+        def stream_pr_diff(self, owner, repo, index, max_bytes=0):
             assert owner == "sam"
             assert repo == "myrepo"
             assert index == 5
-            return "diff --git a/foo.py b/foo.py\n+new"
+            return ["diff --git a/foo.py b/foo.py\n+new"]
 
     monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
 
@@ -152,6 +188,43 @@ def test_webhook_enqueues_job_in_worker_mode(monkeypatch, joan_config, phil_conf
     assert "joan pr review submit" in claimed["prompt"]
 
 
+def test_health_answers_while_a_webhook_diff_download_is_in_progress(monkeypatch, joan_config, phil_config) -> None:
+    started = threading.Event()
+    release = threading.Event()
+
+    class SlowForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            started.set()
+            assert release.wait(5), "the download blocked the event loop"
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", SlowForgejoClient)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    payload = {
+        "action": "review_requested",
+        "pull_request": {"number": 5},
+        "requested_reviewer": {"login": "phil"},
+        "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+    }
+    body = json.dumps(payload).encode()
+    headers = {"X-Gitea-Event": "pull_request", "X-Gitea-Signature": sign_payload(body, "test-secret")}
+
+    async def scenario() -> None:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://phil") as client:
+            webhook = asyncio.create_task(client.post("/webhook", content=body, headers=headers))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            health = await asyncio.wait_for(client.get("/health"), 2)
+            release.set()
+            assert health.status_code == 200
+            assert (await webhook).status_code == 202
+
+    asyncio.run(scenario())
+
+
 def test_work_claim_returns_204_when_empty(joan_config, phil_config) -> None:
     app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
     client = TestClient(app)
@@ -161,11 +234,11 @@ def test_work_claim_returns_204_when_empty(joan_config, phil_config) -> None:
 
 def test_work_complete_and_fail_update_state(monkeypatch, joan_config, phil_config) -> None:
     class FakeForgejoClient:
-        def __init__(self, _url, _token=None):
+        def __init__(self, _url, _token=None, http=None):
             pass
 
-        def get_pr_diff(self, _owner, _repo, _index):
-            return "diff --git a/foo.py b/foo.py\n+new"
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            return ["diff --git a/foo.py b/foo.py\n+new"]
 
     monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
     app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
@@ -194,11 +267,13 @@ def test_work_complete_and_fail_update_state(monkeypatch, joan_config, phil_conf
     claim = client.post("/work/claim")
     job_id = claim.json()["id"]
 
-    complete = client.post(f"/work/{job_id}/complete", json={"transcript": "all done"})
+    usage = {"peak_rss_bytes": 2048, "cpu_seconds": 1.5, "wall_seconds": 3.0}
+    complete = client.post(f"/work/{job_id}/complete", json={"transcript": "all done", "usage": usage})
     assert complete.status_code == 200
     snapshot = queue.snapshot(job_id)
     assert snapshot["status"] == "completed"
     assert snapshot["transcript"] == "all done"
+    assert snapshot["usage"] == usage
 
     payload["pull_request"]["number"] = 6
     body_2 = json.dumps(payload).encode()
@@ -215,12 +290,21 @@ def test_work_complete_and_fail_update_state(monkeypatch, joan_config, phil_conf
     assert resp_2.status_code == 202
     claim_2 = client.post("/work/claim")
     job_2 = claim_2.json()["id"]
-    fail = client.post(f"/work/{job_2}/fail", json={"error": "boom", "transcript": "partial"})
+    fail = client.post(
+        f"/work/{job_2}/fail",
+        json={"error": "boom", "transcript": "partial", "usage": {"peak_rss_bytes": 4096, "cpu_seconds": 0.5}},
+    )
     assert fail.status_code == 200
     snapshot_2 = queue.snapshot(job_2)
     assert snapshot_2["status"] == "failed"
     assert snapshot_2["error"] == "boom"
     assert snapshot_2["transcript"] == "partial"
+    assert client.get("/health").json()["agent_usage"] == {
+        "jobs": 2,
+        "cpu_seconds": 2.0,
+        "wall_seconds": 3.0,
+        "peak_rss_bytes": 4096,
+    }
 
 
 def test_work_complete_rejects_unknown_job(joan_config, phil_config) -> None:
@@ -230,16 +314,222 @@ def test_work_complete_rejects_unknown_job(joan_config, phil_config) -> None:
     assert resp.status_code == 404
 
 
-def test_webhook_falls_back_to_direct_review_when_worker_mode_disabled(monkeypatch, joan_config, phil_config) -> None:
-    called: list[tuple[str, str, int]] = []
+def wait_for_job(client: TestClient, job_id: str, status: str) -> dict:
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        job = client.get(f"/work/{job_id}").json()
+        if job["status"] == status:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}: {job}")
+
+
+def post_review_request(client: TestClient, head_sha: str | None = None) -> dict:
+    pull_request: dict = {"number": 5}
+    if head_sha is not None:
+        pull_request["head"] = {"sha": head_sha}
+    payload = {
+        "action": "review_requested",
+        "pull_request": pull_request,
+        "requested_reviewer": {"login": "phil"},
+        "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+    }
+    body = json.dumps(payload).encode()
+    resp = client.post(
+        "/webhook",
+        content=body,
+        headers={
+            "X-Gitea-Event": "pull_request",
+            "X-Gitea-Signature": sign_payload(body, "test-secret"),
+            "Content-Type": "application/json",
+        },
+    )
+    assert resp.status_code == 202
+    return resp.json()
+
+
+def test_webhook_queues_direct_review_when_worker_mode_disabled(monkeypatch, joan_config, phil_config) -> None:
+    called: list[tuple[str, str, int, str | None]] = []
 
-    def fake_run_review(_joan, _phil, owner, repo, pr_number):
-        called.append((owner, repo, pr_number))
+    def fake_run_review(_joan, _phil, owner, repo, pr_number, **kwargs):
+        called.append((owner, repo, pr_number, kwargs["head_sha"]))
+        return {"verdict": "approve"}
 
     monkeypatch.setattr(server_mod, "run_review", fake_run_review)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=False, executor_factory=ThreadPoolExecutor)
 
-    app = server_mod.create_app(joan_config, phil_config, worker_mode=False)
-    client = TestClient(app, raise_server_exceptions=True)
+    with TestClient(app, raise_server_exceptions=True) as client:
+        accepted = post_review_request(client, head_sha="abc")
+        job = wait_for_job(client, accepted["job_id"], "completed")
+        assert client.post("/work/claim").status_code == 204
+
+    assert called == [("sam", "myrepo", 5, "abc")]
+    assert json.loads(job["transcript"]) == {"verdict": "approve"}
+    assert app.state.review_history.last_reviewed_sha("sam", "myrepo", 5) == "abc"
+
+
+def test_direct_review_retries_transient_errors_with_backoff(monkeypatch, joan_config, phil_config) -> None:
+    attempts: list[int] = []
+
+    def flaky_run_review(_joan, _phil, _owner, _repo, _pr_number, **_kwargs):
+        attempts.append(len(attempts) + 1)
+        if len(attempts) < 3:
+            raise TransientReviewError("claude timed out after 120s")
+        return "posted"
+
+    monkeypatch.setattr(server_mod, "run_review", flaky_run_review)
+    phil_config.claude.retry_backoff_seconds = 0.01
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=False, executor_factory=ThreadPoolExecutor)
+
+    with TestClient(app, raise_server_exceptions=True) as client:
+        job = wait_for_job(client, post_review_request(client)["job_id"], "completed")
+
+    assert attempts == [1, 2, 3]
+    assert job["attempts"] == 3
+    assert job["transcript"] == "posted"
+
+
+def test_direct_review_fails_without_retry_on_bad_output(monkeypatch, joan_config, phil_config) -> None:
+    attempts: list[int] = []
+
+    def broken_run_review(_joan, _phil, _owner, _repo, pr_number, **_kwargs):
+        attempts.append(pr_number)
+        raise RuntimeError(f"invalid claude review output for PR #{pr_number}")
+
+    monkeypatch.setattr(server_mod, "run_review", broken_run_review)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=False, executor_factory=ThreadPoolExecutor)
+
+    with TestClient(app, raise_server_exceptions=True) as client:
+        job = wait_for_job(client, post_review_request(client)["job_id"], "failed")
+
+    assert attempts == [5]
+    assert job["error"] == "RuntimeError: invalid claude review output for PR #5"
+
+
+def test_work_list_and_detail_routes(monkeypatch, joan_config, phil_config) -> None:
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app)
+
+    job_ids = []
+    for number in (5, 6):
+        payload = {
+            "action": "review_requested",
+            "pull_request": {"number": number},
+            "requested_reviewer": {"login": "phil"},
+            "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+        }
+        body = json.dumps(payload).encode()
+        resp = client.post(
+            "/webhook",
+            content=body,
+            headers={
+                "X-Gitea-Event": "pull_request",
+                "X-Gitea-Signature": sign_payload(body, "test-secret"),
+                "Content-Type": "application/json",
+            },
+        )
+        job_ids.append(resp.json()["job_id"])
+
+    listing = client.get("/work", params={"owner": "sam", "repo": "myrepo", "limit": 1})
+    assert listing.status_code == 200
+    data = listing.json()
+    assert [job["id"] for job in data["jobs"]] == [job_ids[1]]
+    assert data["next_cursor"] is not None
+
+    page_2 = client.get("/work", params={"owner": "sam", "repo": "myrepo", "limit": 1, "cursor": data["next_cursor"]})
+    assert [job["id"] for job in page_2.json()["jobs"]] == [job_ids[0]]
+
+    by_pr = client.get("/work", params={"owner": "sam", "repo": "myrepo", "pr": 6, "status": "pending"})
+    assert [job["pr_number"] for job in by_pr.json()["jobs"]] == [6]
+
+    detail = client.get(f"/work/{job_ids[0]}")
+    assert detail.status_code == 200
+    assert detail.json()["status"] == "pending"
+    assert detail.json()["prompt_ref"]
+
+    assert client.get("/work/job_missing").status_code == 404
+    assert client.get("/work", params={"pr": 6}).status_code == 400
+
+
+def test_pr_priority_uses_highest_matching_label() -> None:
+    pull_request = {"labels": [{"name": "priority/low"}, {"name": "bug"}, {"name": "priority/high"}]}
+    assert server_mod.pr_priority(pull_request, {"priority/high": 10, "priority/low": -10}) == 10
+    assert server_mod.pr_priority({}, {"priority/high": 10}) == 0
+
+
+def test_webhook_returns_503_with_retry_after_when_queue_full(monkeypatch, joan_config, phil_config) -> None:
+    fetched: list[int] = []
+
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, index, max_bytes=0):
+            fetched.append(index)
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    phil_config.queue.max_depth = 1
+    phil_config.queue.retry_after_seconds = 12
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app)
+
+    statuses = []
+    for number in (5, 6):
+        payload = {
+            "action": "review_requested",
+            "pull_request": {"number": number},
+            "requested_reviewer": {"login": "phil"},
+            "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+        }
+        body = json.dumps(payload).encode()
+        resp = client.post(
+            "/webhook",
+            content=body,
+            headers={
+                "X-Gitea-Event": "pull_request",
+                "X-Gitea-Signature": sign_payload(body, "test-secret"),
+                "Content-Type": "application/json",
+            },
+        )
+        statuses.append(resp.status_code)
+
+    assert statuses == [202, 503]
+    assert resp.headers["Retry-After"] == "12"
+    assert resp.json()["status"] == "rejected"
+    assert fetched == [5]
+
+    health = client.get("/health").json()
+    assert health["rejected"] == 1
+    assert health["queue_depth"] == 1
+
+
+def test_webhook_splits_large_diff_into_chunk_jobs(monkeypatch, joan_config, phil_config) -> None:
+    big_diff = "".join(
+        f"diff --git a/src/f{index}.py b/src/f{index}.py\n--- a/src/f{index}.py\n+++ b/src/f{index}.py\n"
+        f"@@ -0,0 +1 @@\n+{'x' * 400}\n"
+        for index in range(3)
+    ) + "diff --git a/uv.lock b/uv.lock\n--- a/uv.lock\n+++ b/uv.lock\n@@ -1 +1 @@\n-a\n+b\n"
+
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            return [big_diff]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    phil_config.review.max_chunk_tokens = 150
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app)
 
     payload = {
         "action": "review_requested",
@@ -248,16 +538,450 @@ def test_webhook_falls_back_to_direct_review_when_worker_mode_disabled(monkeypat
         "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
     }
     body = json.dumps(payload).encode()
-    sig = sign_payload(body, "test-secret")
-
     resp = client.post(
         "/webhook",
         content=body,
         headers={
             "X-Gitea-Event": "pull_request",
-            "X-Gitea-Signature": sig,
+            "X-Gitea-Signature": sign_payload(body, "test-secret"),
             "Content-Type": "application/json",
         },
     )
     assert resp.status_code == 202
-    assert called == [("sam", "myrepo", 5)]
+    assert len(resp.json()["job_ids"]) == 3
+
+    claim = client.post("/work/claim").json()
+    assert claim["kind"] == "pr_review_chunk"
+    assert "part 1 of 3" in claim["prompt"]
+    assert "uv.lock" in claim["prompt"]
+    assert "+b" not in claim["prompt"]
+
+
+def test_run_review_fans_out_chunks_and_posts_one_merged_review(monkeypatch, joan_config, phil_config) -> None:
+    diff = "".join(
+        f"diff --git a/src/f{index}.py b/src/f{index}.py\n--- a/src/f{index}.py\n+++ b/src/f{index}.py\n"
+        f"@@ -0,0 +1 @@\n+{'x' * 400}\n"
+        for index in range(2)
+    )
+    posted: list[dict] = []
+
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            return [diff]
+
+        def create_review(self, **kwargs):
+            posted.append(kwargs)
+            return {}
+
+    def fake_run_claude_review(chunk, _system_prompt, _model, part=None, **_kwargs):
+        assert part is not None and part[1] == 2
+        path = "src/f0.py" if "f0.py" in chunk else "src/f1.py"
+        verdict = "request_changes" if part[0] == 2 else "approve"
+        return json.dumps(
+            {"body": f"part {part[0]}", "verdict": verdict, "comments": [{"path": path, "new_position": 1, "body": "nit"}]}
+        )
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    monkeypatch.setattr(server_mod, "run_claude_review", fake_run_claude_review)
+    phil_config.review.max_chunk_tokens = 150
+
+    server_mod.run_review(joan_config, phil_config, "sam", "myrepo", 5)
+
+    assert len(posted) == 1
+    assert posted[0]["verdict"] == "request_changes"
+    assert sorted(comment["path"] for comment in posted[0]["comments"]) == ["src/f0.py", "src/f1.py"]
+    assert "**Part 1:** part 1" in posted[0]["body"]
+
+
+def test_rereview_sends_only_delta_and_open_comments(monkeypatch, tmp_path, joan_config, phil_config) -> None:
+    calls: list[str] = []
+
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            calls.append("full")
+            return ["diff --git a/full.py b/full.py\n+full"]
+
+        def stream_compare_diff(self, _owner, _repo, base_sha, head_sha, max_bytes=0):
+            calls.append(f"compare {base_sha}...{head_sha}")
+            return ["diff --git a/delta.py b/delta.py\n+delta"]
+
+        def fetch_comments(self, _owner, _repo, _index):
+            return parse_comments(
+                [
+                    {"id": 1, "body": "Handle None here.", "path": "full.py", "line": 3, "user": {"login": "phil"}},
+                    {"id": 2, "body": "Fixed typo.", "path": "full.py", "resolved": True, "user": {"login": "phil"}},
+                    {"id": 3, "body": "Thanks!", "user": {"login": "sam"}},
+                ]
+            )
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True, state_dir=tmp_path)
+    client = TestClient(app, raise_server_exceptions=True)
+
+    def request_review(head_sha: str) -> dict:
+        payload = {
+            "action": "review_requested",
+            "pull_request": {"number": 5, "head": {"sha": head_sha}},
+            "requested_reviewer": {"login": "phil"},
+            "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+        }
+        body = json.dumps(payload).encode()
+        resp = client.post(
+            "/webhook",
+            content=body,
+            headers={
+                "X-Gitea-Event": "pull_request",
+                "X-Gitea-Signature": sign_payload(body, "test-secret"),
+                "Content-Type": "application/json",
+            },
+        )
+        assert resp.status_code == 202
+        claim = client.post("/work/claim").json()
+        assert client.post(f"/work/{claim['id']}/complete", json={"transcript": "ok"}).status_code == 200
+        return claim
+
+    first = request_review("aaa111")
+    assert "+full" in first["prompt"]
+    assert (tmp_path / "reviews.json").exists()
+
+    second = request_review("bbb222")
+    assert calls == ["full", "compare aaa111...bbb222"]
+    assert "+delta" in second["prompt"]
+    assert "+full" not in second["prompt"]
+    assert "already reviewed this PR at commit aaa111" in second["prompt"]
+    assert "full.py:3: Handle None here." in second["prompt"]
+    assert "Fixed typo." not in second["prompt"]
+    assert "Thanks!" not in second["prompt"]
+
+
+def test_rereview_falls_back_to_full_diff_when_compare_fails(monkeypatch, joan_config, phil_config) -> None:
+    class FakeForgejoClient:
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            return ["diff --git a/full.py b/full.py\n+full"]
+
+        def stream_compare_diff(self, _owner, _repo, _base_sha, _head_sha, max_bytes=0):
+            raise server_mod.ForgejoError("Forgejo API 404: not found")
+
+    review_input = server_mod.fetch_review_input(FakeForgejoClient(), "phil", "sam", "myrepo", 5, "new", since_sha="gone")
+    assert review_input.since_sha is None
+    assert "+full" in review_input.diff
+
+
+def test_duplicate_review_request_reuses_cached_diff(monkeypatch, tmp_path, joan_config, phil_config) -> None:
+    downloads: list[int] = []
+
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, index, max_bytes=0):
+            downloads.append(index)
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True, state_dir=tmp_path)
+    client = TestClient(app, raise_server_exceptions=True)
+
+    payload = {
+        "action": "review_requested",
+        "pull_request": {"number": 5, "base": {"sha": "base1"}, "head": {"sha": "head1"}},
+        "requested_reviewer": {"login": "phil"},
+        "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+    }
+    body = json.dumps(payload).encode()
+    headers = {
+        "X-Gitea-Event": "pull_request",
+        "X-Gitea-Signature": sign_payload(body, "test-secret"),
+        "Content-Type": "application/json",
+    }
+    for _ in range(2):
+        assert client.post("/webhook", content=body, headers=headers).status_code == 202
+
+    assert downloads == [5]
+    prompts = [client.post("/work/claim").json()["prompt"] for _ in range(2)]
+    assert all("+new" in prompt for prompt in prompts)
+
+
+def test_concurrent_webhooks_for_one_range_share_a_diff_download(monkeypatch, joan_config, phil_config) -> None:
+    downloads: list[int] = []
+    started = threading.Event()
+    release = threading.Event()
+
+    class SlowForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, index, max_bytes=0):
+            downloads.append(index)
+            started.set()
+            release.wait(5)
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", SlowForgejoClient)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    payload = {
+        "action": "review_requested",
+        "pull_request": {"number": 5, "base": {"sha": "base1"}, "head": {"sha": "head1"}},
+        "requested_reviewer": {"login": "phil"},
+        "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+    }
+    body = json.dumps(payload).encode()
+    headers = {"X-Gitea-Event": "pull_request", "X-Gitea-Signature": sign_payload(body, "test-secret")}
+
+    async def scenario() -> list[int]:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://phil") as client:
+            requests = [asyncio.create_task(client.post("/webhook", content=body, headers=headers)) for _ in range(2)]
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.2)
+            release.set()
+            return [response.status_code for response in await asyncio.gather(*requests)]
+
+    assert asyncio.run(scenario()) == [202, 202]
+    assert downloads == [5]
+
+
+def test_webhook_rejects_diff_over_byte_cap(monkeypatch, joan_config, phil_config) -> None:
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            assert max_bytes == 10
+            raise server_mod.DiffTooLargeError("diff is over the 10 byte limit")
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    phil_config.review.max_diff_bytes = 10
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app, raise_server_exceptions=True)
+
+    payload = {
+        "action": "review_requested",
+        "pull_request": {"number": 5},
+        "requested_reviewer": {"login": "phil"},
+        "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+    }
+    body = json.dumps(payload).encode()
+    resp = client.post(
+        "/webhook",
+        content=body,
+        headers={
+            "X-Gitea-Event": "pull_request",
+            "X-Gitea-Signature": sign_payload(body, "test-secret"),
+            "Content-Type": "application/json",
+        },
+    )
+
+    assert resp.status_code == 413
+    assert resp.json()["reason"] == "diff_too_large"
+    assert client.post("/work/claim").status_code == 204
+
+
+def test_webhook_answers_repeated_delivery_without_refetching(monkeypatch, joan_config, phil_config) -> None:
+    downloads: list[int] = []
+
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, index, max_bytes=0):
+            downloads.append(index)
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    phil_config.queue.max_depth = 1
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app, raise_server_exceptions=True)
+
+    def deliver(delivery_id: str, pr_number: int, signature: str | None = None):
+        payload = {
+            "action": "review_requested",
+            "pull_request": {"number": pr_number},
+            "requested_reviewer": {"login": "phil"},
+            "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+        }
+        body = json.dumps(payload).encode()
+        return client.post(
+            "/webhook",
+            content=body,
+            headers={
+                "X-Gitea-Event": "pull_request",
+                "X-Gitea-Delivery": delivery_id,
+                "X-Gitea-Signature": signature or sign_payload(body, "test-secret"),
+                "Content-Type": "application/json",
+            },
+        )
+
+    assert deliver("d1", 5).status_code == 202
+    duplicate = deliver("d1", 5)
+    assert duplicate.status_code == 200
+    assert duplicate.json() == {"status": "duplicate"}
+
+    # Rejected deliveries are not remembered, so Forgejo's retry goes through.
+    assert deliver("d2", 6, signature="sha256=bad").status_code == 403
+    assert deliver("d2", 6).status_code == 503
+    client.post("/work/claim")
+    assert deliver("d2", 6).status_code == 202
+
+    assert downloads == [5, 6]
+
+
+def test_webhook_uses_repo_registry_credentials_and_policy(monkeypatch, joan_config, phil_config) -> None:
+    tokens: list[tuple[str, str]] = []
+
+    class FakeForgejoClient:
+        def __init__(self, _url, token=None, http=None):
+            self.token = token
+
+        def stream_pr_diff(self, owner, repo, _index, max_bytes=0):
+            tokens.append((f"{owner}/{repo}", self.token))
+            return ["diff --git a/snap.snap b/snap.snap\n@@ -0,0 +1 @@\n+x\n"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    phil_config.server.allow_unlisted_repos = False
+    phil_config.repos = {"team/api": AgentRepoConfig(token="api-tok", skip_globs=["*.snap"])}
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app, raise_server_exceptions=True)
+
+    def deliver(owner: str, repo: str):
+        payload = {
+            "action": "review_requested",
+            "pull_request": {"number": 5},
+            "requested_reviewer": {"login": "phil"},
+            "repository": {"owner": {"login": owner}, "name": repo},
+        }
+        body = json.dumps(payload).encode()
+        return client.post(
+            "/webhook",
+            content=body,
+            headers={
+                "X-Gitea-Event": "pull_request",
+                "X-Gitea-Signature": sign_payload(body, "test-secret"),
+                "Content-Type": "application/json",
+            },
+        )
+
+    ignored = deliver("sam", "other")
+    assert ignored.status_code == 200
+    assert ignored.json()["status"] == "ignored"
+
+    assert deliver("team", "api").status_code == 202
+    assert tokens == [("team/api", "api-tok")]
+    claim = client.post("/work/claim").json()
+    assert claim["context"]["repo"] == "api"
+    assert "snap.snap" in claim["prompt"]
+    assert "+x" not in claim["prompt"]
+
+
+def test_registered_workers_claim_only_jobs_they_can_serve(monkeypatch, joan_config, phil_config) -> None:
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    phil_config.worker.registration_token = "join-me"
+    phil_config.repos = {"team/api": AgentRepoConfig(agent="claude")}
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app)
+
+    for owner, repo in (("team", "api"), ("sam", "myrepo")):
+        payload = {
+            "action": "review_requested",
+            "pull_request": {"number": 5},
+            "requested_reviewer": {"login": "phil"},
+            "repository": {"owner": {"login": owner}, "name": repo},
+        }
+        body = json.dumps(payload).encode()
+        client.post(
+            "/webhook",
+            content=body,
+            headers={
+                "X-Gitea-Event": "pull_request",
+                "X-Gitea-Signature": sign_payload(body, "test-secret"),
+                "Content-Type": "application/json",
+            },
+        )
+
+    assert client.post("/workers/register", json={"name": "x"}).status_code == 401
+    assert client.post("/work/claim").status_code == 401
+    assert client.post("/work/claim", headers={"Authorization": "Bearer stale"}).status_code == 401
+
+    def register(name: str, agent: str) -> dict[str, str]:
+        resp = client.post(
+            "/workers/register",
+            json={"name": name, "agent": agent, "repos": []},
+            headers={"Authorization": "Bearer join-me"},
+        )
+        assert resp.status_code == 200
+        return {"Authorization": f"Bearer {resp.json()['token']}"}
+
+    codex = register("box-1", "codex")
+    claude = register("box-2", "claude")
+
+    codex_claim = client.post("/work/claim", headers=codex).json()
+    assert codex_claim["context"]["repo"] == "myrepo"
+    assert client.post("/work/claim", headers=codex).status_code == 204
+    claude_claim = client.post("/work/claim", headers=claude).json()
+    assert claude_claim["context"]["repo"] == "api"
+
+    stolen = client.post(f"/work/{codex_claim['id']}/complete", json={"transcript": "x"}, headers=claude)
+    assert stolen.status_code == 409
+    done = client.post(f"/work/{codex_claim['id']}/complete", json={"transcript": "x"}, headers=codex)
+    assert done.status_code == 200
+
+    for path in ("/work", f"/work/{codex_claim['id']}", "/workers"):
+        assert client.get(path).status_code == 401
+        assert client.get(path, headers={"Authorization": "Bearer stale"}).status_code == 401
+        assert client.get(path, headers=codex).status_code == 200
+    assert client.get(f"/work/{codex_claim['id']}", headers=codex).json()["transcript"] == "x"
+
+    workers = client.get("/workers", headers={"Authorization": "Bearer join-me"}).json()["workers"]
+    assert [(worker["name"], worker["claims"]) for worker in workers] == [("box-1", 1), ("box-2", 1)]
+
+
+def test_work_release_returns_job_to_pending_with_partial_transcript(monkeypatch, joan_config, phil_config) -> None:
+    class FakeForgejoClient:
+        def __init__(self, _url, _token=None, http=None):
+            pass
+
+        def stream_pr_diff(self, _owner, _repo, _index, max_bytes=0):
+            return ["diff --git a/foo.py b/foo.py\n+new"]
+
+    monkeypatch.setattr(server_mod, "ForgejoClient", FakeForgejoClient)
+    app = server_mod.create_app(joan_config, phil_config, worker_mode=True)
+    client = TestClient(app)
+    payload = {
+        "action": "review_requested",
+        "pull_request": {"number": 5},
+        "requested_reviewer": {"login": "phil"},
+        "repository": {"owner": {"login": "sam"}, "name": "myrepo"},
+    }
+    body = json.dumps(payload).encode()
+    client.post(
+        "/webhook",
+        content=body,
+        headers={
+            "X-Gitea-Event": "pull_request",
+            "X-Gitea-Signature": sign_payload(body, "test-secret"),
+            "Content-Type": "application/json",
+        },
+    )
+    job_id = client.post("/work/claim").json()["id"]
+
+    resp = client.post(f"/work/{job_id}/release", json={"transcript": "half a review", "reason": "worker shutting down"})
+    assert resp.status_code == 200
+    detail = client.get(f"/work/{job_id}").json()
+    assert detail["status"] == "pending"
+    assert detail["transcript"] == "half a review"
+    assert detail["error"] == "worker shutting down"
+    assert client.post(f"/work/{job_id}/release", json={}).status_code == 409
+    assert client.post("/work/claim").json()["id"] == job_id
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from joan.phil.prompt_store import PromptStore
+from joan.phil.scheduling import FairShareScheduler, JobRanker
+from joan.phil.work_queue import QueueFullError, ReviewWorkQueue
+
+
+def test_list_jobs_pages_newest_first_with_cursor() -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue()
+        jobs = [await queue.enqueue_pr_review("sam", "joan", number, f"prompt {number}") for number in range(5)]
+
+        first, cursor = await queue.list_jobs(limit=2)
+        assert [item["id"] for item in first] == [jobs[4].id, jobs[3].id]
+        assert cursor is not None
+        assert "prompt" not in first[0]
+
+        second, cursor = await queue.list_jobs(limit=2, cursor=cursor)
+        assert [item["id"] for item in second] == [jobs[2].id, jobs[1].id]
+
+        third, cursor = await queue.list_jobs(limit=2, cursor=cursor)
+        assert [item["id"] for item in third] == [jobs[0].id]
+        assert cursor is None
+
+    asyncio.run(scenario())
+
+
+def test_list_jobs_filters_by_status_repo_and_pr() -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue()
+        first = await queue.enqueue_pr_review("sam", "joan", 1, "a")
+        second = await queue.enqueue_pr_review("sam", "other", 1, "b")
+        third = await queue.enqueue_pr_review("sam", "joan", 2, "c")
+
+        claimed = await queue.claim_next()
+        assert claimed is not None and claimed.id == first.id
+        await queue.complete(first.id, "done")
+
+        completed, _ = await queue.list_jobs(status="completed")
+        assert [item["id"] for item in completed] == [first.id]
+
+        pending, _ = await queue.list_jobs(status="pending")
+        assert [item["id"] for item in pending] == [third.id, second.id]
+
+        by_repo, _ = await queue.list_jobs(owner="sam", repo="joan")
+        assert [item["id"] for item in by_repo] == [third.id, first.id]
+
+        by_pr, _ = await queue.list_jobs(owner="sam", repo="joan", pr_number=1, status="completed")
+        assert [item["id"] for item in by_pr] == [first.id]
+
+        stats = await queue.stats()
+        assert stats["queue_depth"] == 2
+        assert stats["claimed"] == 0
+        assert stats["failed"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_list_jobs_rejects_bad_filters() -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue()
+        with pytest.raises(ValueError, match="unknown status"):
+            await queue.list_jobs(status="bogus")
+        with pytest.raises(ValueError, match="requires owner and repo"):
+            await queue.list_jobs(pr_number=3)
+        with pytest.raises(ValueError, match="invalid cursor"):
+            await queue.list_jobs(cursor="nope")
+
+    asyncio.run(scenario())
+
+
+def test_prompts_are_stored_on_disk_and_removed_when_done(tmp_path) -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path))
+        job = await queue.enqueue_pr_review("sam", "joan", 1, "review this diff")
+        assert (tmp_path / job.prompt_ref).read_text(encoding="utf-8") == "review this diff"
+
+        claimed = await queue.claim_next()
+        assert queue.serialize_claim(claimed)["prompt"] == "review this diff"
+        await queue.complete(job.id, "done")
+        assert not (tmp_path / job.prompt_ref).exists()
+
+    asyncio.run(scenario())
+
+
+def test_enqueue_rejects_beyond_depth_and_byte_limits(tmp_path) -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path), max_depth=1, retry_after_seconds=7)
+        await queue.enqueue_pr_review("sam", "joan", 1, "a")
+        with pytest.raises(QueueFullError) as excinfo:
+            await queue.enqueue_pr_review("sam", "joan", 2, "b")
+        assert excinfo.value.retry_after_seconds == 7
+        assert "depth" in excinfo.value.reason
+
+        sized = ReviewWorkQueue(prompts=PromptStore(tmp_path / "sized"), max_prompt_bytes=10)
+        await sized.enqueue_pr_review("sam", "joan", 1, "12345")
+        with pytest.raises(QueueFullError, match="byte limit"):
+            await sized.enqueue_pr_review("sam", "joan", 2, "1234567")
+        stats = await sized.stats()
+        assert stats["rejected"] == 1
+        assert stats["queued_prompt_bytes"] == 5
+
+    asyncio.run(scenario())
+
+
+def test_shed_policy_drops_oldest_superseded_job(tmp_path) -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path), max_depth=2, overflow="shed")
+        stale = await queue.enqueue_pr_review("sam", "joan", 1, "old diff")
+        other = await queue.enqueue_pr_review("sam", "joan", 2, "other diff")
+
+        fresh = await queue.enqueue_pr_review("sam", "joan", 1, "new diff")
+
+        assert queue.snapshot(stale.id)["status"] == "superseded"
+        assert not (tmp_path / stale.prompt_ref).exists()
+        claimed = [await queue.claim_next(), await queue.claim_next()]
+        assert [job.id for job in claimed] == [other.id, fresh.id]
+        assert await queue.claim_next() is None
+
+        with pytest.raises(QueueFullError):
+            await queue.enqueue_pr_review("sam", "joan", 3, "x")
+            await queue.enqueue_pr_review("sam", "joan", 4, "y")
+            await queue.enqueue_pr_review("sam", "joan", 5, "z")
+        stats = await queue.stats()
+        assert stats["shed"] == 1
+        assert stats["rejected"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_shed_policy_keeps_review_group_chunks_together(tmp_path) -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path), max_depth=4, overflow="shed")
+        chunks = await queue.enqueue_review_group("sam", "joan", 1, ["a", "b", "c"], "summarize")
+        await queue.enqueue_pr_review("sam", "joan", 2, "other")
+
+        # Sibling chunks do not supersede each other, so nothing can be shed.
+        with pytest.raises(QueueFullError):
+            await queue.enqueue_pr_review("sam", "joan", 3, "new")
+        assert {queue.snapshot(job.id)["status"] for job in chunks} == {"pending"}
+
+        # A newer request for the same PR replaces the whole group, summary included.
+        fresh = await queue.enqueue_review_group("sam", "joan", 1, ["d", "e"], "summarize again")
+        assert {queue.snapshot(job.id)["status"] for job in chunks} == {"superseded"}
+        assert not (tmp_path / f"{chunks[0].group_id}_summary").exists()
+        assert set(queue._groups) == {fresh[0].group_id}
+
+    asyncio.run(scenario())
+
+
+def test_shed_policy_keeps_a_group_that_has_started(tmp_path) -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path), max_depth=3, overflow="shed")
+        chunks = await queue.enqueue_review_group("sam", "joan", 1, ["a", "b", "c"], "summarize")
+        await queue.claim_next()
+        await queue.enqueue_pr_review("sam", "joan", 2, "other")
+
+        with pytest.raises(QueueFullError):
+            await queue.enqueue_pr_review("sam", "joan", 1, "new")
+        assert [queue.snapshot(job.id)["status"] for job in chunks[1:]] == ["pending", "pending"]
+
+    asyncio.run(scenario())
+
+
+def test_review_group_queues_summary_after_all_chunks_finish(tmp_path) -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path))
+        chunks = await queue.enqueue_review_group("sam", "joan", 9, ["part one", "part two"], "summarize")
+        assert [job.kind for job in chunks] == ["pr_review_chunk", "pr_review_chunk"]
+
+        first = await queue.claim_next()
+        second = await queue.claim_next()
+        assert await queue.claim_next() is None
+
+        await queue.complete(first.id, "done")
+        assert await queue.claim_next() is None
+        await queue.fail(second.id, "boom")
+
+        summary = await queue.claim_next()
+        assert summary is not None
+        assert summary.kind == "pr_review_summary"
+        assert summary.group_id == chunks[0].group_id
+        assert queue.serialize_claim(summary)["prompt"] == "summarize"
+
+    asyncio.run(scenario())
+
+
+def test_claim_next_skips_jobs_the_worker_cannot_take(tmp_path) -> None:
+    async def scenario() -> None:
+        queue = ReviewWorkQueue(prompts=PromptStore(tmp_path))
+        first = await queue.enqueue_pr_review("sam", "joan", 1, "a")
+        other = await queue.enqueue_pr_review("sam", "other", 2, "b")
+        second = await queue.enqueue_pr_review("sam", "joan", 3, "c")
+
+        claimed = await queue.claim_next("worker_a", lambda job: job.repo == "other")
+        assert claimed is not None
+        assert claimed.id == other.id
+        assert claimed.worker_id == "worker_a"
+        assert await queue.claim_next("worker_a", lambda job: job.repo == "other") is None
+
+        with pytest.raises(PermissionError):
+            await queue.complete(other.id, "done", worker_id="worker_b")
+        await queue.complete(other.id, "done", worker_id="worker_a")
+
+        assert [(await queue.claim_next()).id for _ in range(2)] == [first.id, second.id]
+
+    asyncio.run(scenario())
+
+
+def test_fair_share_scheduler_caps_claims_per_repo(tmp_path) -> None:
+    async def scenario() -> None:
+        scheduler = FairShareScheduler(JobRanker(300.0, 0.0), max_concurrent_per_repo=1)
+        queue = ReviewWorkQueue(scheduler, prompts=PromptStore(tmp_path))
+        first = await queue.enqueue_pr_review("sam", "busy", 1, "a")
+        second = await queue.enqueue_pr_review("sam", "busy", 2, "b")
+        other = await queue.enqueue_pr_review("sam", "quiet", 3, "c")
+
+        assert queue._scheduler is scheduler
+        assert [(await queue.claim_next()).id for _ in range(2)] == [first.id, other.id]
+        # busy already has a job running, so its second job waits for that one to finish.
+        assert await queue.claim_next() is None
+
+        await queue.complete(first.id, "done")
+        claimed = await queue.claim_next()
+        assert claimed is not None
+        assert claimed.id == second.id
+
+    asyncio.run(scenario())
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import os
 import threading
+import time
+from contextlib import contextmanager
 
 import pytest
 
 from joan.phil import worker as worker_mod
+from joan.phil.limits import ResourceLimits
+from joan.shell.tracing import start_tracing, stop_tracing
 
 
 def test_pty_agent_runner_captures_transcript(tmp_path) -> None:
@@ -50,11 +55,11 @@ def test_run_worker_loop_completes_job(monkeypatch) -> None:
                 return None
             return job
 
-        def complete(self, job_id, transcript):
+        def complete(self, job_id, transcript, usage=None):
             calls.append((job_id, transcript))
             stop_event.set()
 
-        def fail(self, job_id, error, transcript=""):
+        def fail(self, job_id, error, transcript="", usage=None):
             raise AssertionError(f"unexpected fail {job_id} {error} {transcript}")
 
     class FakeRunner:
@@ -64,9 +69,16 @@ def test_run_worker_loop_completes_job(monkeypatch) -> None:
 
     monkeypatch.setattr(worker_mod, "WorkerClient", lambda _api_url: FakeClient())
 
-    worker_mod.run_worker_loop("http://127.0.0.1:9000", FakeRunner(), 0.01, stop_event)
+    tracer = start_tracing()
+    try:
+        worker_mod.run_worker_loop("http://127.0.0.1:9000", FakeRunner(), 0.01, stop_event)
+    finally:
+        stop_tracing()
 
     assert calls == [("job_1", "transcript")]
+    spans = {event["name"]: event["args"] for event in tracer.events}
+    assert spans["worker.job"] == {"job_id": "job_1", "repo": "sam/joan", "pr": 7}
+    assert "agent.run" in spans
 
 
 def test_run_worker_loop_reports_failures(monkeypatch) -> None:
@@ -85,10 +97,10 @@ def test_run_worker_loop_reports_failures(monkeypatch) -> None:
         def claim(self):
             return job
 
-        def complete(self, job_id, transcript):
+        def complete(self, job_id, transcript, usage=None):
             raise AssertionError(f"unexpected complete {job_id} {transcript}")
 
-        def fail(self, job_id, error, transcript=""):
+        def fail(self, job_id, error, transcript="", usage=None):
             failures.append((job_id, error, transcript))
             stop_event.set()
 
@@ -101,3 +113,208 @@ def test_run_worker_loop_reports_failures(monkeypatch) -> None:
     worker_mod.run_worker_loop("http://127.0.0.1:9000", FakeRunner(), 0.01, stop_event)
 
     assert failures == [("job_2", "boom", "partial")]
+
+
+def test_run_worker_loop_registers_again_after_token_is_refused(monkeypatch) -> None:
+    stop_event = threading.Event()
+    registrations: list[str] = []
+
+    class FakeClient:
+        def register(self, registration):
+            registrations.append(registration.token)
+            if len(registrations) == 2:
+                stop_event.set()
+            return "worker_1"
+
+        def claim(self):
+            raise worker_mod.WorkerUnauthorizedError("claim refused")
+
+    monkeypatch.setattr(worker_mod, "WorkerClient", lambda _api_url: FakeClient())
+    registration = worker_mod.WorkerRegistration(name="box-1", agent="codex", repos=[], token="join-me")
+
+    worker_mod.run_worker_loop("http://127.0.0.1:9000", object(), 0.01, stop_event, registration)
+
+    assert registrations == ["join-me", "join-me"]
+
+
+AGENT_REPL = 'n=0; printf "READY> "; while read line; do n=$((n+1)); echo "job$n:$line"; printf "READY> "; done'
+
+
+def test_pty_agent_session_reuses_one_process_across_jobs(tmp_path) -> None:
+    session = worker_mod.PTYAgentSession(
+        ["/bin/sh", "-c", AGENT_REPL], timeout_seconds=2.0, done_marker="READY> ", reset_input="/clear", workdir=tmp_path
+    )
+    session.start()
+    try:
+        assert session.run("first").strip() == "job1:first"
+        # The reset line is answered before the second prompt, so it counts as a job in the fake agent.
+        assert session.run("second").strip() == "job3:second"
+        assert session.jobs_run == 2
+        assert session.rss_bytes() > 0
+    finally:
+        session.close()
+    assert not session.alive()
+
+
+def test_agent_session_pool_recycles_after_max_jobs(tmp_path) -> None:
+    started: list[worker_mod.PTYAgentSession] = []
+
+    def factory() -> worker_mod.PTYAgentSession:
+        session = worker_mod.PTYAgentSession(["/bin/sh", "-c", AGENT_REPL], 2.0, "READY> ", workdir=tmp_path)
+        started.append(session)
+        return session
+
+    pool = worker_mod.AgentSessionPool(1, factory, max_jobs=2)
+    pool.start()
+    try:
+        outputs = [pool.run(f"p{index}").strip() for index in range(3)]
+    finally:
+        pool.close()
+
+    assert outputs == ["job1:p0", "job2:p1", "job1:p2"]
+    assert len(started) == 2
+    assert not started[0].alive()
+
+
+def test_agent_session_pool_replaces_session_after_failure(tmp_path) -> None:
+    script = 'printf "READY> "; read line; exit 3'
+    pool = worker_mod.AgentSessionPool(
+        1, lambda: worker_mod.PTYAgentSession(["/bin/sh", "-c", script], 2.0, "READY> ", workdir=tmp_path)
+    )
+    try:
+        for _ in range(2):
+            with pytest.raises(worker_mod.AgentRunError, match="exited with status 3"):
+                pool.run("review me")
+    finally:
+        pool.close()
+
+
+def test_agent_session_pool_close_terminates_a_session_that_is_still_warming(tmp_path) -> None:
+    started: list[worker_mod.PTYAgentSession] = []
+
+    def factory() -> worker_mod.PTYAgentSession:
+        session = worker_mod.PTYAgentSession(["/bin/sh", "-c", "sleep 30; printf 'READY> '"], 60.0, "READY> ")
+        started.append(session)
+        return session
+
+    pool = worker_mod.AgentSessionPool(1, factory)
+    pool.start()
+    deadline = time.monotonic() + 5
+    while not (started and started[0].alive()):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    began = time.monotonic()
+    pool.close()
+
+    assert time.monotonic() - began < 5
+    assert not started[0].alive()
+    with pytest.raises(worker_mod.AgentRunError, match="closed"):
+        pool.run("too late")
+    assert len(started) == 1
+
+
+def test_run_worker_loop_runs_agent_in_a_pooled_worktree(monkeypatch, tmp_path) -> None:
+    stop_event = threading.Event()
+    seen: list[tuple[object, object]] = []
+    job = worker_mod.WorkerJob(
+        id="job_3", kind="pr_review", prompt="review me", owner="sam", repo="joan", pr_number=9, head_sha="abc"
+    )
+
+    class FakeClient:
+        def claim(self):
+            return job
+
+        def complete(self, job_id, transcript, usage=None):
+            stop_event.set()
+
+    class FakeWorktrees:
+        def serves(self, owner, repo):
+            return (owner, repo) == ("sam", "joan")
+
+        @contextmanager
+        def checkout(self, pr_number, head_sha=""):
+            seen.append((pr_number, head_sha))
+            yield tmp_path
+
+    class FakeRunner:
+        def run(self, prompt, workdir=None):
+            seen.append(("workdir", workdir))
+            return "ok"
+
+    monkeypatch.setattr(worker_mod, "WorkerClient", lambda _api_url: FakeClient())
+
+    worker_mod.run_worker_loop("http://127.0.0.1:9000", FakeRunner(), 0.01, stop_event, worktrees=FakeWorktrees())
+
+    assert seen == [(9, "abc"), ("workdir", tmp_path)]
+
+
+def test_pty_agent_runner_applies_limits_and_records_usage(tmp_path) -> None:
+    runner = worker_mod.PTYAgentRunner(
+        ["/bin/sh", "-c", "read line; ulimit -n"],
+        timeout_seconds=2.0,
+        workdir=tmp_path,
+        limits=ResourceLimits(max_open_files=64),
+    )
+
+    transcript = runner.run("go")
+
+    assert transcript.strip().splitlines()[-1] == "64"
+    assert runner.last_usage is not None
+    assert runner.last_usage.peak_rss_bytes > 0
+    assert runner.last_usage.wall_seconds > 0
+
+
+def test_pty_agent_runner_cancel_stops_the_whole_process_group(tmp_path) -> None:
+    marker = tmp_path / "child.pid"
+    runner = worker_mod.PTYAgentRunner(
+        ["/bin/sh", "-c", f'sleep 30 & echo $! > {marker}; echo started; wait'],
+        timeout_seconds=10.0,
+        workdir=tmp_path,
+    )
+    cancel_event = threading.Event()
+    threading.Timer(0.3, cancel_event.set).start()
+
+    with pytest.raises(worker_mod.AgentCancelledError) as excinfo:
+        runner.run("go", cancel_event=cancel_event)
+
+    assert "started" in excinfo.value.transcript
+    child_pid = int(marker.read_text())
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and _pid_running(child_pid):
+        time.sleep(0.05)
+    assert not _pid_running(child_pid)
+
+
+def _pid_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_run_worker_loop_releases_job_when_cancelled(monkeypatch) -> None:
+    cancel_event = threading.Event()
+    released: list[tuple[str, str]] = []
+    job = worker_mod.WorkerJob(id="job_4", kind="pr_review", prompt="review me", owner="sam", repo="joan", pr_number=4)
+
+    class FakeClient:
+        def claim(self):
+            if released:
+                raise AssertionError("claimed again after cancel")
+            return job
+
+        def release(self, job_id, transcript=""):
+            released.append((job_id, transcript))
+
+    class FakeRunner:
+        def run(self, prompt, cancel_event=None):
+            cancel_event.set()
+            raise worker_mod.AgentCancelledError("agent run cancelled", "half a review")
+
+    monkeypatch.setattr(worker_mod, "WorkerClient", lambda _api_url: FakeClient())
+
+    worker_mod.run_worker_loop("http://127.0.0.1:9000", FakeRunner(), 0.01, cancel_event=cancel_event)
+
+    assert released == [("job_4", "half a review")]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from joan.phil.workers import WorkerRegistry
+
+
+def test_register_issues_token_that_authenticates_only_that_worker() -> None:
+    registry = WorkerRegistry()
+    record, token = registry.register("box-1", "codex", ["sam/joan"])
+    other, _ = registry.register("box-2", "claude", [])
+
+    assert registry.authenticate(token) is record
+    assert registry.authenticate("not-a-token") is None
+    assert token not in record.token_hash
+    assert [worker.id for worker in registry.list()] == [record.id, other.id]
+    assert "token_hash" not in record.summary()
+
+
+def test_worker_serves_listed_repos_and_required_agent() -> None:
+    registry = WorkerRegistry()
+    scoped, _ = registry.register("box-1", "codex", ["sam/joan"])
+    anywhere, _ = registry.register("box-2", "claude", [])
+
+    assert scoped.serves("sam", "joan")
+    assert not scoped.serves("sam", "other")
+    assert not scoped.serves("sam", "joan", required_agent="claude")
+    assert anywhere.serves("sam", "other", required_agent="claude")
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from joan.phil.worktrees import WorktreePool
+
+
+def git(cwd: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, text=True, capture_output=True).stdout.strip()
+
+
+@pytest.fixture
+def repo_with_pr(tmp_path, monkeypatch) -> tuple[Path, str]:
+    for key in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(key, "phil")
+    for key in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(key, "phil@example.com")
+    forge = tmp_path / "forge"
+    forge.mkdir()
+    git(forge, "init", "-q", "-b", "main")
+    (forge / "app.py").write_text("print('main')\n")
+    git(forge, "add", "app.py")
+    git(forge, "commit", "-q", "-m", "main")
+    git(forge, "checkout", "-q", "-b", "feature")
+    (forge / "app.py").write_text("print('feature')\n")
+    git(forge, "commit", "-q", "-am", "feature")
+    head = git(forge, "rev-parse", "HEAD")
+    git(forge, "update-ref", "refs/pull/7/head", head)
+    git(forge, "checkout", "-q", "main")
+
+    local = tmp_path / "local"
+    git(tmp_path, "clone", "-q", "-o", "joan-review", str(forge), str(local))
+    return local, head
+
+
+def test_checkout_moves_a_reused_worktree_to_the_pr_head(tmp_path, repo_with_pr) -> None:
+    local, head = repo_with_pr
+    pool = WorktreePool(local, tmp_path / "state" / "worktrees", 1, remote="joan-review")
+
+    with pool.checkout(7) as workdir:
+        assert git(workdir, "rev-parse", "HEAD") == head
+        assert (workdir / "app.py").read_text() == "print('feature')\n"
+        (workdir / "scratch.txt").write_text("left behind by the agent")
+        (workdir / "app.py").write_text("edited")
+
+    with pool.checkout(7, head) as again:
+        assert again == workdir
+        assert not (again / "scratch.txt").exists()
+        assert (again / "app.py").read_text() == "print('feature')\n"
+
+    assert git(local, "rev-parse", "refs/joan/phil/pr-7") == head
+    assert (local / "app.py").read_text() == "print('main')\n"
+
+
+def test_pool_only_serves_its_own_repository(tmp_path) -> None:
+    pool = WorktreePool(tmp_path, tmp_path / "worktrees", 1, remote="joan-review", repo="sam/joan")
+    assert pool.serves("sam", "joan")
+    assert not pool.serves("sam", "other")
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
 
 import httpx
 import pytest
 
-from joan.shell.forgejo_client import ForgejoClient, ForgejoError
+from joan.shell.forgejo_client import (
+    DiffTooLargeError,
+    ForgejoClient,
+    ForgejoError,
+    add_request_hook,
+    remove_request_hook,
+)
+from joan.shell.request_trace import RequestRecord
 
 
 @dataclass
@@ -259,6 +267,33 @@ def test_get_comments_includes_inline_review_comments(monkeypatch) -> None:
     ]
 
 
+def test_fetch_comments_decodes_fallback_and_review_comments(monkeypatch) -> None:
+    client = ForgejoClient("http://forgejo.local", "abc")
+    paths: list[str] = []
+    bodies = {
+        "/api/v1/repos/sam/joan/pulls/7/comments": [{"id": 1, "body": "top-level", "user": {"login": "r"}}],
+        "/api/v1/repos/sam/joan/pulls/7/reviews": [{"id": 4, "state": "COMMENT"}, {"id": 5, "state": "COMMENT"}],
+        "/api/v1/repos/sam/joan/pulls/7/reviews/4/comments": [{"id": 9, "path": "a.py", "line": 2}],
+        "/api/v1/repos/sam/joan/pulls/7/reviews/5/comments": [{"id": 1, "body": "duplicate top-level"}],
+    }
+
+    def fake_request_raw(method, path, **kwargs):
+        paths.append(path)
+        if path in bodies:
+            return make_response(200, json_data=bodies[path])
+        return make_response(404, "not found")
+
+    monkeypatch.setattr(client, "_request_raw", fake_request_raw)
+
+    comments = client.fetch_comments("sam", "joan", 7)
+
+    assert [(comment.id, comment.body, comment.author) for comment in comments] == [(1, "top-level", "r"), (9, "", "")]
+    assert comments[1].path == "a.py"
+    assert paths[0] == "/api/v1/repos/sam/joan/issues/7/comments"
+    assert [review.id for review in client.fetch_reviews("sam", "joan", 7)] == [4, 5]
+    assert len(paths) == 5  # the second reviews read is served from the short-lived memo
+
+
 def test_resolve_comment_primary_success(monkeypatch) -> None:
     client = ForgejoClient("http://forgejo.local", "abc")
 
@@ -382,6 +417,70 @@ def test_get_pr_diff_returns_text(monkeypatch) -> None:
     assert result == diff_text
 
 
+def test_get_compare_diff_uses_web_compare_route(monkeypatch) -> None:
+    calls: list[str] = []
+
+    def fake_request_raw(self, method, path, **kwargs):
+        calls.append(path)
+        return make_response(200, body="diff --git a/foo.py b/foo.py\n+delta")
+
+    monkeypatch.setattr(ForgejoClient, "_request_raw", fake_request_raw)
+    client = ForgejoClient("http://forgejo.local", "tok")
+    assert client.get_compare_diff("sam", "joan", "abc", "def").endswith("+delta")
+    assert calls == ["/sam/joan/compare/abc...def.diff"]
+
+
+def test_stream_pr_diff_yields_file_sections(monkeypatch) -> None:
+    body = b"diff --git a/a.py b/a.py\n+\xc3\xa9\ndiff --git a/b.py b/b.py\n+b"
+    paths: list[str] = []
+
+    @contextmanager
+    def fake_stream_raw(self, method, path, **kwargs):
+        paths.append(path)
+        # Split mid-line and inside a multi-byte character.
+        yield httpx.Response(200, content=iter([body[:27], body[27:40], body[40:]]))
+
+    monkeypatch.setattr(ForgejoClient, "_stream_raw", fake_stream_raw)
+    client = ForgejoClient("http://forgejo.local", "tok")
+
+    sections = list(client.stream_pr_diff("sam", "joan", 7))
+
+    assert paths == ["/api/v1/repos/sam/joan/pulls/7.diff"]
+    assert sections == ["diff --git a/a.py b/a.py\n+\u00e9\n", "diff --git a/b.py b/b.py\n+b"]
+
+
+def test_stream_pr_diff_aborts_past_byte_cap(monkeypatch) -> None:
+    served: list[int] = []
+
+    def chunks():
+        for index in range(100):
+            served.append(index)
+            yield b"+" * 99 + b"\n"
+
+    @contextmanager
+    def fake_stream_raw(self, method, path, **kwargs):
+        yield httpx.Response(200, content=chunks())
+
+    monkeypatch.setattr(ForgejoClient, "_stream_raw", fake_stream_raw)
+    client = ForgejoClient("http://forgejo.local", "tok")
+
+    with pytest.raises(DiffTooLargeError):
+        list(client.stream_pr_diff("sam", "joan", 7, max_bytes=250))
+    assert len(served) == 3
+
+
+def test_stream_pr_diff_rejects_declared_length_over_cap(monkeypatch) -> None:
+    @contextmanager
+    def fake_stream_raw(self, method, path, **kwargs):
+        yield httpx.Response(200, headers={"Content-Length": "5000"}, content=iter([b"x"]))
+
+    monkeypatch.setattr(ForgejoClient, "_stream_raw", fake_stream_raw)
+    client = ForgejoClient("http://forgejo.local", "tok")
+
+    with pytest.raises(DiffTooLargeError, match="5000 bytes"):
+        list(client.stream_pr_diff("sam", "joan", 7, max_bytes=100))
+
+
 def test_create_user_via_admin(monkeypatch) -> None:
     client = ForgejoClient("http://forgejo.local")
     calls: list[tuple[str, str, dict]] = []
@@ -511,7 +610,7 @@ def test_create_get_list_and_close_issue_endpoints(monkeypatch) -> None:
     assert calls[2] == (
         "GET",
         "/api/v1/repos/sam/joan/issues",
-        {"params": {"state": "all", "limit": "25"}},
+        {"params": {"state": "all", "page": "1", "limit": "50"}},
     )
     assert calls[3] == (
         "PATCH",
@@ -520,6 +619,45 @@ def test_create_get_list_and_close_issue_endpoints(monkeypatch) -> None:
     )
 
 
+def test_iter_pages_follows_pages_until_short_page_or_limit(monkeypatch) -> None:
+    client = ForgejoClient("http://forgejo.local", "tok")
+    issues = [{"number": n} for n in range(1, 121)]
+    calls: list[dict[str, str]] = []
+
+    def fake_request_json(method, path, **kwargs):
+        params = kwargs["params"]
+        calls.append(params)
+        size = min(int(params["limit"]), 50)
+        start = (int(params["page"]) - 1) * size
+        return issues[start : start + size]
+
+    monkeypatch.setattr(client, "_request_json", fake_request_json)
+
+    assert [len(page) for page in client.iter_pages("/api/v1/repos/sam/joan/issues")] == [50, 50, 20]
+    assert [call["page"] for call in calls] == ["1", "2", "3"]
+
+    calls.clear()
+    assert client.list_issues("sam", "joan", state="all", limit=80) == issues[:80]
+    assert calls == [
+        {"state": "all", "page": "1", "limit": "50"},
+        {"state": "all", "page": "2", "limit": "50"},
+    ]
+
+
+def test_iter_pages_stops_when_server_ignores_paging(monkeypatch) -> None:
+    client = ForgejoClient("http://forgejo.local", "tok")
+    calls: list[str] = []
+
+    def fake_request_json(method, path, **kwargs):
+        calls.append(kwargs["params"]["page"])
+        return [{"id": n} for n in range(80)]
+
+    monkeypatch.setattr(client, "_request_json", fake_request_json)
+
+    assert [len(page) for page in client.iter_pages("/api/v1/repos/sam/joan/issues")] == [80]
+    assert calls == ["1"]
+
+
 def test_add_issue_dependency_retries_payload_shapes(monkeypatch) -> None:
     calls: list[dict] = []
 
@@ -675,3 +813,155 @@ def test_raise_for_status_no_payload_omits_context() -> None:
     message = str(exc.value)
     assert "422" in message
     assert "request payload:" not in message
+
+
+def test_request_hooks_receive_templated_records(monkeypatch) -> None:
+    response = make_response(404, json_data={"message": "missing"})
+    monkeypatch.setattr(httpx, "Client", lambda *args, **kwargs: DummyCtxClient(response))
+    records: list[RequestRecord] = []
+    add_request_hook(records.append)
+    try:
+        client = ForgejoClient("http://forgejo.local", "abc")
+        client._request_raw("GET", "/api/v1/repos/sam/joan/issues/12/comments")
+    finally:
+        remove_request_hook(records.append)
+
+    assert len(records) == 1
+    assert records[0].method == "GET"
+    assert records[0].path == "/api/v1/repos/{owner}/{repo}/issues/{n}/comments"
+    assert records[0].status == 404
+    assert records[0].bytes == len(response.content)
+
+
+class SequenceClient:
+    def __init__(self, outcomes: list[object], calls: list[str]) -> None:
+        self._outcomes = outcomes
+        self._calls = calls
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def request(self, method, _url, **_kwargs):
+        self._calls.append(method)
+        outcome = self._outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def test_request_retries_gateway_errors_and_honours_retry_after(monkeypatch) -> None:
+    import joan.shell.forgejo_client as client_mod
+
+    outcomes: list[object] = [
+        httpx.ConnectError("refused"),
+        make_response(503, body="restarting"),
+        make_response(200, json_data={"ok": True}),
+    ]
+    outcomes[1].headers["Retry-After"] = "3"
+    calls: list[str] = []
+    slept: list[float] = []
+    records: list[RequestRecord] = []
+    monkeypatch.setattr(httpx, "Client", lambda *args, **kwargs: SequenceClient(outcomes, calls))
+    monkeypatch.setattr(client_mod, "_sleep", slept.append)
+    add_request_hook(records.append)
+    try:
+        client = ForgejoClient("http://forgejo.local", "abc")
+        assert client._request_json("GET", "/api/v1/repos/sam/joan/pulls/1") == {"ok": True}
+    finally:
+        remove_request_hook(records.append)
+
+    assert calls == ["GET", "GET", "GET"]
+    assert len(slept) == 2 and slept[1] >= 3.0
+    assert records[0].retries == 2
+
+
+def test_request_does_not_replay_non_idempotent_writes(monkeypatch) -> None:
+    import joan.shell.forgejo_client as client_mod
+
+    calls: list[str] = []
+    outcomes: list[object] = [make_response(502, body="bad gateway"), make_response(201, json_data={})]
+    monkeypatch.setattr(httpx, "Client", lambda *args, **kwargs: SequenceClient(outcomes, calls))
+    monkeypatch.setattr(client_mod, "_sleep", lambda _seconds: None)
+
+    client = ForgejoClient("http://forgejo.local", "abc")
+    with pytest.raises(ForgejoError, match="Forgejo API 502"):
+        client.create_issue_comment("sam", "joan", 1, "hello")
+
+    assert calls == ["POST"]
+
+
+def test_request_gives_up_after_max_retries(monkeypatch) -> None:
+    import joan.shell.forgejo_client as client_mod
+    from joan.core.models import HttpConfig
+
+    calls: list[str] = []
+    outcomes: list[object] = [make_response(429, body="slow down") for _ in range(3)]
+    monkeypatch.setattr(httpx, "Client", lambda *args, **kwargs: SequenceClient(outcomes, calls))
+    monkeypatch.setattr(client_mod, "_sleep", lambda _seconds: None)
+
+    client = ForgejoClient("http://forgejo.local", "abc", http=HttpConfig(max_retries=1))
+    with pytest.raises(ForgejoError, match="Forgejo API 429"):
+        client.create_issue_comment("sam", "joan", 1, "hello")
+
+    assert calls == ["POST", "POST"]
+
+
+def test_get_results_are_reused_until_a_write(monkeypatch) -> None:
+    calls: list[str] = []
+    outcomes: list[object] = [
+        make_response(200, json_data=[{"id": 1}]),
+        make_response(201, json_data={"id": 2}),
+        make_response(200, json_data=[{"id": 1}, {"id": 2}]),
+    ]
+    monkeypatch.setattr(httpx, "Client", lambda *args, **kwargs: SequenceClient(outcomes, calls))
+    client = ForgejoClient("http://forgejo.local", "abc")
+
+    first = client.list_issue_comments("sam", "joan", 1)
+    first[0]["id"] = 99
+    assert client.list_issue_comments("sam", "joan", 1) == [{"id": 1}]
+    client.create_issue_comment("sam", "joan", 1, "hello")
+    assert client.list_issue_comments("sam", "joan", 1) == [{"id": 1}, {"id": 2}]
+    assert calls == ["GET", "POST", "GET"]
+
+
+def test_repeat_reads_revalidate_with_etag(monkeypatch) -> None:
+    client = ForgejoClient("http://forgejo.local", "abc")
+    calls: list[dict] = []
+
+    def fake_request_raw(method, path, **kwargs):
+        calls.append(kwargs)
+        if kwargs.get("headers", {}).get("If-None-Match") == '"v1"':
+            return httpx.Response(304, request=httpx.Request("GET", "http://forgejo.local/api"))
+        return httpx.Response(
+            200, request=httpx.Request("GET", "http://forgejo.local/api"), json=[{"id": 1}], headers={"ETag": '"v1"'}
+        )
+
+    monkeypatch.setattr(client, "_request_raw", fake_request_raw)
+
+    assert client.list_issue_comments("sam", "joan", 1) == [{"id": 1}]
+    client.clear_cache()
+    assert client.list_issue_comments("sam", "joan", 1) == [{"id": 1}]
+    assert calls == [{}, {"headers": {"If-None-Match": '"v1"'}}]
+
+
+def test_session_reuses_one_http_client(monkeypatch) -> None:
+    created: list[SequenceClient] = []
+    calls: list[str] = []
+    outcomes: list[object] = [make_response(200, json_data={"n": 1}), make_response(200, json_data={"n": 2})]
+
+    def fake_client(*_args, **_kwargs):
+        created.append(SequenceClient(outcomes, calls))
+        return created[-1]
+
+    monkeypatch.setattr(httpx, "Client", fake_client)
+    client = ForgejoClient("http://forgejo.local", "abc")
+
+    with client.session():
+        client.get_issue("sam", "joan", 1)
+        client.get_issue("sam", "joan", 2)
+
+    assert len(created) == 1
+    assert calls == ["GET", "GET"]
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import httpx
+
+from joan.shell.rate_limit import TokenBucket, backoff_delay, retry_after_seconds, should_retry
+
+
+def test_token_bucket_allows_burst_then_spaces_requests() -> None:
+    now = [0.0]
+    slept: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        slept.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, burst=2, clock=lambda: now[0], sleep=sleep)
+
+    assert [bucket.acquire() for _ in range(4)] == [0.0, 0.0, 0.5, 0.5]
+    assert slept == [0.5, 0.5]
+
+
+def test_should_retry_only_replays_idempotent_methods_after_gateway_errors() -> None:
+    assert should_retry("GET", 502)
+    assert should_retry("POST", 429)
+    assert not should_retry("POST", 503)
+    assert not should_retry("GET", 500)
+    assert should_retry("POST", None, httpx.ConnectError("refused"))
+    assert not should_retry("PATCH", None, httpx.ReadError("reset"))
+    assert should_retry("GET", None, httpx.ReadError("reset"))
+
+
+def test_retry_after_accepts_seconds_and_http_dates() -> None:
+    now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=UTC)
+
+    assert retry_after_seconds("7") == 7.0
+    assert retry_after_seconds("Thu, 01 Jan 2026 12:00:30 GMT", now=now) == 30.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+
+
+def test_backoff_delay_is_jittered_and_respects_retry_after() -> None:
+    assert backoff_delay(3, 0.5, rng=lambda low, high: high) == 2.0
+    assert backoff_delay(1, 0.5, rng=lambda low, high: low) == 0.0
+    assert backoff_delay(1, 0.5, retry_after=4.0, rng=lambda low, high: high) == 4.0
+    assert backoff_delay(30, 0.5, rng=lambda low, high: high) == 60.0
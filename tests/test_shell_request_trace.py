@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import io
+import json
+from pathlib import Path
+
+from joan.shell.request_trace import RequestRecord, RequestTrace, template_path
+
+
+def test_template_path_groups_by_endpoint() -> None:
+    assert template_path("/api/v1/repos/sam/joan/pulls/7.diff") == "/api/v1/repos/{owner}/{repo}/pulls/{n}.diff"
+    assert template_path("/api/v1/repos/sam/joan/issues?state=open") == "/api/v1/repos/{owner}/{repo}/issues"
+    assert template_path("/api/v1/repos/sam/joan/pulls/7/reviews/31/comments") == (
+        "/api/v1/repos/{owner}/{repo}/pulls/{n}/reviews/{n}/comments"
+    )
+    assert template_path("/sam/joan/compare/abc...def.diff") == "/{owner}/{repo}/compare/{range}.diff"
+    assert template_path("/api/v1/user") == "/api/v1/user"
+
+
+def test_request_trace_summarizes_and_writes_json_lines(tmp_path: Path) -> None:
+    jsonl = tmp_path / "trace.jsonl"
+    trace = RequestTrace(jsonl_path=jsonl)
+    trace(RequestRecord("GET", "/api/v1/repos/{owner}/{repo}/issues/{n}/dependencies", 200, 2, 5.0))
+    trace(RequestRecord("GET", "/api/v1/repos/{owner}/{repo}/issues/{n}/dependencies", 404, 10, 7.0))
+    trace(RequestRecord("GET", "/api/v1/repos/{owner}/{repo}/issues", 200, 100, 20.0))
+
+    rows = trace.summary_rows()
+    assert rows[0]["path"] == "/api/v1/repos/{owner}/{repo}/issues/{n}/dependencies"
+    assert rows[0]["count"] == 2
+    assert rows[0]["errors"] == 1
+    assert rows[0]["bytes"] == 12
+    assert rows[0]["max_ms"] == 7.0
+
+    lines = [json.loads(line) for line in jsonl.read_text(encoding="utf-8").splitlines()]
+    assert [line["status"] for line in lines] == [200, 404, 200]
+
+    output = io.StringIO()
+    trace.write_summary(output)
+    assert output.getvalue().splitlines()[-1].split()[:2] == ["total", "3"]
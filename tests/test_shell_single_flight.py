@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from joan.shell.single_flight import SingleFlight, TTLMemo
+
+
+def test_single_flight_shares_one_call_between_concurrent_callers() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+    release = threading.Event()
+    started = threading.Event()
+    calls: list[str] = []
+    results: list[tuple[str, bool]] = []
+
+    def slow() -> str:
+        calls.append("fetch")
+        started.set()
+        release.wait(5)
+        return "body"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", slow)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do("key", slow)))
+    follower.start()
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert calls == ["fetch"]
+    assert sorted(results) == [("body", False), ("body", True)]
+    assert flight.do("key", lambda: "again") == ("again", False)
+
+
+def test_single_flight_propagates_the_leader_error() -> None:
+    flight: SingleFlight[str] = SingleFlight()
+
+    def broken() -> str:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        flight.do("key", broken)
+    assert flight.do("key", lambda: "ok") == ("ok", False)
+
+
+def test_ttl_memo_expires_and_evicts_oldest() -> None:
+    now = [0.0]
+    memo: TTLMemo[str] = TTLMemo(2.0, max_entries=2, clock=lambda: now[0])
+    memo.put("a", "1")
+    memo.put("b", "2")
+    memo.put("c", "3")
+
+    assert memo.get("a") is None
+    assert memo.get("b") == "2"
+    now[0] = 2.5
+    assert memo.get("c") is None
+
+    disabled: TTLMemo[str] = TTLMemo(0.0)
+    disabled.put("a", "1")
+    assert disabled.get("a") is None